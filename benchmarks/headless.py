@@ -0,0 +1,67 @@
+# Headless stand-in for a Tk text widget, so rendering and highlighting can be timed on a
+# machine without a display. It keeps the text and tag ranges but does no layout; the view
+# is always scrolled to the top, and after()/after_idle() callbacks wait in a queue until
+# run_pending() plays the part of the event loop.
+
+from collections import deque
+
+LINE_PIXELS = 16
+
+
+class HeadlessText:
+    def __init__(self, height_lines=40):
+        self.height_lines = height_lines
+        self.chunks = []
+        self.tags = {}
+        self.tag_options = {}
+        self.callbacks = deque()
+        self.cancelled = set()
+        self.next_callback_id = 0
+
+    def insert(self, index, text, *tags):
+        self.chunks.append(text)
+
+    def delete(self, start, end=None):
+        self.chunks = []
+        self.tags = {}
+
+    def get(self, start, end=None):
+        return "".join(self.chunks) + "\n"
+
+    def index(self, index):
+        if index.startswith("@0,"):
+            return f"{1 + int(index[3:]) // LINE_PIXELS}.0"
+        return "1.0"
+
+    def winfo_height(self):
+        return self.height_lines * LINE_PIXELS
+
+    def tag_add(self, tag, *indices):
+        self.tags.setdefault(tag, []).extend(indices)
+
+    def tag_remove(self, tag, start, end=None):
+        self.tags.pop(tag, None)
+
+    def tag_configure(self, tag, **options):
+        self.tag_options.setdefault(tag, {}).update(options)
+
+    def configure(self, **options):
+        pass
+
+    def after(self, ms, callback, *args):
+        self.next_callback_id += 1
+        self.callbacks.append((self.next_callback_id, callback, args))
+        return self.next_callback_id
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, callback_id):
+        self.cancelled.add(callback_id)
+
+    # Runs queued callbacks, including ones they schedule, until none are left
+    def run_pending(self):
+        while self.callbacks:
+            callback_id, callback, args = self.callbacks.popleft()
+            if callback_id not in self.cancelled:
+                callback(*args)
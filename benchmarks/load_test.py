@@ -0,0 +1,167 @@
+# Load test for the HTTP/JSON lookup service (syntax-buddy serve): many concurrent keep-alive
+# clients send a mix of lookups, searches, rendered entries and conditional (If-None-Match)
+# requests for a fixed time, then requests per second and latency percentiles are reported.
+#
+#   python benchmarks/load_test.py                          # starts a server on the bundled packs
+#   python benchmarks/load_test.py --size 100000            # ... on a synthetic 100k entry corpus
+#   python benchmarks/load_test.py --url http://127.0.0.1:8765 --clients 200 --duration 20
+#
+# The clients run in --processes processes so the load generator is not the bottleneck.
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run import SEARCH_QUERIES, build_corpus
+
+# Share of each kind of request in the mix
+REQUEST_MIX = {"lookup": 0.45, "search": 0.25, "render": 0.1, "conditional": 0.2}
+
+# Sends one GET on an open connection; returns (status, headers, body)
+async def fetch(reader, writer, host, target, headers=()):
+    request = f"GET {target} HTTP/1.1\r\nHost: {host}\r\n" + "".join(f"{name}: {value}\r\n"
+                                                                       for name, value in headers) + "\r\n"
+    writer.write(request.encode("latin-1"))
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    response_headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(response_headers.get("content-length", 0)))
+    return status, response_headers, body
+
+# Function to build the request targets from the server's own category and item lists
+async def collect_targets(host, port, entry_limit=2000):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, _, body = await fetch(reader, writer, host, "/categories")
+        entries = []
+        for category in json.loads(body):
+            _, _, body = await fetch(reader, writer, host, f"/categories/{quote(category['category'])}")
+            entries += [(category["category"], item) for item in json.loads(body)]
+    finally:
+        writer.close()
+    random.Random(0).shuffle(entries)
+    entry_targets = [f"category={quote(category)}&item={quote(item)}" for category, item in entries[:entry_limit]]
+    return {"lookup": [f"/lookup?{query}" for query in entry_targets],
+            "search": [f"/search?q={quote(query)}" for query in SEARCH_QUERIES],
+            "render": [f"/render?{query}" for query in entry_targets],
+            "conditional": [f"/lookup?{query}" for query in entry_targets]}
+
+# One keep-alive client sending requests back to back until `deadline`
+async def client(host, port, targets, deadline, seed, latencies, statuses):
+    rng = random.Random(seed)
+    kinds = list(REQUEST_MIX)
+    weights = list(REQUEST_MIX.values())
+    etags = {}
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            target = rng.choice(targets[kind])
+            headers = [("If-None-Match", etags[target])] if kind == "conditional" and target in etags else []
+            start = time.perf_counter()
+            status, response_headers, _ = await fetch(reader, writer, host, target, headers)
+            latencies[kind].append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if "etag" in response_headers:
+                etags[target] = response_headers["etag"]
+    finally:
+        writer.close()
+
+# Function to run `clients` connections in this process; returns (latencies by kind, status counts)
+def run_clients(host, port, targets, clients, duration, seed):
+    latencies = {kind: [] for kind in REQUEST_MIX}
+    statuses = {}
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(client(host, port, targets, deadline, seed * 1000 + number, latencies, statuses)
+                               for number in range(clients)))
+    asyncio.run(main())
+    return latencies, statuses
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(share * len(values)))] * 1000
+
+def report(name, values, seconds):
+    values = sorted(values)
+    if not values:
+        return
+    print(f"  {name:<12} {len(values):>8} requests  {len(values) / seconds:9.0f} req/s   "
+          f"p50 {percentile(values, 0.5):7.2f} ms  p90 {percentile(values, 0.9):7.2f} ms  "
+          f"p99 {percentile(values, 0.99):7.2f} ms  max {values[-1] * 1000:7.2f} ms")
+
+# Function to start `syntax-buddy serve` on a free port; returns (process, host, port)
+def start_server(data_dir):
+    command = [sys.executable, "-m", "syntax_buddy", "--data", data_dir, "serve", "--port", "0"]
+    server = subprocess.Popen(command, cwd=ROOT, stderr=subprocess.PIPE, text=True,
+                              env=dict(os.environ, PYTHONPATH=ROOT))
+    line = server.stderr.readline()
+    if not line.startswith("Serving on "):
+        server.kill()
+        raise SystemExit(f"Server did not start: {line}{server.stderr.read()}")
+    url = urlsplit(line.split()[-1])
+    return server, url.hostname, url.port
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the syntax-buddy HTTP/JSON service.")
+    parser.add_argument("--url", help="server to test (default: start one)")
+    parser.add_argument("--data", help="corpus folder for the server this script starts")
+    parser.add_argument("--size", type=int, help="start the server on a synthetic corpus of this many entries")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--processes", type=int, default=2, help="client processes to spread them over")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to send requests for")
+    args = parser.parse_args(argv)
+
+    server = None
+    with tempfile.TemporaryDirectory(prefix="syntax-buddy-load-") as data_dir:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            if args.size:
+                build_corpus(args.size, data_dir)
+            else:
+                data_dir = args.data or os.path.join(ROOT, "syntax_buddy", "data")
+            server, host, port = start_server(data_dir)
+        try:
+            targets = asyncio.run(collect_targets(host, port))
+            processes = max(1, min(args.processes, args.clients))
+            shares = [args.clients // processes + (number < args.clients % processes) for number in range(processes)]
+            print(f"{args.clients} clients in {processes} processes for {args.duration:g} s against "
+                  f"http://{host}:{port}")
+            start = time.perf_counter()
+            with multiprocessing.Pool(processes) as pool:
+                outcomes = pool.starmap(run_clients, [(host, port, targets, share, args.duration, number)
+                                                      for number, share in enumerate(shares)])
+            seconds = time.perf_counter() - start
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    latencies = {kind: [value for kinds, _ in outcomes for value in kinds[kind]] for kind in REQUEST_MIX}
+    statuses = {}
+    for _, counts in outcomes:
+        for status, count in counts.items():
+            statuses[status] = statuses.get(status, 0) + count
+    for kind, values in latencies.items():
+        report(kind, values, seconds)
+    report("all", [value for values in latencies.values() for value in values], seconds)
+    print(f"  statuses: {', '.join(f'{status}: {count}' for status, count in sorted(statuses.items()))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# Benchmarks for Syntax Buddy's hot paths: highlighting, search, "See also", entry rendering and
+# startup.
+#
+#   python benchmarks/run.py                          # 10, 1k and 100k entry corpora
+#   python benchmarks/run.py --sizes 1000 --output before.json
+#   python benchmarks/run.py --compare before.json    # show changes against an earlier run
+#
+# Corpora are synthetic: the real entries from syntax_buddy/data with numbered item names and
+# shuffled words, written as ordinary language packs. Timings are medians in milliseconds.
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.headless import HeadlessText
+from syntax_buddy.corpus import DATA_DIR, Corpus
+from syntax_buddy.render import (RenderCache, format_entry, format_result,
+                                 insert_highlighted, paint, render_document)
+from syntax_buddy.prefetch import Prefetcher
+from syntax_buddy.related import RelatedEntries
+from syntax_buddy.scratchpad import Scratchpad
+from syntax_buddy.search import SearchIndex
+from syntax_buddy.viewport import LazyHighlighter
+
+SEARCH_QUERIES = ["flex", "for loop", "lamda", "background color", "e", "<li>"]
+
+# Function to write a synthetic corpus of `size` entries shaped like the real packs
+def build_corpus(size, directory, seed=0):
+    rng = random.Random(seed)
+    real = Corpus(DATA_DIR)
+    templates = {category: list(real[category].items()) for category in real}
+    words = sorted({word for entries in templates.values() for _, details in entries
+                    for word in details["description"].split()})
+    per_category = {category: {} for category in templates}
+    categories = list(templates)
+    for number in range(size):
+        category = categories[number % len(categories)]
+        item, details = templates[category][(number // len(categories)) % len(templates[category])]
+        description = " ".join(rng.sample(words, 12)) + "."
+        per_category[category][f"{item} {number}"] = {
+            "syntax": details["syntax"], "example": details["example"], "description": description}
+    packs = []
+    for category, entries in per_category.items():
+        file_name = f"{category.lower()}.json"
+        with open(os.path.join(directory, file_name), "w", encoding="utf-8") as pack_file:
+            json.dump({"category": category, "language": real.language(category), "entries": entries}, pack_file)
+        packs.append({"category": category, "language": real.language(category), "file": file_name})
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as manifest_file:
+        json.dump({"packs": packs}, manifest_file)
+
+# Function to time fn() `repeat` times; returns durations in milliseconds
+def measure(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+# Function to store and print one benchmark. params describe the run (and tell runs apart when
+# comparing); metrics are measured alongside the time, such as hit rates.
+def record(results, name, size, durations, metrics=None, **params):
+    results.append({"name": name, "size": size, "params": params, "metrics": metrics or {}, "runs": len(durations),
+                    "median_ms": round(statistics.median(durations), 4), "min_ms": round(min(durations), 4)})
+    print(f"  {name:<28} {size:>7}  {statistics.median(durations):10.3f} ms"
+          + (f"  {params}" if params else "")
+          + "".join(f"  {metric}={value}" for metric, value in (metrics or {}).items()))
+
+def bench_search(results, size, corpus, repeat):
+    durations = measure(lambda: SearchIndex(corpus), max(1, repeat // 10))
+    record(results, "search.build_index", size, durations)
+    index = SearchIndex(corpus)
+    for query in SEARCH_QUERIES:
+        record(results, "search.query", size, measure(lambda: index.search(query), repeat), query=query)
+        # What the GUI waits for before the first results appear
+        record(results, "search.stream_first_batch", size,
+               measure(lambda: list(islice(index.stream(query), 40)), repeat), query=query)
+    return index
+
+def bench_related(results, size, index, repeat):
+    record(results, "related.build", size, measure(lambda: RelatedEntries(index), 1))
+    related = RelatedEntries(index)
+    entries = index.entries[:: max(1, len(index.entries) // 50)]
+    # Large corpora compute rows on first use; time that, then the cached lookup
+    record(results, "related.first_get", size, measure(lambda: [related.get(*entry) for entry in entries], 1),
+           entries=len(entries))
+    record(results, "related.get", size, measure(lambda: [related.get(*entry) for entry in entries], repeat),
+           entries=len(entries))
+
+def bench_highlight(results, size, corpus, index, repeat, max_results):
+    widget = HeadlessText()
+    category = next(iter(corpus))
+    item, details = next(iter(corpus[category].items()))
+    entry_text = format_entry(item, details)
+    record(results, "highlight_syntax.entry", size,
+           measure(lambda: insert_highlighted(widget, entry_text, corpus.language, category), repeat))
+
+    hits = index.search("e", limit=max_results)
+    document = "".join(format_result(c, i, corpus[c][i]) for c, i in hits)
+    record(results, "highlight_syntax.results", size,
+           measure(lambda: insert_highlighted(widget, document, corpus.language), max(1, repeat // 10)),
+           hits=len(hits), characters=len(document))
+
+    # Viewport-first: time to first paint, then to finish tagging in idle slices
+    parts = [format_result(c, i, corpus[c][i]) for c, i in hits]
+    highlighter = LazyHighlighter(widget, corpus.language)
+    record(results, "highlight_lazy.first_paint", size,
+           measure(lambda: highlighter.show(parts), max(1, repeat // 10)), hits=len(hits))
+
+    def show_and_finish():
+        highlighter.show(parts)
+        widget.run_pending()
+    record(results, "highlight_lazy.complete", size, measure(show_and_finish, max(1, repeat // 10)),
+           hits=len(hits))
+
+def bench_render(results, size, corpus, repeat):
+    widget = HeadlessText()
+    entries = [(category, item) for category in corpus for item in corpus[category]][:200]
+
+    def render_all():
+        for category, item in entries:
+            paint(widget, render_document(format_entry(item, corpus[category][item]), corpus.language, category))
+    record(results, "render.entry_uncached", size, [d / len(entries) for d in measure(render_all, repeat)])
+
+    cache = RenderCache(maxsize=len(entries))
+
+    def render_cached():
+        for category, item in entries:
+            paint(widget, cache.get((category, item), lambda: render_document(
+                format_entry(item, corpus[category][item]), corpus.language, category)))
+    render_cached()
+    record(results, "render.entry_cached", size, [d / len(entries) for d in measure(render_cached, repeat)])
+
+# Function to time stepping through a category entry by entry, the way the GUI shows entries,
+# with and without idle-time prefetching of the neighbours (idle time runs between clicks)
+def bench_prefetch(results, size, corpus, repeat):
+    widget = HeadlessText()
+    category = max(corpus, key=lambda category: len(corpus[category]))
+    items = list(islice(corpus[category], 100))
+
+    def build(category, item):
+        return render_document(format_entry(item, corpus[category][item]), corpus.language, category)
+
+    for prefetch in (False, True):
+        durations = []
+        cache = RenderCache()
+        prefetcher = Prefetcher(widget, corpus, cache, build)
+        for item in items:
+            start = time.perf_counter()
+            paint(widget, cache.get((category, item), lambda: build(category, item)))
+            if corpus.language(category) == "python":
+                prefetcher.example_code(corpus[category][item]["example"])
+            durations.append((time.perf_counter() - start) * 1000)
+            if prefetch:
+                prefetcher.neighbours(category, item)
+            widget.run_pending()
+        stats = prefetcher.stats()
+        record(results, "prefetch.step_through" if prefetch else "prefetch.step_through_cold", size, durations,
+               metrics={rate: round(stats[rate], 3) for rate in ("hit_rate", "prefetch_hit_rate", "code_hit_rate")},
+               entries=len(items))
+
+# Function to time picking up a one-entry edit of the biggest pack: reading it and finding what
+# changed (on a worker thread in the app), then patching the store, search index and caches
+def bench_reload(results, size, data_dir, repeat):
+    corpus = Corpus(data_dir, use_snapshot=False)
+    corpus.search_index()
+    category = max(corpus, key=lambda category: len(corpus[category]))
+    path = os.path.join(data_dir, corpus.packs[category]["file"])
+    with open(path, encoding="utf-8") as pack_file:
+        pack = json.load(pack_file)
+    item = next(iter(pack["entries"]))
+    reads = []
+    applies = []
+    for number in range(max(1, repeat // 10)):
+        pack["entries"][item]["description"] = f"Edited {number}"
+        with open(path, "w", encoding="utf-8") as pack_file:
+            json.dump(pack, pack_file)
+        reloaded = []
+        reads += measure(lambda: reloaded.append(corpus.read_reload(category)), 1)
+        applies += measure(lambda: corpus.apply_reload(reloaded[0]), 1)
+    record(results, "corpus.reload_read", size, reads, pack_entries=len(pack["entries"]))
+    record(results, "corpus.reload_apply", size, applies, pack_entries=len(pack["entries"]))
+
+# Function to time the scratchpad on a long Python example: lexing it all on load, then
+# highlighting again after a one-line edit (only the edited lines are lexed again)
+def bench_scratchpad(results, size, corpus, repeat):
+    widget = HeadlessText()
+    examples = [details["example"] for category in corpus if corpus.language(category) == "python"
+                for details in corpus[category].values()]
+    source = "\n".join(islice(examples, 500))
+    if not source:
+        return
+    scratchpad = Scratchpad(widget)
+    record(results, "scratchpad.load", size, measure(lambda: scratchpad.load(source, "python"), repeat),
+           lines=source.count("\n") + 1)
+
+    middle = source.count("\n") // 2
+    lines = source.split("\n")
+    edits = [lines[:middle] + [lines[middle] + " # edit"] + lines[middle + 1:], lines]
+
+    def edit_and_relex():
+        widget.chunks = ["\n".join(edits[0])]
+        scratchpad.relex(settle=False)
+        widget.chunks = ["\n".join(edits[1])]
+        scratchpad.relex(settle=False)
+    scratchpad.load(source, "python")
+    durations = measure(edit_and_relex, repeat)
+    record(results, "scratchpad.relex_one_line", size, [d / 2 for d in durations], relexed=scratchpad.relexed)
+
+# Function to time fresh interpreters: importing the core, first lookup, and a CLI call
+def bench_startup(results, size, data_dir, repeat):
+    env = dict(os.environ, SYNTAX_BUDDY_DATA=data_dir, PYTHONPATH=ROOT)
+    commands = {
+        "startup.interpreter": [sys.executable, "-c", "pass"],
+        "startup.core_import": [sys.executable, "-c",
+                                "import syntax_buddy.corpus, syntax_buddy.render, syntax_buddy.search, "
+                                "syntax_buddy.runner, syntax_buddy.preview, syntax_buddy.themes"],
+        "startup.cli_lookup": [sys.executable, "-m", "syntax_buddy", "--data", data_dir, "--color", "never",
+                               "list"],
+        "startup.cli_search": [sys.executable, "-m", "syntax_buddy", "--data", data_dir, "--color", "never",
+                               "search", "flex", "--limit", "5"],
+    }
+    # Without the startup snapshot every run parses the packs and builds the index; with it
+    # (written by the priming run) neither happens
+    for snapshot in ("off", ""):
+        run_env = dict(env, SYNTAX_BUDDY_SNAPSHOT=snapshot)
+        subprocess.run(commands["startup.cli_search"], env=run_env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        for name, command in commands.items():
+            durations = measure(lambda: subprocess.run(command, env=run_env, stdout=subprocess.DEVNULL,
+                                                       stderr=subprocess.DEVNULL, check=False),
+                                max(1, repeat // 5))
+            record(results, name, size, durations, snapshot=snapshot != "off")
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Function to print how each benchmark moved against an earlier results file
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+
+    def key(result):
+        return result["name"], result["size"], json.dumps(result["params"], sort_keys=True)
+    before = {key(result): result for result in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('revision')}):")
+    for result in results:
+        old = before.get(key(result))
+        if old and old["median_ms"]:
+            change = (result["median_ms"] - old["median_ms"]) / old["median_ms"] * 100
+            print(f"  {result['name']:<28} {result['size']:>7}  {old['median_ms']:10.3f} -> "
+                  f"{result['median_ms']:10.3f} ms  ({change:+.1f}%)"
+                  + "".join(f"  {metric} {old.get('metrics', {}).get(metric)} -> {value}"
+                            for metric, value in result["metrics"].items()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time Syntax Buddy's hot paths on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=20, help="runs per fast benchmark")
+    parser.add_argument("--max-results", type=int, default=5000,
+                        help="search hits rendered into the highlighted results document")
+    parser.add_argument("--skip-startup", action="store_true")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        print(f"{size} entries:")
+        with tempfile.TemporaryDirectory(prefix="syntax-buddy-bench-") as data_dir:
+            build_corpus(size, data_dir)
+            corpus = Corpus(data_dir, use_snapshot=False)
+            record(results, "corpus.load_all", size,
+                   measure(lambda: [Corpus(data_dir, use_snapshot=False)[category] for category in corpus], 3))
+            index = bench_search(results, size, corpus, args.repeat)
+            bench_related(results, size, index, args.repeat)
+            bench_highlight(results, size, corpus, index, args.repeat, args.max_results)
+            bench_render(results, size, corpus, args.repeat)
+            bench_prefetch(results, size, corpus, args.repeat)
+            bench_reload(results, size, data_dir, args.repeat)
+            bench_scratchpad(results, size, corpus, args.repeat)
+            if not args.skip_startup:
+                bench_startup(results, size, data_dir, args.repeat)
+
+    meta = {"revision": git_revision(), "python": platform.python_version(),
+            "platform": platform.platform(), "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump({"meta": meta, "results": results}, output_file, indent=2)
+    print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -1,583 +1,757 @@
 # Python Syntax Reference Application with Tkinter GUI, Search, Highlighting, Run, Dark/Light Mode, Descriptions, Python, HTML, CSS Categories with Webbrowser Previews
 
+import argparse
+from itertools import chain, islice
+import threading
 import tkinter as tk
-from tkinter import scrolledtext, messagebox
-import re
+from tkinter import scrolledtext, messagebox, filedialog
 import webbrowser
-import tempfile
-import os
-
-# Syntax data dictionary with "Python," "HTML," and "CSS" categories
-syntax_data = {
-    "Python": {
-        "Variable Assignment": {
-            "syntax": "variable_name = value",
-            "example": "x = 10  # Assigns 10 to x\nname = 'Alice'",
-            "description": "Used to store data in a named container for later use or manipulation in the program."
-        },
-        "Integer": {
-            "syntax": "variable = int_value",
-            "example": "age = 25  # Integer value",
-            "description": "Represents whole numbers, useful for counting or performing arithmetic operations."
-        },
-        "String": {
-            "syntax": "variable = 'text' or \"text\"",
-            "example": "greeting = 'Hello'\ngreeting = \"Hi\"",
-            "description": "Stores text data, such as names or messages, for display or processing."
-        },
-        "List": {
-            "syntax": "variable = [item1, item2, ...]",
-            "example": "fruits = ['apple', 'banana', 'orange']",
-            "description": "Holds an ordered, mutable collection of items, ideal for managing multiple values."
-        },
-        "If Statement": {
-            "syntax": "if condition:\n    statement",
-            "example": "x = 10\nif x > 5:\n    print('x is greater than 5')",
-            "description": "Executes code conditionally based on whether a condition is true, enabling decision-making."
-        },
-        "For Loop": {
-            "syntax": "for item in iterable:\n    statement",
-            "example": "for i in range(3):\n    print(i)",
-            "description": "Iterates over a sequence (like a list or range), useful for repetitive tasks."
-        },
-        "While Loop": {
-            "syntax": "while condition:\n    statement",
-            "example": "count = 0\nwhile count < 3:\n    print(count)\n    count += 1",
-            "description": "Repeats code as long as a condition remains true, good for dynamic looping."
-        },
-        "Function Definition": {
-            "syntax": "def function_name(parameters):\n    statement\n    return value",
-            "example": "def add(a, b):\n    return a + b\nresult = add(3, 4)",
-            "description": "Defines reusable code blocks to perform specific tasks, improving modularity."
-        },
-        "Lambda Function": {
-            "syntax": "lambda arguments: expression",
-            "example": "double = lambda x: x * 2\nprint(double(5))",
-            "description": "Creates small, anonymous functions for quick, one-off operations."
-        },
-        "Class Definition": {
-            "syntax": "class ClassName:\n    def __init__(self, parameters):\n        self.attribute = value",
-            "example": "class Dog:\n    def __init__(self, name):\n        self.name = name\nmy_dog = Dog('Rex')\nprint(my_dog.name)",
-            "description": "Defines a blueprint for objects, enabling object-oriented programming."
-        },
-        "Method": {
-            "syntax": "def method_name(self, parameters):\n    statement",
-            "example": "class Dog:\n    def bark(self):\n        print('Woof!')\nmy_dog = Dog()\nmy_dog.bark()",
-            "description": "Adds behavior to classes, allowing objects to perform actions."
-        },
-        "Try-Except": {
-            "syntax": "try:\n    statement\nexcept ExceptionType:\n    statement",
-            "example": "try:\n    x = 1 / 0\nexcept ZeroDivisionError:\n    print('Cannot divide by zero')",
-            "description": "Handles errors gracefully, preventing program crashes."
-        },
-        "Open File": {
-            "syntax": "with open('file.txt', 'r') as f:\n    statement",
-            "example": "with open('data.txt', 'r') as f:\n    print(f.read())",
-            "description": "Reads or writes file contents safely, ensuring the file is properly closed."
-        },
-        "Import": {
-            "syntax": "import module_name",
-            "example": "import math\nprint(math.pi)",
-            "description": "Accesses external libraries or modules to extend functionality."
-        }
-    },
-    "HTML": {
-        "Basic Tag": {
-            "syntax": "<tag>content</tag>",
-            "example": "<p>This is a paragraph</p>",
-            "description": "Defines the structure and content of a webpage, marking up text or elements."
-        },
-        "Attribute": {
-            "syntax": "<tag attribute=\"value\">content</tag>",
-            "example": "<a href=\"https://example.com\">Link</a>",
-            "description": "Adds properties or behaviors to HTML tags, such as links or styling."
-        },
-        "Heading": {
-            "syntax": "<h1> to <h6>content</h1> to </h6>",
-            "example": "<h1>Main Title</h1>\n<h2>Subtitle</h2>",
-            "description": "Creates hierarchical headings to organize content and improve readability."
-        },
-        "Image": {
-            "syntax": "<img src=\"image.jpg\" alt=\"description\">",
-            "example": "<img src=\"https://via.placeholder.com/150\" alt=\"A placeholder image\">",
-            "description": "Embeds images in a webpage, with alt text for accessibility."
-        },
-        "List (Unordered)": {
-            "syntax": "<ul>\n    <li>item</li>\n</ul>",
-            "example": "<ul>\n    <li>Apple</li>\n    <li>Banana</li>\n</ul>",
-            "description": "Creates a bulleted list for unordered items, useful for grouping related content."
-        },
-        "Division": {
-            "syntax": "<div>content</div>",
-            "example": "<div>\n    <h1>Title</h1>\n    <p>Text</p>\n</div>",
-            "description": "Groups related content or elements together for styling or layout purposes."
-        },
-        "Form": {
-            "syntax": "<form action=\"url\" method=\"method\">\n    content\n</form>",
-            "example": "<form action=\"/submit\" method=\"post\">\n    <input type=\"text\" name=\"username\">\n    <button>Submit</button>\n</form>",
-            "description": "Collects user input, typically for sending data to a server."
-        },
-        "Input": {
-            "syntax": "<input type=\"type\" name=\"name\">",
-            "example": "<input type=\"text\" name=\"email\" placeholder=\"Enter email\">",
-            "description": "Creates interactive fields for user input, like text boxes or buttons."
-        },
-        "Link": {
-            "syntax": "<a href=\"url\">content</a>",
-            "example": "<a href=\"https://example.com\" target=\"_blank\">Visit Example</a>",
-            "description": "Creates hyperlinks to navigate between pages or resources."
-        },
-        "Table": {
-            "syntax": "<table>\n    <tr>\n        <th>header</th>\n        <td>data</td>\n    </tr>\n</table>",
-            "example": "<table>\n    <tr>\n        <th>Name</th>\n        <th>Age</th>\n    </tr>\n    <tr>\n        <td>Alice</td>\n        <td>25</td>\n    </tr>\n</table>",
-            "description": "Displays data in a tabular format with rows and columns."
-        },
-        "List (Ordered)": {
-            "syntax": "<ol>\n    <li>item</li>\n</ol>",
-            "example": "<ol>\n    <li>First</li>\n    <li>Second</li>\n</ol>",
-            "description": "Creates a numbered list for ordered items, useful for steps or rankings."
-        },
-        "Meta Tags": {
-            "syntax": "<meta name=\"name\" content=\"value\">",
-            "example": "<meta name=\"description\" content=\"A sample webpage\">\n<meta charset=\"UTF-8\">",
-            "description": "Provides metadata about the webpage, like character encoding or SEO details."
-        },
-        "Script Tag": {
-            "syntax": "<script>script content</script> or <script src=\"script.js\"></script>",
-            "example": "<script>\n    alert('Hello from HTML!');\n</script>",
-            "description": "Embeds or links to JavaScript code to add interactivity to the webpage."
-        },
-        "Style Tag": {
-            "syntax": "<style>css rules</style>",
-            "example": "<style>\n    body { background-color: lightblue; }\n    p { color: red; }\n</style>",
-            "description": "Defines inline CSS to style HTML elements directly within the page."
-        }
-    },
-    "CSS": {
-        "Selector (Element)": {
-            "syntax": "element { property: value; }",
-            "example": "p { color: blue; }",
-            "description": "Targets all instances of an HTML element to apply styles universally."
-        },
-        "Selector (Class)": {
-            "syntax": ".class { property: value; }",
-            "example": ".highlight { background-color: yellow; }",
-            "description": "Targets elements with a specific class for reusable styling."
-        },
-        "Selector (ID)": {
-            "syntax": "#id { property: value; }",
-            "example": "#header { font-size: 24px; }",
-            "description": "Targets a unique element by its ID for specific styling."
-        },
-        "Color": {
-            "syntax": "element { color: value; }",
-            "example": "h1 { color: #ff0000; }",
-            "description": "Sets the text color of an element, enhancing visual appeal."
-        },
-        "Background": {
-            "syntax": "element { background: value; }",
-            "example": "body { background: lightgray url('https://via.placeholder.com/150') no-repeat center; }",
-            "description": "Defines the background (color, image, etc.) of an element for design customization."
-        },
-        "Font Size": {
-            "syntax": "element { font-size: value; }",
-            "example": "p { font-size: 16px; }",
-            "description": "Adjusts the size of text to improve readability or emphasis."
-        },
-        "Margin": {
-            "syntax": "element { margin: value; }",
-            "example": "div { margin: 10px 20px; }",
-            "description": "Sets the outer spacing around an element to control layout."
-        },
-        "Padding": {
-            "syntax": "element { padding: value; }",
-            "example": ".box { padding: 15px; }",
-            "description": "Sets the inner spacing within an element to adjust content placement."
-        },
-        "Border": {
-            "syntax": "element { border: width style color; }",
-            "example": "table { border: 1px solid black; }",
-            "description": "Adds a border around an element for visual separation or decoration."
-        },
-        "Display": {
-            "syntax": "element { display: value; }",
-            "example": ".inline { display: inline-block; }",
-            "description": "Controls the layout behavior of an element (e.g., block, inline, none)."
-        },
-        "Flexbox": {
-            "syntax": "element { display: flex; property: value; }",
-            "example": ".container { display: flex; justify-content: space-between; }",
-            "description": "Creates a flexible layout for arranging items in a container efficiently."
-        },
-        "Position": {
-            "syntax": "element { position: value; top/right/bottom/left: value; }",
-            "example": ".fixed { position: fixed; top: 10px; right: 10px; }",
-            "description": "Controls the positioning of an element (e.g., absolute, relative, fixed)."
-        },
-        "Grid": {
-            "syntax": "element { display: grid; grid-template-columns: value; }",
-            "example": ".grid { display: grid; grid-template-columns: 1fr 1fr 1fr; }",
-            "description": "Creates a grid layout for precise control over rows and columns."
-        },
-        "Transition": {
-            "syntax": "element { transition: property duration timing-function; }",
-            "example": "button { transition: background-color 0.3s ease; }\nbutton:hover { background-color: blue; }",
-            "description": "Adds smooth transitions to property changes for interactive effects."
-        },
-        "Media Query": {
-            "syntax": "@media (condition) { element { property: value; } }",
-            "example": "@media (max-width: 600px) { body { font-size: 14px; } }",
-            "description": "Applies styles based on device characteristics, enabling responsive design."
-        }
-    }
-}
-
-# Color schemes
-themes = {
-    "light": {
-        "bg": "#f0f0f0", "fg": "black", "button_bg": "#e0e0e0", "button_fg": "black",
-        "text_bg": "white", "text_fg": "black", "keyword": "blue", "comment": "green", "string": "orange",
-        "description": "green"
-    },
-    "dark": {
-        "bg": "#2b2b2b", "fg": "white", "button_bg": "#4a4a4a", "button_fg": "white",
-        "text_bg": "#1e1e1e", "text_fg": "white", "keyword": "#569cd6", "comment": "#6a9955", "string": "#ce9178",
-        "description": "#2ecc71"
-    }
-}
+
+from syntax_buddy.corpus import DATA_DIR, Corpus
+from syntax_buddy.prefetch import Prefetcher
+from syntax_buddy.preview import PreviewServer, build_preview_page
+from syntax_buddy.render import RenderCache, format_entry, format_result, insert_highlighted, paint, render_document
+from syntax_buddy.runner import ExamplePool
+from syntax_buddy.scan import match_entries, scan_project
+from syntax_buddy.scratchpad import Scratchpad
+from syntax_buddy.themes import ThemeRegistry, load_user_themes, themes
+from syntax_buddy.trace import install_stall_monitor, tk_callback, traced, tracer
+from syntax_buddy.viewport import LazyHighlighter
+
+# Command line options: --trace FILE records a Chrome trace of the session (see syntax_buddy.trace)
+arg_parser = argparse.ArgumentParser(description="Syntax Reference Tool")
+arg_parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace of this session to FILE")
+arg_parser.add_argument("--stall-ms", type=float, help="report mainloop stalls longer than this")
+arg_parser.add_argument("--scan", metavar="FOLDER", help="show which entries a project's code uses, and where")
+options = arg_parser.parse_args()
+if options.trace:
+    tracer.enable(options.trace)
+
+syntax_data = Corpus(DATA_DIR)
+example_pool = ExamplePool()  # Pre-warmed worker processes for "Run Example"
+RUN_POLL_MS = 50
+preview_server = None  # Local server for HTML/CSS previews, started on the first preview
+PREVIEW_AUTO_RELOAD = True  # Reuse one live browser tab instead of opening a tab per preview
 
 current_theme = "light"
+theme_registry = ThemeRegistry(themes[current_theme])
 sub_frame = None  # To track the sub-button frame
-
-# Function to apply syntax highlighting
-def highlight_syntax(text_widget, content):
-    text_widget.delete(1.0, tk.END)
-    text_widget.insert(tk.END, content)
-    
-    text_widget.tag_configure("keyword", foreground=themes[current_theme]["keyword"])
-    text_widget.tag_configure("comment", foreground=themes[current_theme]["comment"])
-    text_widget.tag_configure("string", foreground=themes[current_theme]["string"])
-    text_widget.tag_configure("description", foreground=themes[current_theme]["description"])
-
-    keywords = ["if", "for", "while", "def", "class", "try", "except", "with", "import", "return", "lambda", "as", "self"]
-    for keyword in keywords:
-        start = "1.0"
-        while True:
-            pos = text_widget.search(keyword, start, stopindex=tk.END)
-            if not pos:
-                break
-            end = f"{pos}+{len(keyword)}c"
-            text_widget.tag_add("keyword", pos, end)
-            start = end
-
-    start = "1.0"
-    while True:
-        pos = text_widget.search("#", start, stopindex=tk.END)
-        if not pos:
-            break
-        end = text_widget.search("\n", pos, stopindex=tk.END) or tk.END
-        text_widget.tag_add("comment", pos, end)
-        start = end
-
-    for quote in ["'", '"']:
-        start = "1.0"
-        while True:
-            pos = text_widget.search(quote, start, stopindex=tk.END)
-            if not pos:
-                break
-            end = text_widget.search(quote, f"{pos}+1c", stopindex=tk.END)
-            if not end:
-                end = tk.END
-            else:
-                end = f"{end}+1c"
-            text_widget.tag_add("string", pos, end)
-            start = end
-
-    start = "1.0"
-    while True:
-        pos = text_widget.search("Why Use:", start, stopindex=tk.END)
-        if not pos:
-            break
-        desc_start = f"{pos}+9c"
-        desc_end = text_widget.search("\n\n", desc_start, stopindex=tk.END) or tk.END
-        if desc_end != tk.END:
-            desc_end = f"{desc_end}+1c"
-        text_widget.tag_add("description", desc_start, desc_end)
-        start = desc_end
+current_entry = None  # (category, item) shown in text_area, if any
+run_poll_id = None  # Pending poll for finished example runs, if any
+scratch_run_id = None  # Job id of the scratchpad's background run in flight, if any
+scratch_next = None  # Edited source to run once that run finishes, if any
+search_after_id = None  # Pending debounced search, if any
+last_search_query = None  # Query of the last search run or scheduled
+see_also_id = None  # Pending "See also" list for the entry being shown, if any
+see_also_build = None  # Thread building the "See also" table, once started
+SEE_ALSO_POLL_MS = 100
+SEARCH_DEBOUNCE_MS = 150  # Typing pause before searching as the user types
+search_stream = None  # Formatted results of the current search not yet shown, if any
+search_stream_id = None  # Pending batch of streamed results, if any
+search_stream_shown = 0  # Results of the current search in text_area
+search_stream_cap = 0  # Results to show before waiting for "Load more"
+SEARCH_BATCH_SIZE = 40  # Results appended per turn of the event loop
+SEARCH_BATCH_MS = 1
+SEARCH_PAGE_SIZE = 400
+SCAN_POLL_MS = 100
+CORPUS_POLL_MS = 1000  # How often pack files are checked for edits
+SCAN_REFS_SHOWN = 10  # file:line references listed per entry in the scan report
+
+search_index = None  # Built on the first search, which loads every pack
+render_cache = RenderCache()  # Rendered entry views by (category, item); themes only change tag colours
+
+# Function to get the search index, building it the first time it is needed
+def get_search_index():
+    global search_index
+    if search_index is None:
+        search_index = syntax_data.search_index()  # From the startup snapshot when there is one
+    return search_index
+
+# Function to bring what is on screen and in the caches up to date when a pack is edited;
+# items are the entries added, changed or removed (None: any of them). The search index is
+# patched in place by syntax_data itself.
+def on_corpus_changed(category, items):
+    render_cache.invalidate(category, items)
+    view = category_views.get(category)
+    if view is not None and (items is None or view.item_list.items != list(syntax_data[category])):
+        del category_views[category]  # Entries were added or removed: the list is built again
+        showing = sub_frame is view.frame
+        if showing:
+            hide_sub_frame()
+        view.destroy()
+        if showing:
+            show_sub_buttons(category)
+    if current_entry is not None and current_entry[0] == category and not scratchpad.active \
+            and (items is None or current_entry[1] in items):
+        if current_entry[1] in syntax_data[category]:
+            show_sub_syntax(*current_entry)
+        else:
+            go_back()
+
+syntax_data.add_listener(on_corpus_changed)
+
+# Function to pick up edits to the pack files while the app runs. Edited packs are read in a
+# background thread; only applying the changes (see poll_corpus_reload) happens on this one.
+@tk_callback("watch_corpus")
+def watch_corpus():
+    changed = syntax_data.changed_packs()
+    if not changed:
+        root.after(CORPUS_POLL_MS, watch_corpus)
+        return
+    outcome = []
+
+    def read():
+        for category in changed:
+            try:
+                outcome.append(syntax_data.read_reload(category))
+            except (OSError, ValueError, KeyError) as e:
+                outcome.append((category, e))
+    thread = threading.Thread(target=read, daemon=True)
+    thread.start()
+    root.after(SCAN_POLL_MS, poll_corpus_reload, thread, outcome)
+
+@tk_callback("poll_corpus_reload")
+def poll_corpus_reload(thread, outcome):
+    building = see_also_build is not None and see_also_build.is_alive()  # The table is built from the index
+    if thread.is_alive() or building:
+        root.after(SCAN_POLL_MS, poll_corpus_reload, thread, outcome)
+        return
+    for reloaded in outcome:
+        if isinstance(reloaded[1], Exception):
+            # Tried again when the file next changes
+            messagebox.showwarning("Warning", f"Could not reload {reloaded[0]}: {reloaded[1]}")
+        else:
+            syntax_data.apply_reload(reloaded)
+    root.after(CORPUS_POLL_MS, watch_corpus)
+
+# Function to render an entry's detail view (cached in render_cache by (category, item))
+def render_entry(category, item):
+    return render_document(format_entry(item, syntax_data[category][item]), syntax_data.language, category)
+
+# Function to apply syntax highlighting (tag colours come from theme_registry)
+@traced("highlight_syntax")
+def highlight_syntax(text_widget, content, category=None):
+    close_scratchpad()
+    cancel_search_stream()
+    result_highlighter.clear()
+    insert_highlighted(text_widget, content, syntax_data.language, category)
 
 # Function to go back to main view
+@tk_callback("go_back")
 def go_back():
-    global sub_frame
-    if sub_frame:
-        sub_frame.destroy()
-        sub_frame = None
+    global current_entry
+    current_entry = None
+    hide_sub_frame()
     text_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
     run_button.pack(side=tk.BOTTOM, pady=5)
+    edit_button.pack(side=tk.BOTTOM, pady=5)
     highlight_syntax(text_area, "Welcome to the Syntax Reference Tool!\n\nClick 'Python', 'HTML', or 'CSS' to explore syntax or use the search bar.\n")
     run_button.config(state="disabled")
+    edit_button.config(state="disabled")
+
+# Scrollable list of item buttons that only creates enough rows to fill the visible area and
+# relabels them while scrolling, so a 2,000-item category costs the same as a 14-item one
+class VirtualList:
+    def __init__(self, master, items, on_select):
+        self.items = items
+        self.on_select = on_select
+        self.first = 0  # Index of the item shown in the top row
+        self.rows = []
+        self.row_height = None
+        self.frame = theme_registry.register(tk.Frame(master), "frame")
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.body = theme_registry.register(tk.Frame(self.frame), "frame")
+        self.body.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.body)
+        self.add_row()
+
+    def bind_wheel(self, widget):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self.on_wheel)
+
+    def add_row(self):
+        row = len(self.rows)
+        btn = tk.Button(self.body, font=("Arial", 12), anchor="w", width=30,
+                        command=lambda: self.select(row))
+        theme_registry.register(btn, "button")
+        btn.pack(pady=2)
+        self.bind_wheel(btn)
+        self.rows.append(btn)
+        if self.row_height is None:
+            self.row_height = btn.winfo_reqheight() + 4
+
+    # Keeps exactly as many rows as fit in the visible area (and no more than there are items)
+    @tk_callback("VirtualList.on_resize")
+    def on_resize(self, event):
+        wanted = max(1, min(len(self.items), event.height // self.row_height))
+        while len(self.rows) < wanted:
+            self.add_row()
+        while len(self.rows) > wanted:
+            btn = self.rows.pop()
+            theme_registry.unregister(btn)
+            btn.destroy()
+        self.scroll_to(self.first)
+
+    @traced("VirtualList.scroll_to")
+    def scroll_to(self, first):
+        self.first = max(0, min(first, len(self.items) - len(self.rows)))
+        for row, btn in enumerate(self.rows):
+            index = self.first + row
+            if index < len(self.items):
+                btn.configure(text=self.items[index], state="normal")
+            else:
+                btn.configure(text="", state="disabled")
+        if self.items:
+            self.scrollbar.set(self.first / len(self.items), (self.first + len(self.rows)) / len(self.items))
+
+    def select(self, row):
+        if self.first + row < len(self.items):
+            self.on_select(self.items[self.first + row])
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.items)))
+        elif action == "scroll":
+            step = len(self.rows) if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+
+# The item page of one category: title, virtual item list and Back button. Built the first
+# time the category is opened and then kept, so switching categories is just repacking.
+class CategoryView:
+    @traced("CategoryView build")
+    def __init__(self, category):
+        self.frame = theme_registry.register(tk.Frame(root), "frame")
+        self.label = tk.Label(self.frame, text=f"{category} Syntax:", font=("Arial", 14, "bold"))
+        theme_registry.register(self.label, "label")
+        self.label.pack(pady=5)
+        self.back_btn = tk.Button(self.frame, text="Back", font=("Arial", 12), command=go_back)
+        theme_registry.register(self.back_btn, "button")
+        self.back_btn.pack(side=tk.BOTTOM, pady=10)
+        self.item_list = VirtualList(self.frame, list(syntax_data[category]),
+                                     lambda item: show_sub_syntax(category, item))
+        self.item_list.frame.pack(fill=tk.BOTH, expand=True)
+
+    def destroy(self):
+        for widget in [self.frame, self.label, self.back_btn, self.item_list.frame,
+                       self.item_list.body] + self.item_list.rows:
+            theme_registry.unregister(widget)
+        self.frame.destroy()
+
+category_views = {}  # Category -> CategoryView, built on first use
+
+# Function to hide the category page that is showing, if any
+def hide_sub_frame():
+    global sub_frame
+    if sub_frame:
+        sub_frame.pack_forget()
+        sub_frame = None
 
 # Function to show sub-buttons for a category
+@tk_callback("show_sub_buttons")
 def show_sub_buttons(category):
     global sub_frame
-    if sub_frame:
-        sub_frame.destroy()
+    hide_sub_frame()
+    close_scratchpad()
+    cancel_search_stream()
     
     text_area.pack_forget()
     run_button.pack_forget()
+    edit_button.pack_forget()
     
-    sub_frame = tk.Frame(root, bg=themes[current_theme]["bg"])
+    if category not in category_views:
+        category_views[category] = CategoryView(category)
+    sub_frame = category_views[category].frame
     sub_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
-    
-    tk.Label(sub_frame, text=f"{category} Syntax:", font=("Arial", 14, "bold"), 
-             bg=themes[current_theme]["bg"], fg=themes[current_theme]["fg"]).pack(pady=5)
-    
-    for item in syntax_data[category].keys():
-        btn = tk.Button(sub_frame, text=item, font=("Arial", 12), 
-                        command=lambda i=item: show_sub_syntax(category, i), anchor="w", width=30,
-                        bg=themes[current_theme]["button_bg"], fg=themes[current_theme]["button_fg"])
-        btn.pack(pady=2)
-    
-    back_btn = tk.Button(sub_frame, text="Back", font=("Arial", 12), command=go_back,
-                         bg=themes[current_theme]["button_bg"], fg=themes[current_theme]["button_fg"])
-    back_btn.pack(pady=10)
+    prefetcher.category_top(category)  # Rendered in idle time, ready to be clicked
 
 # Function to show syntax for a sub-item
+@tk_callback("show_sub_syntax")
 def show_sub_syntax(category, item):
-    global sub_frame
-    if sub_frame:
-        sub_frame.destroy()
-        sub_frame = None
+    global current_entry, see_also_id
+    if item not in syntax_data[category]:
+        # A link shown before a reload removed the entry
+        messagebox.showwarning("Warning", f"{category}: {item} is no longer in the syntax packs.")
+        return
+    hide_sub_frame()
     
     text_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
     run_button.pack(side=tk.BOTTOM, pady=5)
+    edit_button.pack(side=tk.BOTTOM, pady=5)
     
-    details = syntax_data[category][item]
-    output = f"--- {item} ---\n\n"
-    output += f"  Syntax: {details['syntax']}\n"
-    output += f"  Example: {details['example']}\n"
-    output += f"  Why Use: {details['description']}\n"
-    highlight_syntax(text_area, output)
+    current_entry = (category, item)
+    view = render_cache.get((category, item), lambda: render_entry(category, item))
+    close_scratchpad()
+    cancel_search_stream()
+    result_highlighter.clear()
+    paint(text_area, view)
     run_button.config(state="normal")  # Enable for all categories
+    edit_button.config(state="normal")
+
+    # The entry shows first; the "See also" list follows once the table is there
+    cancel_see_also()
+    see_also_id = root.after_idle(show_see_also, category, item)
+    prefetcher.neighbours(category, item)
+
+# Function to list the entries most like the one shown, as links under it. The first time,
+# the table may have to be built, which takes seconds on a big corpus: that happens in a
+# background thread and the links are added when it is done.
+@tk_callback("show_see_also")
+def show_see_also(category, item):
+    global see_also_id, see_also_build
+    see_also_id = None
+    if current_entry != (category, item) or scratchpad.active:
+        return  # Something else is showing by now, or the example is being edited
+    if not syntax_data.has_related():
+        if see_also_build is None or not see_also_build.is_alive():
+            see_also_build = threading.Thread(target=syntax_data.related_entries, daemon=True)
+            see_also_build.start()
+        see_also_id = root.after(SEE_ALSO_POLL_MS, wait_for_see_also, category, item)
+        return
+    related = syntax_data.related_entries().get(category, item)
+    if not related:
+        return
+    text_area.insert(tk.END, "\nSee also:\n", "description")
+    for number, (other_category, other_item) in enumerate(related):
+        link = f"see-also-{number}"
+        text_area.insert(tk.END, "  ")
+        text_area.insert(tk.END, f"{other_category}: {other_item}", ("link", link))
+        text_area.insert(tk.END, "\n")
+        text_area.tag_bind(link, "<Button-1>", lambda event, c=other_category, i=other_item: show_sub_syntax(c, i))
+
+# Function to drop a "See also" list still waiting to be shown
+def cancel_see_also():
+    global see_also_id
+    if see_also_id is not None:
+        root.after_cancel(see_also_id)
+        see_also_id = None
+
+@tk_callback("wait_for_see_also")
+def wait_for_see_also(category, item):
+    global see_also_id
+    see_also_id = None
+    if see_also_build.is_alive():
+        see_also_id = root.after(SEE_ALSO_POLL_MS, wait_for_see_also, category, item)
+    elif syntax_data.has_related():
+        show_see_also(category, item)
 
 # Function to display syntax for categories
 def show_syntax(category):
     show_sub_buttons(category)
 
-# Function to search syntax
-def search_syntax():
-    if sub_frame:
-        sub_frame.destroy()
-        sub_frame = None
-    text_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
-    run_button.pack(side=tk.BOTTOM, pady=5)
-    
-    keyword = search_entry.get().strip().lower()
+# Function to search syntax (warn_if_empty is False while searching as the user types)
+@tk_callback("search_syntax")
+def search_syntax(warn_if_empty=True):
+    global search_after_id, current_entry, last_search_query
+    global search_stream, search_stream_id, search_stream_shown, search_stream_cap
+    if search_after_id is not None:
+        root.after_cancel(search_after_id)  # Return or Search during the typing pause: search once
+        search_after_id = None
+    keyword = last_search_query = search_entry.get().strip().lower()
     if not keyword:
-        messagebox.showwarning("Warning", "Please enter a keyword to search.")
+        if warn_if_empty:
+            messagebox.showwarning("Warning", "Please enter a keyword to search.")
         return
-    
-    results = ""
-    found = False
-    for category, items in syntax_data.items():
-        for item, details in items.items():
-            if (keyword in item.lower() or 
-                keyword in details["syntax"].lower() or 
-                keyword in details["example"].lower() or 
-                keyword in details["description"].lower()):
-                results += f"--- {category}: {item} ---\n"
-                results += f"  Syntax: {details['syntax']}\n"
-                results += f"  Example: {details['example']}\n"
-                results += f"  Why Use: {details['description']}\n\n"
-                found = True
-    
-    if found:
-        highlight_syntax(text_area, results)
-        run_button.config(state="disabled")
+
+    hide_sub_frame()
+    close_scratchpad()
+    text_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
+    run_button.pack(side=tk.BOTTOM, pady=5)
+    edit_button.pack(side=tk.BOTTOM, pady=5)
+
+    # Results are formatted as they are shown: the first batch now, the rest streamed in
+    # batches through the event loop up to SEARCH_PAGE_SIZE at a time
+    cancel_search_stream()
+    hits = get_search_index().stream(keyword)
+    top = list(islice(hits, SEARCH_BATCH_SIZE))
+    results = (format_result(category, item, syntax_data[category][item]) for category, item in chain(top, hits))
+    first = list(islice(results, SEARCH_BATCH_SIZE))
+
+    current_entry = None
+    run_button.config(state="disabled")
+    edit_button.config(state="disabled")
+    if first:
+        # Only the visible results are highlighted now; the rest follow in idle time
+        result_highlighter.show(first)
+        search_stream = results
+        search_stream_shown = len(first)
+        search_stream_cap = SEARCH_PAGE_SIZE
+        search_stream_id = root.after(SEARCH_BATCH_MS, stream_search_results)
+        prefetcher.search_hits(top)
     else:
+        result_highlighter.clear()
         text_area.delete(1.0, tk.END)
         text_area.insert(tk.END, f"No results found for '{keyword}'.\n")
-        run_button.config(state="disabled")
+
+# Function to append the next batch of streamed search results
+@tk_callback("stream_search_results")
+def stream_search_results():
+    global search_stream, search_stream_id, search_stream_shown
+    search_stream_id = None
+    wanted = min(SEARCH_BATCH_SIZE, search_stream_cap - search_stream_shown)
+    batch = list(islice(search_stream, wanted))
+    if batch:
+        result_highlighter.append(batch)
+        search_stream_shown += len(batch)
+    if len(batch) < wanted:
+        search_stream = None
+        return
+    if search_stream_shown < search_stream_cap:
+        search_stream_id = root.after(SEARCH_BATCH_MS, stream_search_results)
+        return
+
+    # Page full: offer more only if there is more
+    following = next(search_stream, None)
+    if following is None:
+        search_stream = None
+        return
+    search_stream = chain([following], search_stream)
+    load_more_button.pack(side=tk.BOTTOM, pady=5)
+
+# Function to stream the next page of search results ("Load more" or scrolling to the end)
+@tk_callback("load_more_results")
+def load_more_results():
+    global search_stream_cap, search_stream_id
+    if search_stream is None or search_stream_id is not None:
+        return
+    load_more_button.pack_forget()
+    search_stream_cap = search_stream_shown + SEARCH_PAGE_SIZE
+    search_stream_id = root.after(SEARCH_BATCH_MS, stream_search_results)
+
+# Function to stop streaming search results (a new query or another page replaces them)
+def cancel_search_stream():
+    global search_stream, search_stream_id
+    if search_stream_id is not None:
+        root.after_cancel(search_stream_id)
+        search_stream_id = None
+    search_stream = None
+    load_more_button.pack_forget()
+
+# Function to re-run the search shortly after the user stops typing (keys that leave the query
+# as it was, like arrows and modifiers, are ignored)
+@tk_callback("on_search_key")
+def on_search_key(event):
+    global search_after_id, last_search_query
+    query = search_entry.get().strip().lower()
+    if event.keysym == "Return" or query == last_search_query:
+        return
+    last_search_query = query
+    cancel_search_stream()
+    if search_after_id is not None:
+        root.after_cancel(search_after_id)
+    search_after_id = root.after(SEARCH_DEBOUNCE_MS, lambda: search_syntax(warn_if_empty=False))
+
+# Function to open the search result that was double-clicked
+@tk_callback("open_search_result")
+def open_search_result(event):
+    line = int(text_area.index(f"@{event.x},{event.y}").split(".")[0])
+    entry = result_highlighter.entry_at(line)
+    if entry is not None and entry[0] in syntax_data and entry[1] in syntax_data[entry[0]]:
+        show_sub_syntax(*entry)
 
 # Function to run example code or preview HTML/CSS in browser
+@tk_callback("run_example")
 def run_example():
-    current_text = text_area.get(1.0, tk.END).strip()
-    if not current_text.startswith("---"):
+    if current_entry is None:
         messagebox.showwarning("Warning", "Please select a syntax item to run or preview its example.")
         return
     
-    header = current_text.split("---")[1].split("---")[0].strip()
-    if ": " in header:
-        category, item = header.split(": ", 1)
+    category, item = current_entry
+    if scratchpad.active:
+        example = scratchpad.source()  # The example as edited
     else:
-        category = "Python"  # Default to Python if no category prefix
-        item = header
-    
-    example = syntax_data[category][item]["example"]
+        example = syntax_data[category][item]["example"]
+    language = syntax_data.language(category)
     
-    if category == "Python":
-        output = ""
-        safe_globals = {"__builtins__": {}}  # Restrict built-ins
-        safe_locals = {}
-        try:
-            code = re.sub(r"# Output:.*$", "", example, flags=re.MULTILINE).strip()
-            exec(code, safe_globals, safe_locals)
-            if "print" in code:
-                output += f"Output from {example.splitlines()[0]}:\n"
-                for line in code.splitlines():
-                    if "print(" in line:
-                        var = line.split("print(")[1].rstrip(")")
-                        if var in safe_locals:
-                            output += f"{safe_locals[var]}\n"
-                        else:
-                            output += "Output captured\n"
-            if output:
-                messagebox.showinfo("Run Output", output)
-            else:
-                messagebox.showinfo("Run Output", "Example executed successfully (no output).")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to run example: {str(e)}")
-    elif category in ["HTML", "CSS"]:
-        # Create a temporary HTML file for preview
-        if category == "HTML":
-            full_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>HTML Preview: {item}</title>
-            </head>
-            <body>
-                {example}
-            </body>
-            </html>
-            """
-        else:  # CSS
-            full_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>CSS Preview: {item}</title>
-                <style>{example}</style>
-            </head>
-            <body>
-                <div class="container">
-                    <h1>Sample Heading</h1>
-                    <p>This is a sample paragraph to demonstrate CSS styling.</p>
-                    <button>Hover Me</button>
-                </div>
-            </body>
-            </html>
-            """
-        
-        # Write to a temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as temp_file:
-            temp_file.write(full_content)
-            temp_file_path = temp_file.name
-        
-        # Open in default browser
+    if language == "python":
+        # Runs in a worker process; the result arrives through poll_example_runs
+        example_pool.submit(example, lambda result: show_run_result(item, result), prefetcher.example_code(example))
+        run_button.config(text="Running...")
+        start_run_poll()
+    elif language in ["html", "css"]:
+        show_preview(build_preview_page(language, item, example))
+
+# Function to show a preview page through the local preview server. With auto-reload, a
+# browser tab already showing the live page picks the new page up by itself.
+@traced("show_preview")
+def show_preview(page):
+    global preview_server
+    try:
+        if preview_server is None:
+            preview_server = PreviewServer()
+        page_url = preview_server.publish(page)
+        if not PREVIEW_AUTO_RELOAD:
+            webbrowser.open(page_url)
+        elif not preview_server.live_client_connected():
+            webbrowser.open(preview_server.live_url)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to open preview: {str(e)}")
+
+# Function to start polling for finished example runs, unless that is already going on
+def start_run_poll():
+    global run_poll_id
+    if run_poll_id is None:
+        run_poll_id = root.after(RUN_POLL_MS, poll_example_runs)
+
+# Function to collect finished example runs; reschedules itself while runs are in flight
+@tk_callback("poll_example_runs")
+def poll_example_runs():
+    global run_poll_id
+    example_pool.poll()
+    if example_pool.busy():
+        run_poll_id = root.after(RUN_POLL_MS, poll_example_runs)
+    else:
+        run_poll_id = None
+        run_button.config(text="Run Example")
+
+# Function to report the captured output of a finished example run
+def show_run_result(item, result):
+    if result.error:
+        messagebox.showerror("Error", f"Failed to run example: {result.error}\n\n{result.stdout}")
+    elif not result.ok:
+        messagebox.showerror("Error", f"Failed to run example:\n{result.stdout}{result.stderr}")
+    elif result.stdout or result.stderr:
+        messagebox.showinfo("Run Output", f"Output from {item}:\n{result.stdout}{result.stderr}")
+    else:
+        messagebox.showinfo("Run Output", "Example executed successfully (no output).")
+
+# Function to edit the example of the entry shown, in the text area. Edits are highlighted
+# again as you type; after a pause, Python examples run in the background with their output
+# shown underneath, and HTML/CSS examples update a live preview tab if one is open.
+@tk_callback("open_scratchpad")
+def open_scratchpad():
+    if current_entry is None:
+        return
+    category, item = current_entry
+    cancel_search_stream()
+    cancel_see_also()  # Its links would land in the editable source
+    result_highlighter.clear()
+    language = syntax_data.language(category)
+    scratchpad.load(syntax_data[category][item]["example"], language)
+    edit_button.config(state="disabled")
+    if language == "python":
+        scratch_output.delete(1.0, tk.END)
+        scratch_output.pack(side=tk.BOTTOM, fill=tk.X, padx=10, before=text_area)
+    text_area.focus_set()
+
+# Function to stop editing an example (before text_area shows anything else)
+def close_scratchpad():
+    global scratch_run_id, scratch_next
+    if scratchpad.active:
+        scratchpad.close()
+        scratch_output.pack_forget()
+    scratch_run_id = None
+    scratch_next = None
+
+# Function to run or preview the edited example once typing pauses
+@tk_callback("on_scratch_settled")
+def on_scratch_settled(source):
+    global scratch_next
+    language = scratchpad.language
+    if language == "python":
+        if scratch_run_id is not None:
+            scratch_next = source  # Runs when the current run is done; only the latest edit counts
+        else:
+            start_scratch_run(source)
+    elif language in ["html", "css"] and preview_server is not None and preview_server.live_client_connected():
+        preview_server.publish(build_preview_page(language, current_entry[1], source))
+
+def start_scratch_run(source):
+    global scratch_run_id
+    scratch_run_id = example_pool.submit(source, show_scratch_output)
+    start_run_poll()
+
+# Function to show the output of the scratchpad's background run under the text area
+def show_scratch_output(result):
+    global scratch_run_id, scratch_next
+    if result.job_id != scratch_run_id:
+        return  # From a scratchpad closed since
+    scratch_run_id = None
+    if scratch_next is not None:
+        source, scratch_next = scratch_next, None
+        start_scratch_run(source)  # The code changed while this ran
+        return
+    scratch_output.delete(1.0, tk.END)
+    output = result.stdout + result.stderr
+    if result.error:
+        output = f"{result.error}\n{output}"
+    scratch_output.insert(tk.END, output or "(no output)")
+
+# Function to scan a project folder in a background thread; the report replaces the text area
+# content when it is done
+def start_project_scan(folder):
+    outcome = []
+
+    def scan():
         try:
-            webbrowser.open(f"file://{temp_file_path}")
+            outcome.append(scan_project(folder))
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to open preview: {str(e)}")
-            # Clean up if opening fails
-            os.remove(temp_file_path)
-        # Note: File will persist until manually deleted or system cleanup; could add cleanup logic if needed
-
-# Function to toggle theme
+            outcome.append(e)
+    thread = threading.Thread(target=scan, daemon=True)
+    thread.start()
+    highlight_syntax(text_area, f"Scanning {folder} ...\n")
+    root.after(SCAN_POLL_MS, poll_project_scan, thread, outcome)
+
+# Function to ask for a project folder and scan it
+@tk_callback("choose_project_scan")
+def choose_project_scan():
+    folder = filedialog.askdirectory(title="Choose a project folder to scan", mustexist=True)
+    if folder:
+        start_project_scan(folder)
+
+@tk_callback("poll_project_scan")
+def poll_project_scan(thread, outcome):
+    if thread.is_alive():
+        root.after(SCAN_POLL_MS, poll_project_scan, thread, outcome)
+    elif isinstance(outcome[0], Exception):
+        messagebox.showerror("Error", f"Failed to scan the project: {outcome[0]}")
+    else:
+        show_scan_report(outcome[0])
+
+# Function to list the entries a scanned project uses, each a link to the entry, with where
+@tk_callback("show_scan_report")
+def show_scan_report(result):
+    global current_entry
+    matches = match_entries(syntax_data, result)
+    highlight_syntax(text_area, f"{result.root}: {result.files} files use {len(matches)} entries\n\n")
+    current_entry = None
+    run_button.config(state="disabled")
+    edit_button.config(state="disabled")
+    for number, ((category, item), places) in enumerate(matches):
+        link = f"scan-{number}"
+        text_area.insert(tk.END, f"{category}: {item}", ("link", link))
+        text_area.insert(tk.END, f"  ({len(places)} uses)\n")
+        text_area.tag_bind(link, "<Button-1>", lambda event, c=category, i=item: show_sub_syntax(c, i))
+        for path, line in places[:SCAN_REFS_SHOWN]:
+            text_area.insert(tk.END, f"    {path}:{line}\n")
+        if len(places) > SCAN_REFS_SHOWN:
+            text_area.insert(tk.END, f"    ... and {len(places) - SCAN_REFS_SHOWN} more\n")
+
+# Function to switch to the next theme (light, dark, then any user themes)
+@tk_callback("toggle_theme")
 def toggle_theme():
     global current_theme
-    current_theme = "dark" if current_theme == "light" else "light"
-    theme = themes[current_theme]
-    
-    root.configure(bg=theme["bg"])
-    search_frame.configure(bg=theme["bg"])
-    category_frame.configure(bg=theme["bg"])
-    if sub_frame:
-        sub_frame.configure(bg=theme["bg"])
-    
-    search_label.configure(bg=theme["bg"], fg=theme["fg"])
-    search_entry.configure(bg=theme["text_bg"], fg=theme["text_fg"], insertbackground=theme["fg"])
-    welcome_label.configure(bg=theme["bg"], fg=theme["fg"])
-    
-    python_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
-    html_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
-    css_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
-    theme_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
-    if sub_frame:
-        for widget in sub_frame.winfo_children():
-            if isinstance(widget, tk.Button) or isinstance(widget, tk.Label):
-                widget.configure(bg=theme["button_bg"] if isinstance(widget, tk.Button) else theme["bg"], 
-                                 fg=theme["button_fg"] if isinstance(widget, tk.Button) else theme["fg"])
-    
-    search_button.configure(bg=theme["button_bg"], fg=theme["button_fg"])
-    run_button.configure(bg=theme["button_bg"], fg=theme["button_fg"])
-    exit_btn.configure(bg="#ff6666", fg="white")
-    
-    text_area.configure(bg=theme["text_bg"], fg=theme["text_fg"], insertbackground=theme["fg"])
-    highlight_syntax(text_area, text_area.get(1.0, tk.END))
+    names = list(themes)
+    current_theme = names[(names.index(current_theme) + 1) % len(names)]
+    theme_registry.apply(themes[current_theme])
 
 # Create the main window
 root = tk.Tk()
+
+# Themes from the user's themes file join the built-in ones; a broken file is reported once the
+# window is up
+try:
+    load_user_themes()
+except (OSError, ValueError) as e:
+    root.after_idle(messagebox.showwarning, "Warning", f"Ignoring user themes: {e}")
+
+install_stall_monitor(root, options.stall_ms)
+prefetcher = Prefetcher(root, syntax_data, render_cache, render_entry)
 root.title("Syntax Reference Tool")
 root.geometry("900x700")
-root.configure(bg=themes["light"]["bg"])
+theme_registry.register(root, "frame")
 
 # Frame for search bar (top)
-search_frame = tk.Frame(root, bg=themes["light"]["bg"])
+search_frame = theme_registry.register(tk.Frame(root), "frame")
 search_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
 
-search_label = tk.Label(search_frame, text="Search Syntax:", font=("Arial", 12), bg=themes["light"]["bg"], fg=themes["light"]["fg"])
+search_label = tk.Label(search_frame, text="Search Syntax:", font=("Arial", 12))
+theme_registry.register(search_label, "label")
 search_label.pack(side=tk.LEFT, padx=5)
 
-search_entry = tk.Entry(search_frame, width=30, font=("Arial", 12), bg=themes["light"]["text_bg"], fg=themes["light"]["fg"])
+search_entry = tk.Entry(search_frame, width=30, font=("Arial", 12))
+theme_registry.register(search_entry, "entry")
 search_entry.pack(side=tk.LEFT, padx=5)
+search_entry.bind("<KeyRelease>", on_search_key)
+search_entry.bind("<Return>", lambda event: search_syntax())
 
-search_button = tk.Button(search_frame, text="Search", font=("Arial", 12), command=search_syntax, bg=themes["light"]["button_bg"], fg=themes["light"]["button_fg"])
+search_button = tk.Button(search_frame, text="Search", font=("Arial", 12), command=search_syntax)
+theme_registry.register(search_button, "button")
 search_button.pack(side=tk.LEFT, padx=5)
 
 # Frame for category buttons (left side)
-category_frame = tk.Frame(root, width=200, bg=themes["light"]["bg"])
+category_frame = theme_registry.register(tk.Frame(root, width=200), "frame")
 category_frame.pack(side=tk.LEFT, fill=tk.Y, padx=10, pady=10)
 
-welcome_label = tk.Label(category_frame, text="Syntax Categories:", font=("Arial", 14, "bold"), bg=themes["light"]["bg"], fg=themes["light"]["fg"])
+welcome_label = tk.Label(category_frame, text="Syntax Categories:", font=("Arial", 14, "bold"))
+theme_registry.register(welcome_label, "label")
 welcome_label.pack(pady=10)
 
-# "Python" button
-python_btn = tk.Button(category_frame, text="Python", font=("Arial", 12), 
-                       command=lambda: show_syntax("Python"), anchor="w", width=20,
-                       bg=themes["light"]["button_bg"], fg=themes["light"]["button_fg"])
-python_btn.pack(pady=5)
-
-# "HTML" button
-html_btn = tk.Button(category_frame, text="HTML", font=("Arial", 12), 
-                     command=lambda: show_syntax("HTML"), anchor="w", width=20,
-                     bg=themes["light"]["button_bg"], fg=themes["light"]["button_fg"])
-html_btn.pack(pady=5)
-
-# "CSS" button
-css_btn = tk.Button(category_frame, text="CSS", font=("Arial", 12), 
-                    command=lambda: show_syntax("CSS"), anchor="w", width=20,
-                    bg=themes["light"]["button_bg"], fg=themes["light"]["button_fg"])
-css_btn.pack(pady=5)
-
-theme_btn = tk.Button(category_frame, text="Toggle Dark/Light Mode", font=("Arial", 12), command=toggle_theme,
-                      bg=themes["light"]["button_bg"], fg=themes["light"]["button_fg"])
+# One button per category in the manifest
+for category in syntax_data:
+    category_btn = tk.Button(category_frame, text=category, font=("Arial", 12),
+                             command=lambda c=category: show_syntax(c), anchor="w", width=20)
+    theme_registry.register(category_btn, "button")
+    category_btn.pack(pady=5)
+
+theme_btn = tk.Button(category_frame, text="Toggle Dark/Light Mode", font=("Arial", 12), command=toggle_theme)
+theme_registry.register(theme_btn, "button")
 theme_btn.pack(pady=5)
 
+scan_btn = tk.Button(category_frame, text="Scan Project...", font=("Arial", 12), command=choose_project_scan)
+theme_registry.register(scan_btn, "button")
+scan_btn.pack(pady=5)
+
 exit_btn = tk.Button(category_frame, text="Exit", font=("Arial", 12), command=root.quit, bg="#ff6666", fg="white")
 exit_btn.pack(pady=20)
 
 # Text area for syntax and examples (right side)
-text_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=80, height=40, font=("Courier", 12),
-                                      bg=themes["light"]["text_bg"], fg=themes["light"]["text_fg"])
+text_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=80, height=40, font=("Courier", 12))
+theme_registry.register(text_area, "text")
+theme_registry.register_tags(text_area)
 text_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
+result_highlighter = LazyHighlighter(text_area, syntax_data.language)
+scratchpad = Scratchpad(text_area, on_scratch_settled)
+text_area.bind("<KeyRelease>", scratchpad.on_edit)
+text_area.bind("<Double-Button-1>", open_search_result)
+
+# Output of edited Python examples, under the text area while editing
+scratch_output = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=80, height=8, font=("Courier", 12))
+theme_registry.register(scratch_output, "text")
+
+# Function to keep the scrollbar in step, highlight newly visible results and load more
+# results on reaching the end
+def on_text_scroll(first, last):
+    text_area.vbar.set(first, last)
+    result_highlighter.on_scroll()
+    if float(last) >= 1.0:
+        load_more_results()
+
+text_area.configure(yscrollcommand=on_text_scroll)
+text_area.tag_configure("link", underline=True)
+text_area.tag_bind("link", "<Enter>", lambda event: text_area.config(cursor="hand2"))
+text_area.tag_bind("link", "<Leave>", lambda event: text_area.config(cursor=""))
 
 # Run button (below text area)
-run_button = tk.Button(root, text="Run Example", font=("Arial", 12), command=run_example, state="disabled",
-                       bg=themes["light"]["button_bg"], fg=themes["light"]["button_fg"])
+run_button = tk.Button(root, text="Run Example", font=("Arial", 12), command=run_example, state="disabled")
+theme_registry.register(run_button, "button")
 run_button.pack(side=tk.BOTTOM, pady=5)
 
+edit_button = tk.Button(root, text="Edit Example", font=("Arial", 12), command=open_scratchpad, state="disabled")
+theme_registry.register(edit_button, "button")
+edit_button.pack(side=tk.BOTTOM, pady=5)
+
+# Shown under the results when a search has more than SEARCH_PAGE_SIZE matches
+load_more_button = tk.Button(root, text="Load more results", font=("Arial", 12), command=load_more_results)
+theme_registry.register(load_more_button, "button")
+
 # Initial message
 highlight_syntax(text_area, "Welcome to the Syntax Reference Tool!\n\nClick 'Python', 'HTML', or 'CSS' to explore syntax or use the search bar.\n")
+if options.scan:
+    start_project_scan(options.scan)
+root.after(CORPUS_POLL_MS, watch_corpus)
 
 # Start the application
-root.mainloop()
\ No newline at end of file
+root.mainloop()
+tracer.counter("prefetch", **prefetcher.stats())  # Render cache and pre-compiled example hit rates
+example_pool.shutdown()
+syntax_data.save_snapshot()  # Lets the next launch skip index building if this one built it
+if preview_server is not None:
+    preview_server.shutdown()
\ No newline at end of file
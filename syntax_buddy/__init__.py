@@ -0,0 +1,3 @@
+# Syntax Buddy core: syntax data, search, rendering and example running, usable without a display.
+# Nothing in this package imports tkinter or webbrowser; the GUI lives in "my syntax buddy.py"
+# and the command line interface in syntax_buddy.cli.
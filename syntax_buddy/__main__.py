@@ -0,0 +1,7 @@
+# Allows "python -m syntax_buddy lookup Python 'For Loop'"
+
+import sys
+
+from syntax_buddy.cli import main
+
+sys.exit(main())
@@ -0,0 +1,190 @@
+# Example worker process started by runner.ExamplePool as "python -I _worker.py CPU_SECONDS MEMORY_MB".
+# Reads one JSON job per line on stdin, runs it with stdout/stderr captured, and writes one
+# JSON result per line. Deliberately imports nothing from syntax_buddy so it starts fast.
+# Whatever a job changes in the interpreter is put back before the next one (see save_state).
+# Examples run under an audit hook (see install_audit_hook) that keeps their file access to the
+# scratch directory and stops them starting processes or opening sockets.
+
+import base64
+import builtins
+import io
+import json
+import marshal
+import os
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from operator import is_
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the parent's wall-clock timeout still applies
+    resource = None
+
+MAX_OUTPUT = 64 * 1024  # Characters of stdout/stderr sent back per job
+
+# Audit events (or prefixes) examples may not raise at all: starting processes, signalling
+# them (the GUI included), networking, raising the rlimits, and loading native code or adding
+# audit hooks (either could get round this one)
+BLOCKED_EVENTS = ("os.system", "os.exec", "os.spawn", "os.posix_spawn", "os.fork", "os.startfile", "pty.spawn",
+                  "subprocess.Popen", "_winapi.CreateProcess", "os.kill", "os.killpg", "signal.pthread_kill",
+                  "socket.", "resource.setrlimit", "resource.prlimit", "ctypes.", "sys.addaudithook")
+# Audit events that change files; every path they name must be in the scratch directory
+WRITE_EVENTS = {"os.chmod", "os.chown", "os.link", "os.mkdir", "os.remove", "os.rename", "os.rmdir",
+                "os.symlink", "os.truncate", "os.utime", "shutil.rmtree"}
+# Audit events that look at files; every path they name must be readable
+READ_EVENTS = {"os.listdir", "os.scandir"}
+OPEN_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+
+def cpu_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+# Function to cap this process at `seconds` more CPU time, hard limit included, so examples
+# cannot lift it (SIGXCPU at the soft limit, SIGKILL a second later); set once, before the audit
+# hook. Returns the soft limit, or None without rlimits.
+def limit_cpu(seconds):
+    if resource is None:
+        return None
+    soft = int(cpu_used() + seconds) + 1
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard - 1)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+    return soft
+
+def limit_memory(megabytes):
+    if resource is None or not hasattr(resource, "RLIMIT_AS"):
+        return
+    limit = megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+# Function to check that every path among an audit event's arguments lies under one of `roots`
+# (file descriptors pass: they were opened by a call that was checked)
+def paths_inside(args, roots):
+    for arg in args:
+        if isinstance(arg, (str, bytes, os.PathLike)):
+            path = os.path.abspath(os.fsdecode(arg))
+            if not any(path == root or path.startswith(root + os.sep) for root in roots):
+                return False
+    return True
+
+# Function to sandbox the examples this process runs from now on: they may write only in
+# scratch_dir, read only there and in the Python installation (to import the standard library),
+# and may not start processes, open sockets or load native code. An audit hook cannot be
+# removed once added; the rlimits and the parent's wall-clock timeout still cover the rest.
+def install_audit_hook(scratch_dir):
+    writable = [os.path.abspath(scratch_dir)]
+    readable = writable + sorted({os.path.abspath(prefix) for prefix in
+                                  (sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix)})
+
+    def hook(event, args):
+        if event == "open":
+            path, mode, flags = args
+            writing = any(flag in mode for flag in "wax+") if mode else bool(flags & OPEN_WRITE_FLAGS)
+            allowed = paths_inside([path], writable if writing else readable)
+        elif event in WRITE_EVENTS:
+            allowed = paths_inside(args, writable)
+        elif event in READ_EVENTS:
+            allowed = paths_inside(args, readable)
+        else:
+            allowed = not event.startswith(BLOCKED_EVENTS)
+        if not allowed:
+            raise PermissionError(f"examples may not do this ({event}: {args[0] if args else ''!r})")
+
+    # Temporary files go to the scratch directory, where examples may write
+    os.environ["TMPDIR"] = scratch_dir
+    sys.addaudithook(hook)
+
+def truncate(text):
+    if len(text) > MAX_OUTPUT:
+        return text[:MAX_OUTPUT] + "\n... output truncated ...\n"
+    return text
+
+# Function to record what an example could change for the jobs after it: the working directory,
+# the environment, which modules are loaded and every loaded module's attributes (builtins and
+# sys included), and the interpreter settings examples commonly touch
+def save_state():
+    return {"cwd": os.getcwd(), "environ": dict(os.environ), "modules": dict(sys.modules),
+            "attributes": {name: dict(vars(module)) for name, module in sys.modules.items()
+                           if hasattr(module, "__dict__")},
+            "lists": {name: list(getattr(sys, name)) for name in ("path", "meta_path", "path_hooks", "argv")},
+            "recursion_limit": sys.getrecursionlimit()}
+
+# Function to put back what save_state() recorded, so each job starts from the same state
+def restore_state(state):
+    sys.settrace(None)
+    sys.setprofile(None)
+    sys.setrecursionlimit(state["recursion_limit"])
+    for name in sys.modules.keys() - state["modules"].keys():
+        del sys.modules[name]  # Imported by the example: imported afresh next time
+    sys.modules.update(state["modules"])
+    for name, saved in state["attributes"].items():
+        current = vars(state["modules"][name])
+        if len(current) == len(saved) and all(map(is_, current, saved)) and all(map(is_, current.values(),
+                                                                                   saved.values())):
+            continue  # Untouched (the usual case): same names, in the same order, bound to the same objects
+        for key in current.keys() - saved.keys():
+            del current[key]
+        for key, value in saved.items():
+            if current.get(key, saved) is not value:
+                current[key] = value
+    for name, saved in state["lists"].items():
+        getattr(sys, name)[:] = saved
+    if os.environ != state["environ"]:
+        os.environ.clear()
+        os.environ.update(state["environ"])
+    os.chdir(state["cwd"])
+
+def run(job, state):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    ok = True
+    error = None
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            if "code" in job:
+                code = marshal.loads(base64.b64decode(job["code"]))  # Compiled by the parent
+            else:
+                code = compile(job["source"], "<example>", "exec")
+            exec(code, namespace)
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except BaseException as e:
+            ok = False
+            error = e
+        finally:
+            restore_state(state)
+    if error is not None:
+        # Skip this frame so the traceback starts at the example
+        stderr.write("".join(traceback.format_exception(type(error), error, error.__traceback__.tb_next)))
+    return {"id": job["id"], "ok": ok, "stdout": truncate(stdout.getvalue()),
+            "stderr": truncate(stderr.getvalue())}
+
+def main():
+    cpu_seconds = float(sys.argv[1])
+    limit_memory(int(sys.argv[2]))
+    # The CPU limit cannot be raised again per job, so the worker gets two jobs' worth and
+    # retires (the pool starts a fresh one) once less than one job's worth is left
+    cpu_limit = limit_cpu(2 * cpu_seconds)
+
+    # Keep private copies of the protocol pipes; examples get /dev/null on fds 0-2
+    requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    replies = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    install_audit_hook(os.getcwd())  # The pool starts us in its scratch directory
+    state = save_state()
+
+    for line in requests:
+        reply = run(json.loads(line), state)
+        reply["retire"] = cpu_limit is not None and cpu_used() + cpu_seconds > cpu_limit
+        replies.write(json.dumps(reply) + "\n")
+        replies.flush()
+        if reply["retire"]:
+            return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Helpers shared by the batch commands (verify, export, scan) and the snapshot: replacing a file
+# in one step, and spreading batches of work over a process pool when there is enough of it.
+# Imported at startup (through snapshot.py), so the process pool machinery is only imported
+# once a pool is started.
+
+import os
+from collections import deque
+from contextlib import contextmanager
+
+# Function to write a file through a temporary one renamed over it when done, so readers (and
+# a write interrupted half way) never leave a half-written file behind. Yields the open file.
+@contextmanager
+def replace_file(path, mode="w"):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, mode, encoding=None if "b" in mode else "utf-8") as new_file:
+            yield new_file
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+# Function to resolve a workers option: None (or 0) means one per CPU
+def worker_count(workers):
+    return workers or os.cpu_count() or 1
+
+# Function to cut a list of jobs into batches of `size`
+def split_batches(jobs, size):
+    return [jobs[start:start + size] for start in range(0, len(jobs), size)]
+
+# Runs function(batch) for batches of jobs handed to submit(). Batches are held back until they
+# add up to inline_limit jobs; from then on (given more than one worker) they run in a process
+# pool, and below it they run in this process when results() is called, as starting processes
+# would cost more than it saves. Use it as a context manager so the pool is shut down.
+class BatchPool:
+    def __init__(self, function, inline_limit, workers=None):
+        self.function = function
+        self.inline_limit = inline_limit
+        self.workers = worker_count(workers)
+        self.executor = None
+        self.held = []  # Batches not started yet
+        self.held_jobs = 0
+        self.futures = deque()  # Batches running in the pool, in submit order
+
+    def submit(self, batch):
+        if self.executor is not None:
+            self.futures.append(self.executor.submit(self.function, batch))
+            return
+        self.held.append(batch)
+        self.held_jobs += len(batch)
+        if self.held_jobs >= self.inline_limit and self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            for held in self.held:
+                self.futures.append(self.executor.submit(self.function, held))
+            self.held = []
+
+    # Yields the results of the oldest pool batches while more than `running` are unfinished, so
+    # a caller that submits as it goes keeps a bounded amount of work in flight
+    def throttle(self, running):
+        while len(self.futures) > running:
+            yield self.futures.popleft().result()
+
+    # Yields the result of every batch not yet returned, in submit order
+    def results(self):
+        yield from self.throttle(0)
+        while self.held:
+            yield self.function(self.held.pop(0))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
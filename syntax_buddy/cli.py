@@ -0,0 +1,192 @@
+# Command line interface: syntax-buddy lookup|search|list|verify|serve|export|scan
+# Kept light on imports so editors and shell scripts can call it in tight loops.
+
+import argparse
+import os
+import sys
+import time
+
+from syntax_buddy.corpus import DATA_DIR, Corpus
+from syntax_buddy.lexer import lex_document
+from syntax_buddy.render import format_entry, format_result
+from syntax_buddy.trace import tracer
+
+ANSI_COLOURS = {"keyword": "\033[34m", "comment": "\033[32m", "string": "\033[33m", "description": "\033[36m"}
+ANSI_RESET = "\033[0m"
+
+# Function to colour a formatted document with ANSI escapes, using the same lexers as the GUI
+def colourize(content, corpus, category=None):
+    spans = sorted((start, end, tag)
+                   for tag, ranges in lex_document(content, corpus.language, category).items()
+                   for start, end in ranges)
+    pieces = []
+    position = 0
+    for start, end, tag in spans:
+        if start < position:
+            continue
+        pieces += [content[position:start], ANSI_COLOURS[tag], content[start:end], ANSI_RESET]
+        position = end
+    pieces.append(content[position:])
+    return "".join(pieces)
+
+# Function to print a formatted document, coloured when asked to
+def emit(args, corpus, content, category=None):
+    if args.color == "always" or (args.color == "auto" and sys.stdout.isatty() and "NO_COLOR" not in os.environ):
+        content = colourize(content, corpus, category)
+    sys.stdout.write(content)
+    return 0
+
+# Function to resolve a user-typed category name, printing the known ones if it is not found
+def find_category(corpus, name):
+    category = corpus.find_category(name)
+    if category is not None:
+        return category
+    print(f"Unknown category '{name}'. Categories: {', '.join(corpus)}", file=sys.stderr)
+    return None
+
+def command_lookup(args, corpus):
+    category = find_category(corpus, args.category)
+    if category is None:
+        return 1
+    found = corpus.find(category, args.item)
+    if found is None:
+        print(f"No entry '{args.item}' in {category}. Try: syntax-buddy list {category}", file=sys.stderr)
+        return 1
+    category, item = found
+    return emit(args, corpus, format_entry(item, corpus[category][item]), category)
+
+def command_search(args, corpus):
+    hits = corpus.search_index().search(args.query, limit=args.limit)
+    if hits:
+        emit(args, corpus, "".join(format_result(category, item, corpus[category][item])
+                                   for category, item in hits))
+    else:
+        print(f"No results found for '{args.query}'.", file=sys.stderr)
+    sys.stdout.flush()
+    corpus.save_snapshot()  # After the output, so writing it does not delay the results
+    return 0 if hits else 1
+
+def command_list(args, corpus):
+    if args.category is None:
+        names = list(corpus)
+    else:
+        category = find_category(corpus, args.category)
+        if category is None:
+            return 1
+        names = list(corpus[category])
+    sys.stdout.write("".join(f"{name}\n" for name in names))
+    return 0
+
+def command_verify(args, corpus):
+    from syntax_buddy.verify import VERIFY_CACHE_PATH, format_report, verify_corpus
+
+    categories = []
+    for name in args.categories:
+        category = find_category(corpus, name)
+        if category is None:
+            return 1
+        categories.append(category)
+    start = time.perf_counter()
+    results = verify_corpus(corpus, categories, args.workers, None if args.no_cache else VERIFY_CACHE_PATH,
+                            use_cached=not args.recheck)
+    sys.stdout.write(format_report(results, time.perf_counter() - start, args.verbose))
+    return 1 if any(result.ok is False for result in results) else 0
+
+def command_serve(args, corpus):
+    from syntax_buddy.server import serve
+
+    serve(corpus, args.host, args.port)
+    return 0
+
+def command_export(args, corpus):
+    from syntax_buddy.export import export_corpus
+
+    categories = []
+    for name in args.categories:
+        category = find_category(corpus, name)
+        if category is None:
+            return 1
+        categories.append(category)
+    start = time.perf_counter()
+    counts = export_corpus(corpus, args.output, categories, args.cheat_sheet, args.workers, args.force)
+    print(f"Exported to {args.output}: {counts['rendered']} entries rendered, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed in {time.perf_counter() - start:.1f} s")
+    return 0
+
+def command_scan(args, corpus):
+    from syntax_buddy.scan import format_scan_report, match_entries, scan_project
+
+    if not os.path.isdir(args.folder):
+        print(f"Not a folder: {args.folder}", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    result = scan_project(args.folder, args.workers, None if args.no_cache else "", use_cached=not args.rescan)
+    sys.stdout.write(format_scan_report(result, match_entries(corpus, result), time.perf_counter() - start,
+                                        args.refs))
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="syntax-buddy",
+                                     description="Look up Python, HTML and CSS syntax from the command line.")
+    parser.add_argument("--data", default=DATA_DIR, help="folder with manifest.json and the language packs")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace of this run to FILE")
+    parser.add_argument("--color", choices=("auto", "always", "never"), default="auto",
+                        help="colour the output (default: when printing to a terminal)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    lookup = commands.add_parser("lookup", help="show one entry, e.g. lookup Python \"For Loop\"")
+    lookup.add_argument("category")
+    lookup.add_argument("item")
+    lookup.set_defaults(handler=command_lookup)
+
+    search = commands.add_parser("search", help="search every entry, best matches first")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=None, help="show at most this many results")
+    search.set_defaults(handler=command_search)
+
+    listing = commands.add_parser("list", help="list the categories, or the items of one category")
+    listing.add_argument("category", nargs="?")
+    listing.set_defaults(handler=command_list)
+
+    verify = commands.add_parser("verify", help="run every Python example and check every HTML/CSS example")
+    verify.add_argument("categories", nargs="*", metavar="category", help="only verify these categories")
+    verify.add_argument("--workers", type=int, default=None, help="processes to use (default: one per CPU)")
+    verify.add_argument("--recheck", action="store_true", help="check every entry again, ignoring cached results")
+    verify.add_argument("--no-cache", action="store_true", help="neither read nor write the results cache")
+    verify.add_argument("--verbose", "-v", action="store_true", help="list passing entries too")
+    verify.set_defaults(handler=command_verify)
+
+    server = commands.add_parser("serve", help="answer lookups and searches over HTTP/JSON (for editor plugins)")
+    server.add_argument("--host", default="127.0.0.1", help="address to listen on (default: localhost only)")
+    server.add_argument("--port", type=int, default=8765, help="port to listen on (0 picks a free one)")
+    server.set_defaults(handler=command_serve)
+
+    export = commands.add_parser("export", help="write the corpus out as a static HTML site or cheat sheets")
+    export.add_argument("output", help="folder to write to; exporting into it again only redoes changed entries")
+    # An option rather than a positional list, which argparse would not fill after --cheat-sheet and the like
+    export.add_argument("--category", dest="categories", action="append", default=[],
+                        help="only export this category (repeat for more)")
+    export.add_argument("--cheat-sheet", action="store_true", help="one printable page per category instead of a site")
+    export.add_argument("--workers", type=int, default=None, help="processes to use (default: one per CPU)")
+    export.add_argument("--force", action="store_true", help="render every entry again")
+    export.set_defaults(handler=command_export)
+
+    scan = commands.add_parser("scan", help="list the entries a project's .py, .html and .css files use, and where")
+    scan.add_argument("folder")
+    scan.add_argument("--refs", type=int, default=5, help="file:line references to show per entry")
+    scan.add_argument("--workers", type=int, default=None, help="processes to use (default: one per CPU)")
+    scan.add_argument("--rescan", action="store_true", help="parse every file again, ignoring cached results")
+    scan.add_argument("--no-cache", action="store_true", help="neither read nor write the results cache")
+    scan.set_defaults(handler=command_scan)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        tracer.enable(args.trace)
+    try:
+        corpus = Corpus(args.data)
+    except OSError as e:
+        print(f"Cannot read syntax data from {args.data}: {e}", file=sys.stderr)
+        return 2
+    return args.handler(args, corpus)
@@ -0,0 +1,232 @@
+# Syntax corpus: language packs on disk, loaded lazily per category (from the startup snapshot
+# when there is an up-to-date one, see snapshot.py)
+
+import json
+import os
+import threading
+from collections.abc import Mapping
+
+from syntax_buddy.snapshot import Snapshot, load_snapshot, snapshot_path, source_digest, source_stats, write_snapshot
+from syntax_buddy.store import PackStore
+from syntax_buddy.trace import traced
+
+# Folder holding manifest.json and one JSON language pack per category
+DATA_DIR = os.environ.get("SYNTAX_BUDDY_DATA",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+# Syntax entries read from language packs on disk. Only the manifest is read at startup;
+# a category's entries are loaded the first time that category is looked up, into a read-only
+# PackStore (store.py) that maps item -> {"syntax", "example", "description"}. Packs edited
+# while it is in use are picked up by changed_packs() and reload().
+class Corpus(Mapping):
+    def __init__(self, data_dir=DATA_DIR, use_snapshot=True):
+        self.data_dir = data_dir
+        with open(os.path.join(data_dir, "manifest.json"), "rb") as manifest_file:
+            manifest_bytes = manifest_file.read()
+        self.packs = {pack["category"]: pack for pack in json.loads(manifest_bytes)["packs"]}
+        self.loaded = {}
+        self.listeners = []
+        self.snapshot = None
+        self.index = None  # Search index, once asked for
+        self.related = None  # "See also" table, once asked for
+        self.build_lock = threading.RLock()  # The index and table may be built on a worker thread
+        self.unsaved = False  # True when either was built rather than read from the snapshot
+        self.snapshot_path = snapshot_path(data_dir) if use_snapshot else None
+        self.digest = None  # Digest of the packs as loaded, if known; None once one is reloaded
+        self.stats = None
+        self.stale = set()  # Categories reloaded since the snapshot was written
+        self.pack_stats = {category: self.pack_stat(category) for category in self.packs}
+        if self.snapshot_path is not None:
+            try:
+                self.stats = source_stats(data_dir, self.packs)
+                self.snapshot, self.digest = load_snapshot(self.snapshot_path, data_dir, manifest_bytes,
+                                                           self.packs, self.stats)
+            except OSError:
+                self.snapshot_path = None  # A missing pack is reported when it is opened
+
+    def __getitem__(self, category):
+        if category not in self.loaded:
+            self.loaded[category] = self.read_pack(category)
+        return self.loaded[category]
+
+    @traced("corpus.read_pack")
+    def read_pack(self, category):
+        if self.snapshot is not None and category not in self.stale and self.snapshot.has_entries(category):
+            return self.snapshot.entries(category)
+        with open(os.path.join(self.data_dir, self.packs[category]["file"]), encoding="utf-8") as pack_file:
+            return PackStore.from_entries(json.load(pack_file)["entries"])
+
+    # (size, mtime) of a category's pack file, or None if it cannot be read
+    def pack_stat(self, category):
+        try:
+            status = os.stat(os.path.join(self.data_dir, self.packs[category]["file"]))
+        except OSError:
+            return None
+        return status.st_size, status.st_mtime_ns
+
+    # Categories whose pack file changed size or modification time since it was last read; cheap
+    # enough to call every second. New or removed packs in the manifest still need a restart.
+    def changed_packs(self):
+        return [category for category in self.packs if self.pack_stat(category) != self.pack_stats[category]]
+
+    # Registers callback(category, items) to hear about content changes: items is the set of
+    # entries added, changed or removed, or None when the whole category may have changed
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    # Re-reads a category's pack from disk and applies just what changed (see read_reload and
+    # apply_reload); returns the entries added, changed or removed
+    def reload(self, category):
+        return self.apply_reload(self.read_reload(category))
+
+    # Reads an edited pack and works out which entries were added, changed or removed, by
+    # comparing it with the pack as loaded (or as the search index has it). Changes nothing, so
+    # the slow part of a reload (parsing the pack) can run on a worker thread; pass the result to
+    # apply_reload(). Raises OSError or ValueError if the pack cannot be read.
+    @traced("corpus.read_reload")
+    def read_reload(self, category):
+        stat = self.pack_stats[category] = self.pack_stat(category)  # An edit during the read shows up next time
+        with open(os.path.join(self.data_dir, self.packs[category]["file"]), "rb") as pack_file:
+            pack = PackStore.from_entries(json.load(pack_file)["entries"])
+        old = self.loaded.get(category)
+        if old is None and self.snapshot is not None and category not in self.stale \
+                and self.snapshot.has_entries(category):
+            old = self.snapshot.entries(category)
+        if old is not None:
+            items = old.changed_items(pack)
+        elif self.index is not None:
+            items = self.index.changed_items(category, pack)
+        else:
+            items = None  # Nothing built from it yet
+        if self.index is not None:
+            self.index.build_ids()  # Here rather than in apply_reload the first time
+        return category, pack, items, stat
+
+    # Swaps in a pack read by read_reload(), patches the search index and tells the listeners
+    # (category, items); takes milliseconds. Returns items.
+    @traced("corpus.apply_reload")
+    def apply_reload(self, reloaded):
+        category, pack, items, stat = reloaded
+        if items is None and self.index is not None:
+            items = self.index.changed_items(category, pack)  # Built since the pack was read
+        if self.index is not None and items:
+            self.index.update(category, items, pack)  # Reads the old entries, so before the swap
+            self.unsaved = True
+        self.loaded[category] = pack
+        if self.stats is not None:
+            name = self.packs[category]["file"]
+            self.stats = [(name, *stat) if isinstance(entry, tuple) and entry[0] == name else entry
+                          for entry in self.stats]
+        if items is not None and not items:
+            return items  # Saved without changes
+
+        # The snapshot's copy of this pack, its index and its "See also" table are out of date
+        # now; its compiled examples are keyed by source, so they still hold
+        self.stale.add(category)
+        if self.related is not None and items is not None:
+            self.related.invalidate({(category, item) for item in items})  # Caught up by related_entries()
+        else:
+            self.related = None
+        self.digest = None
+        for callback in self.listeners:
+            callback(category, items)
+        return items
+
+    # Search index over every pack, read from the snapshot when there is one. A freshly built
+    # index is kept so save_snapshot() can write it out once the caller has time.
+    def search_index(self):
+        with self.build_lock:
+            if self.index is None:
+                if self.snapshot is not None and not self.stale:
+                    self.index = self.snapshot.search_index(self)
+                else:
+                    from syntax_buddy.search import SearchIndex
+
+                    self.index = SearchIndex(self)
+                    self.unsaved = True
+            return self.index
+
+    # "See also" table (syntax_buddy.related), read from the snapshot when it has one, and
+    # brought up to date with packs reloaded since. Building or refreshing it takes seconds on a
+    # big corpus, so a GUI can call this on a worker thread once has_related() says it would
+    # have to.
+    def related_entries(self):
+        with self.build_lock:
+            if self.related is None:
+                if self.snapshot is not None and not self.stale and self.snapshot.has_related():
+                    self.related = self.snapshot.related_entries()
+                else:
+                    from syntax_buddy.related import RelatedEntries
+
+                    self.related = RelatedEntries(self.search_index())
+                    self.unsaved = self.unsaved or self.related.state() is not None
+            elif self.related.needs_refresh():
+                self.related.refresh(self.search_index())
+            return self.related
+
+    # True when related_entries() can answer without building or refreshing the table
+    def has_related(self):
+        if self.related is not None:
+            return not self.related.needs_refresh()
+        return self.snapshot is not None and not self.stale and self.snapshot.has_related()
+
+    # Writes a snapshot if search_index() or related_entries() had to build something (takes a
+    # second or two on a large corpus, so call it when nobody is waiting, e.g. at exit)
+    def save_snapshot(self):
+        if not self.unsaved or self.snapshot_path is None:
+            return
+        self.unsaved = False
+        related = self.related.state() if self.related is not None else None
+        if related is None and self.snapshot is not None and not self.stale and self.snapshot.has_related():
+            related = self.snapshot.section("related")
+        try:
+            if self.digest is None:
+                # Not hashed at startup (there was no snapshot) or packs were reloaded since: only
+                # save if no pack changed on disk since it was read
+                if self.stats is None or source_stats(self.data_dir, self.packs) != self.stats:
+                    return
+                with open(os.path.join(self.data_dir, "manifest.json"), "rb") as manifest_file:
+                    self.digest = source_digest(self.data_dir, manifest_file.read(), self.packs)
+            write_snapshot(self.snapshot_path, self.digest, self.stats, self, self.search_index(), related)
+            self.snapshot = Snapshot(self.snapshot_path)
+            self.stale = set()
+        except OSError:
+            pass  # Read-only location; the next launch builds them again
+
+    # Marshalled code object for a Python example from the snapshot, or None
+    def example_code(self, source):
+        if self.snapshot is None:
+            return None
+        return self.snapshot.example_code(source)
+
+    def __contains__(self, category):
+        return category in self.packs
+
+    def __iter__(self):
+        return iter(self.packs)
+
+    def __len__(self):
+        return len(self.packs)
+
+    def language(self, category):
+        return self.packs.get(category, {}).get("language")
+
+    # Resolves a user-typed category name case-insensitively; returns the category or None
+    def find_category(self, name):
+        for known in self.packs:
+            if known.lower() == name.lower():
+                return known
+        return None
+
+    # Resolves user-typed names case-insensitively; returns (category, item) or None
+    def find(self, category, item):
+        category = self.find_category(category)
+        if category is None:
+            return None
+        items = self[category]
+        if item in items:
+            return category, item
+        for known in items:
+            if known.lower() == item.lower():
+                return category, known
+        return None
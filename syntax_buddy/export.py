@@ -0,0 +1,216 @@
+# Static HTML export of the corpus: a browsable site (an index, a page per category and a page
+# per entry, with a live preview for HTML/CSS examples) or a printable single-page cheat sheet
+# per category. Entries are highlighted with the same lexers as the app and previews use the
+# same pages as "Run Example". Pages are rendered across a process pool, and a state file in
+# the output folder records a content hash per entry, so a re-export only renders the entries
+# that changed (and deletes the pages of removed ones).
+
+import hashlib
+import html
+import json
+import os
+import re
+
+from syntax_buddy.batch import BatchPool, replace_file, split_batches
+from syntax_buddy.lexer import lex_document
+from syntax_buddy.preview import build_preview_page
+from syntax_buddy.render import format_entry
+from syntax_buddy.themes import TAG_COLOURS, themes
+from syntax_buddy.trace import traced
+
+EXPORT_VERSION = 1  # Bump when the page markup changes so every page is rendered again
+EXPORT_STATE_NAME = ".syntax-buddy-export.json"  # Hashes and page names from the last export
+FRAGMENTS_DIR = ".syntax-buddy-fragments"  # Cheat sheets: rendered entries per category
+EXPORT_BATCH_SIZE = 200  # Entries per process pool task
+EXPORT_INLINE_LIMIT = 400  # Fewer changed entries than this are rendered without a process pool
+
+PAGE_STYLE = """
+body { font-family: Arial, sans-serif; background: %(bg)s; color: %(fg)s; margin: 2em auto; max-width: 60em; }
+pre { background: %(text_bg)s; color: %(text_fg)s; padding: 1em; white-space: pre-wrap; }
+a { color: %(keyword)s; }
+nav { margin-bottom: 1em; }
+iframe { width: 100%%; height: 20em; border: 1px solid %(button_bg)s; background: white; }
+ul.items { columns: 3; }
+%(tags)s
+@media print {
+  body { margin: 0; max-width: none; background: white; }
+  nav { display: none; }
+  article { break-inside: avoid; }
+  pre { padding: 0.3em; margin: 0.3em 0; }
+}
+"""
+
+# Function to turn a name into a file name ("For Loop" -> "for-loop")
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "entry"
+
+# Function to hash everything an entry's page is rendered from
+def entry_hash(language, category, item, details):
+    fields = (str(EXPORT_VERSION), language or "", category, item,
+              details["syntax"], details["example"], details["description"])
+    return hashlib.sha256("\0".join(fields).encode("utf-8")).hexdigest()[:32]
+
+# Function to turn lexer spans into HTML, one <span class="tag"> per token
+def highlight_html(content, spans):
+    pieces = []
+    position = 0
+    for start, end, tag in sorted((start, end, tag) for tag, ranges in spans.items() for start, end in ranges):
+        if start < position:
+            continue
+        pieces += [html.escape(content[position:start]), f'<span class="{tag}">',
+                   html.escape(content[start:end]), "</span>"]
+        position = end
+    pieces.append(html.escape(content[position:]))
+    return "".join(pieces)
+
+def page(title, body, stylesheet):
+    return (f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{html.escape(title)}</title>\n'
+            f'<link rel="stylesheet" href="{stylesheet}">\n</head>\n<body>\n{body}\n</body>\n</html>\n')
+
+def write_text(path, text):
+    with open(path, "w", encoding="utf-8") as output_file:
+        output_file.write(text)
+
+# Function to render a batch of entries; runs in the process pool. Each job is (language,
+# category, item, syntax, example, description, page name, folder or None). Entry pages (and
+# preview pages) are written to the folder when there is one; the highlighted fragments are
+# returned.
+def render_batch(jobs):
+    fragments = []
+    for language, category, item, syntax, example, description, name, folder in jobs:
+        details = {"syntax": syntax, "example": example, "description": description}
+        text = format_entry(item, details)
+        spans = lex_document(text, lambda _: language, category)
+        fragment = f'<article id="{name}">\n<pre>{highlight_html(text, spans)}</pre>\n</article>'
+        fragments.append(fragment)
+        if folder is None:
+            continue
+        body = (f'<nav><a href="../index.html">All categories</a> &rsaquo; '
+                f'<a href="index.html">{html.escape(category)}</a></nav>\n{fragment}')
+        preview = build_preview_page(language, item, example)
+        if preview is not None:
+            preview_name = f"{name}.preview.html"
+            write_text(os.path.join(folder, preview_name), preview)
+            body += (f'\n<h2>Preview</h2>\n<iframe src="{preview_name}" sandbox></iframe>\n'
+                     f'<p><a href="{preview_name}">Open the preview on its own</a></p>')
+        write_text(os.path.join(folder, f"{name}.html"), page(f"{category}: {item}", body, "../style.css"))
+    return fragments
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+# Function to export the corpus (or some categories) to output_dir as a static site, or as one
+# cheat sheet per category. Only entries whose content hash changed since the last export into
+# the same folder are rendered again; force=True renders everything. Returns counts:
+# {"rendered", "unchanged", "removed"}.
+@traced("export.corpus")
+def export_corpus(corpus, output_dir, categories=None, cheat_sheet=False, workers=None, force=False):
+    kind = "cheat-sheet" if cheat_sheet else "site"
+    state_path = os.path.join(output_dir, EXPORT_STATE_NAME)
+    state = load_state(state_path)
+    if force or state.get("version") != EXPORT_VERSION or state.get("kind") != kind:
+        state = {}
+    old_entries = state.get("entries", {})  # Category -> {item: [hash, page name]}
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    owners = []  # (category, item) of each job
+    new_entries = {}
+    changed = set()  # Categories with anything added, changed or removed
+    removed = 0
+    for category in categories or corpus:
+        language = corpus.language(category)
+        folder = os.path.join(output_dir, slugify(category))
+        previous = old_entries.get(category, {})
+        if not os.path.exists(os.path.join(output_dir, FRAGMENTS_DIR, f"{slugify(category)}.json")
+                              if cheat_sheet else folder):
+            previous = {}  # Deleted since the last export
+        current = new_entries[category] = {}
+        taken = {name for _, name in previous.values()}
+        for item, details in corpus[category].items():
+            digest = entry_hash(language, category, item, details)
+            if item in previous:
+                name = previous[item][1]
+            else:
+                name = slugify(item)
+                if name in taken:
+                    name = f"{name}-{hashlib.sha256(item.encode('utf-8')).hexdigest()[:8]}"
+                taken.add(name)
+            current[item] = [digest, name]
+            if previous.get(item, [None])[0] != digest:
+                jobs.append((language, category, item, details["syntax"], details["example"],
+                             details["description"], name, None if cheat_sheet else folder))
+                owners.append((category, item))
+                changed.add(category)
+        for item in previous.keys() - current.keys():
+            removed += 1
+            changed.add(category)
+            if not cheat_sheet:
+                remove_file(os.path.join(folder, f"{previous[item][1]}.html"))
+                remove_file(os.path.join(folder, f"{previous[item][1]}.preview.html"))
+        if not cheat_sheet:
+            os.makedirs(folder, exist_ok=True)
+    # Categories left out this time keep their pages and state
+    if categories:
+        for category, entries in old_entries.items():
+            new_entries.setdefault(category, entries)
+
+    with BatchPool(render_batch, EXPORT_INLINE_LIMIT, workers) as pool:
+        for batch in split_batches(jobs, EXPORT_BATCH_SIZE):
+            pool.submit(batch)
+        fragments = [fragment for batch in pool.results() for fragment in batch]
+
+    style = PAGE_STYLE % dict(themes["light"], tags="\n".join(
+        f".{tag} {{ color: {themes['light'][key]}; }}" for tag, key in TAG_COLOURS.items() if tag != "link"))
+    write_text(os.path.join(output_dir, "style.css"), style)
+    if cheat_sheet:
+        write_cheat_sheets(corpus, output_dir, new_entries, changed, dict(zip(owners, fragments)))
+    else:
+        write_site_indexes(corpus, output_dir, new_entries, changed)
+
+    with replace_file(state_path) as state_file:
+        json.dump({"version": EXPORT_VERSION, "kind": kind, "entries": new_entries}, state_file)
+    return {"rendered": len(jobs), "unchanged": sum(map(len, new_entries.values())) - len(jobs), "removed": removed}
+
+# Function to write the site's front page and the item list of every category that changed
+def write_site_indexes(corpus, output_dir, entries, changed):
+    links = "\n".join(f'<li><a href="{slugify(category)}/index.html">{html.escape(category)}</a> '
+                      f'({len(entries[category])} entries)</li>' for category in corpus if category in entries)
+    write_text(os.path.join(output_dir, "index.html"),
+               page("Syntax Reference", f"<h1>Syntax Reference</h1>\n<ul>\n{links}\n</ul>", "style.css"))
+    for category in changed:
+        items = "\n".join(f'<li><a href="{name}.html">{html.escape(item)}</a></li>'
+                          for item, (_, name) in entries[category].items())
+        body = (f'<nav><a href="../index.html">All categories</a></nav>\n<h1>{html.escape(category)} Syntax</h1>\n'
+                f'<ul class="items">\n{items}\n</ul>')
+        write_text(os.path.join(output_dir, slugify(category), "index.html"),
+                   page(f"{category} Syntax", body, "../style.css"))
+
+# Function to write the cheat sheet of every category that changed. Each category's rendered
+# entries are kept in FRAGMENTS_DIR so a sheet is reassembled without rendering the rest again.
+def write_cheat_sheets(corpus, output_dir, entries, changed, rendered):
+    os.makedirs(os.path.join(output_dir, FRAGMENTS_DIR), exist_ok=True)
+    for category in changed:
+        fragments_path = os.path.join(output_dir, FRAGMENTS_DIR, f"{slugify(category)}.json")
+        fragments = load_state(fragments_path)
+        fragments = {item: rendered.get((category, item)) or fragments[item] for item in entries[category]}
+        with open(fragments_path, "w", encoding="utf-8") as fragments_file:
+            json.dump(fragments, fragments_file)
+        body = (f'<nav><a href="index.html">All cheat sheets</a></nav>\n<h1>{html.escape(category)} Cheat Sheet</h1>\n'
+                + "\n".join(fragments.values()))
+        write_text(os.path.join(output_dir, f"{slugify(category)}.html"),
+                   page(f"{category} Cheat Sheet", body, "style.css"))
+    links = "\n".join(f'<li><a href="{slugify(category)}.html">{html.escape(category)}</a></li>'
+                      for category in corpus if category in entries)
+    write_text(os.path.join(output_dir, "index.html"),
+               page("Syntax Cheat Sheets", f"<h1>Syntax Cheat Sheets</h1>\n<ul>\n{links}\n</ul>", "style.css"))
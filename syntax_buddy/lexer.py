@@ -0,0 +1,66 @@
+# Single-pass lexers for the Python, HTML and CSS shown in entries
+
+import re
+from keyword import kwlist
+
+# Python keywords shown in the keyword colour ("self" is not a keyword but reads like one)
+PYTHON_KEYWORDS = sorted(set(kwlist) | {"self"}, key=len, reverse=True)
+
+# Lexer tables: (tag, pattern) rules per language, tried left to right in a single pass
+LEXER_RULES = {
+    "python": [
+        ("comment", r"#[^\n]*"),
+        ("string", r"'''[\s\S]*?(?:'''|$)|\"\"\"[\s\S]*?(?:\"\"\"|$)"
+                   r"|'(?:\\.|[^'\\\n])*'?|\"(?:\\.|[^\"\\\n])*\"?"),
+        ("keyword", r"\b(?:" + "|".join(PYTHON_KEYWORDS) + r")\b"),
+    ],
+    "html": [
+        ("comment", r"<!--[\s\S]*?(?:-->|$)"),
+        ("string", r"\"[^\"]*\"?|'[^'\n]*'?"),
+        ("keyword", r"</?[A-Za-z][\w:-]*|/?>"),
+    ],
+    "css": [
+        ("comment", r"/\*[\s\S]*?(?:\*/|$)"),
+        ("string", r"\"[^\"\n]*\"?|'[^'\n]*'?"),
+        ("keyword", r"@[\w-]+|(?<=[{;])\s*[A-Za-z-]+(?=\s*:)"),
+    ],
+}
+
+HIGHLIGHT_TAGS = ("keyword", "comment", "string", "description")
+
+# Compile each language's rules into one alternation; lastgroup tells us which rule matched
+LEXERS = {}
+TOKEN_TAGS = {}
+for language, rules in LEXER_RULES.items():
+    alternatives = []
+    for index, (tag, pattern) in enumerate(rules):
+        group = f"{language}_{index}"
+        TOKEN_TAGS[group] = tag
+        alternatives.append(f"(?P<{group}>{pattern})")
+    LEXERS[language] = re.compile("|".join(alternatives))
+
+# Matches one formatted entry, as produced by render.format_entry
+ENTRY_PATTERN = re.compile(
+    r"^--- (?:(?P<category>[^\n:]+): )?(?P<item>[^\n]*?) ---\n\n?"
+    r"  Syntax: (?P<syntax>.*?)\n"
+    r"  Example: (?P<example>.*?)\n"
+    r"  Why Use: (?P<description>[^\n]*)",
+    re.MULTILINE | re.DOTALL)
+
+# Function to tokenize the syntax and example of one entry match into spans
+def lex_entry(content, entry, language, spans):
+    lexer = LEXERS.get(language)
+    if lexer is not None:
+        for field in ("syntax", "example"):
+            for token in lexer.finditer(content, entry.start(field), entry.end(field)):
+                spans[TOKEN_TAGS[token.lastgroup]].append(token.span())
+    spans["description"].append(entry.span("description"))
+
+# Function to tokenize a whole document once into {tag: [(start, end), ...]} character spans;
+# language_of maps an entry's category to its lexer language (for example Corpus.language)
+def lex_document(content, language_of, default_category=None):
+    spans = {tag: [] for tag in HIGHLIGHT_TAGS}
+    for entry in ENTRY_PATTERN.finditer(content):
+        lex_entry(content, entry, language_of(entry.group("category") or default_category), spans)
+    return spans
+
@@ -0,0 +1,104 @@
+# Idle-time prefetching of the entries the user is likely to open next: the ones either side of
+# the entry just shown, the top of a category list just opened, and the top search hits. Each
+# is rendered into the RenderCache (loading its pack if need be) and, for Python, its example
+# compiled for "Run Example", in short after_idle slices so typing and scrolling never wait.
+
+import marshal
+import time
+from collections import OrderedDict, deque
+
+from syntax_buddy.trace import traced, tracer
+
+PREFETCH_NEIGHBOURS = 2  # Entries either side of the one shown
+PREFETCH_CATEGORY_TOP = 5  # First entries of a category list
+PREFETCH_SEARCH_HITS = 5  # Top search hits
+PREFETCH_SLICE_MS = 8  # Work done per idle slice before yielding to the event loop
+PREFETCH_GAP_MS = 1  # Pause between slices so input events get handled
+CODE_CACHE_SIZE = 256  # Compiled examples kept
+
+class Prefetcher:
+    # build_view(category, item) renders an entry the way the cache's users look it up
+    def __init__(self, widget, corpus, render_cache, build_view):
+        self.widget = widget
+        self.corpus = corpus
+        self.render_cache = render_cache
+        self.build_view = build_view
+        self.queue = deque()  # (category, item) still to prefetch
+        self.idle_id = None
+        self.codes = OrderedDict()  # Example source -> marshalled code, compiled ahead of a run
+        self.code_hits = 0
+        self.code_misses = 0
+
+    # Queues the entries around `item` in its category, nearest first
+    def neighbours(self, category, item):
+        pack = self.corpus[category]
+        row = pack.rows[item]
+        rows = [row + step * side for step in range(1, PREFETCH_NEIGHBOURS + 1) for side in (1, -1)]
+        self.start([(category, pack.names[row]) for row in rows if 0 <= row < len(pack)])
+
+    def category_top(self, category):
+        pack = self.corpus[category]
+        self.start([(category, item) for item in pack.names[:PREFETCH_CATEGORY_TOP]])
+
+    def search_hits(self, hits):
+        self.start(hits[:PREFETCH_SEARCH_HITS])
+
+    # Replaces whatever was still queued: only the latest view's guesses matter
+    def start(self, entries):
+        self.queue = deque(entries)
+        if self.idle_id is None and self.queue:
+            self.idle_id = self.widget.after(PREFETCH_GAP_MS, self.queue_idle_slice)
+
+    def cancel(self):
+        if self.idle_id is not None:
+            self.widget.after_cancel(self.idle_id)
+            self.idle_id = None
+        self.queue.clear()
+
+    def queue_idle_slice(self):
+        self.idle_id = self.widget.after_idle(self.idle_slice)
+
+    @traced("prefetch.idle_slice")
+    def idle_slice(self):
+        self.idle_id = None
+        deadline = time.perf_counter() + PREFETCH_SLICE_MS / 1000
+        while self.queue and time.perf_counter() < deadline:
+            self.prefetch(*self.queue.popleft())
+        if self.queue:
+            self.idle_id = self.widget.after(PREFETCH_GAP_MS, self.queue_idle_slice)
+        else:
+            tracer.counter("prefetch", **self.stats())
+
+    def prefetch(self, category, item):
+        if category not in self.corpus or item not in self.corpus[category]:
+            return  # Gone since it was queued
+        self.render_cache.prefetch((category, item), lambda: self.build_view(category, item))
+        if self.corpus.language(category) == "python":
+            self.compile(self.corpus[category][item]["example"])
+
+    def compile(self, source):
+        if source in self.codes or self.corpus.example_code(source) is not None:
+            return
+        try:
+            self.codes[source] = marshal.dumps(compile(source, "<example>", "exec"))
+        except (SyntaxError, ValueError):
+            return  # Compiled (and reported) by the worker as usual
+        if len(self.codes) > CODE_CACHE_SIZE:
+            self.codes.popitem(last=False)
+
+    # Marshalled code for an example about to run: from the startup snapshot, or compiled here
+    # ahead of time; None means the worker compiles it
+    def example_code(self, source):
+        code = self.corpus.example_code(source) or self.codes.get(source)
+        if code is None:
+            self.code_misses += 1
+        else:
+            self.code_hits += 1
+        return code
+
+    def stats(self):
+        stats = self.render_cache.stats()
+        runs = self.code_hits + self.code_misses
+        stats.update(code_hits=self.code_hits, code_misses=self.code_misses,
+                     code_hit_rate=self.code_hits / runs if runs else 0.0)
+        return stats
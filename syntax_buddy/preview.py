@@ -0,0 +1,183 @@
+# HTML pages used to preview HTML and CSS examples in a browser, and the local server that
+# hands them to the browser
+
+import hashlib
+import select
+import socket
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Function to wrap an HTML or CSS example in a complete page; returns None for other languages
+def build_preview_page(language, item, example):
+    if language == "html":
+        return f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>HTML Preview: {item}</title>
+        </head>
+        <body>
+            {example}
+        </body>
+        </html>
+        """
+    if language == "css":
+        return f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>CSS Preview: {item}</title>
+            <style>{example}</style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>Sample Heading</h1>
+                <p>This is a sample paragraph to demonstrate CSS styling.</p>
+                <button>Hover Me</button>
+            </div>
+        </body>
+        </html>
+        """
+    return None
+
+# Script added to the live page: reloads it when a newer preview is published. It listens on
+# an event stream rather than polling, because browsers throttle timers in background tabs but
+# leave open connections alone.
+LIVE_RELOAD_SCRIPT = """
+<script>
+(function () {
+    var shown = "%s";
+    new EventSource("/events").onmessage = function (event) {
+        if (event.data !== shown) { location.reload(); }
+    };
+})();
+</script>
+"""
+
+LIVE_CHECK_SECONDS = 0.5  # How often an open event stream checks whether its tab went away
+LIVE_RECONNECT_GRACE = 2.0  # Seconds a reloading live page has to open its event stream again
+
+# Serves preview pages from memory on localhost. Each page lives at a stable URL derived from
+# its content hash (/p/<hash>), and /live always shows the latest page and reloads itself when
+# a new one is published, so repeat previews reuse the same browser tab and never touch disk.
+class PreviewServer:
+    def __init__(self, host="127.0.0.1", port=0, max_pages=256):
+        self.max_pages = max_pages
+        self.pages = OrderedDict()  # Content hash -> page bytes, oldest first
+        self.latest = ""  # Hash of the most recently published page
+        self.live_streams = 0  # Open /events connections, one per live tab
+        self.last_stream_end = None  # When the last of them closed
+        self.lock = threading.Lock()
+        self.published = threading.Condition(self.lock)
+        self.httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def live_url(self):
+        return f"{self.url}/live"
+
+    # Stores a page and makes it the live one; returns its stable URL
+    def publish(self, page):
+        body = page.encode("utf-8")
+        key = hashlib.sha256(body).hexdigest()[:16]
+        with self.lock:
+            self.pages[key] = body
+            self.pages.move_to_end(key)
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+            self.latest = key
+            self.published.notify_all()
+        return f"{self.url}/p/{key}"
+
+    # True while a browser tab showing /live has its event stream open (or is reloading and about
+    # to open it again), i.e. it will pick up the next publish
+    def live_client_connected(self):
+        with self.lock:
+            if self.live_streams:
+                return True
+            return self.last_stream_end is not None and time.monotonic() - self.last_stream_end < LIVE_RECONNECT_GRACE
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def make_handler(self):
+        server = self
+
+        class PreviewHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                with server.lock:
+                    latest = server.latest
+                    body = server.pages.get(path[3:]) if path.startswith("/p/") else None
+                    live_body = server.pages.get(latest, b"<p>No preview yet.</p>")
+
+                if path == "/events":
+                    self.stream_versions()
+                elif path == "/live":
+                    self.reply(live_body + (LIVE_RELOAD_SCRIPT % latest).encode("ascii"),
+                               "text/html; charset=utf-8", cache="no-store")
+                elif body is None:
+                    self.send_error(404)
+                elif self.headers.get("If-None-Match") == f'"{path[3:]}"':
+                    self.send_response(304)
+                    self.end_headers()
+                else:
+                    self.reply(body, "text/html; charset=utf-8",
+                               cache="max-age=31536000, immutable", etag=f'"{path[3:]}"')
+
+            # Sends the latest page hash as a server-sent event now and after every publish,
+            # until the tab closes the connection
+            def stream_versions(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                with server.lock:
+                    server.live_streams += 1
+                sent = None
+                try:
+                    while not self.client_gone():
+                        with server.published:
+                            if server.latest == sent:
+                                server.published.wait(LIVE_CHECK_SECONDS)
+                            latest = server.latest
+                        if latest != sent:
+                            self.wfile.write(f"data: {latest}\n\n".encode("ascii"))
+                            self.wfile.flush()
+                            sent = latest
+                except OSError:
+                    pass  # The tab went away mid-write
+                finally:
+                    with server.lock:
+                        server.live_streams -= 1
+                        server.last_stream_end = time.monotonic()
+
+            # A closed connection reads as end of file; the page itself never sends anything
+            def client_gone(self):
+                readable, _, _ = select.select([self.connection], [], [], 0)
+                return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+
+            def reply(self, body, content_type, cache, etag=None):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", cache)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep the console quiet
+
+        return PreviewHandler
@@ -0,0 +1,203 @@
+# "See also" suggestions: for each entry, the most similar entries in any category, by cosine
+# similarity of TF-IDF vectors. Term frequencies come from the search index postings (the item
+# name, syntax, example and description, weighted like search), so nothing is tokenized twice.
+# NumPy is optional: with it the similarities are batched matrix products (or, for corpora too
+# big for a dense matrix, sparse column sums), without it a pure-Python version computes the
+# same thing more slowly.
+
+import heapq
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from syntax_buddy.trace import traced
+
+RELATED_COUNT = 5  # Suggestions per entry
+RELATED_MAX_SHARE = 0.2  # Terms in more of the entries than this are too common to tell them apart
+RELATED_BLOCK_ROWS = 512  # Rows of the similarity matrix computed per NumPy product
+RELATED_DENSE_CELLS = 32 * 1024 * 1024  # Largest entries x terms matrix NumPy gets
+# Largest corpus whose suggestions are all computed up front (and saved in the snapshot); for
+# bigger ones each entry's row is computed the first time it is shown
+RELATED_PRECOMPUTE = 5000 if numpy is not None else 2000
+
+# Most similar entries for every entry of a SearchIndex. After a pack is edited the table is not
+# built again: invalidate() notes the entries that changed, and refresh() drops just the rows
+# that involve them.
+class RelatedEntries:
+    @traced("related.build")
+    def __init__(self, index, count=RELATED_COUNT):
+        self.entries = list(index.entries)
+        self.ids = {entry: entry_id for entry_id, entry in enumerate(self.entries) if entry is not None}
+        self.count = count
+        self.changed = set()  # Entries edited since the table was built or refreshed
+        self.load_vectors(index)
+        self.neighbours = [None] * len(self.entries)  # Entry id -> similar entry ids, best first
+        if len(self.entries) <= RELATED_PRECOMPUTE:
+            self.compute(range(len(self.entries)))
+
+    # Sets up the TF-IDF vectors the rows are computed from; returns their columns
+    def load_vectors(self, index):
+        self.matrix = None  # Dense (entries x terms) NumPy matrix
+        self.columns = None  # Term -> (entry ids, weights) arrays, when too big for the matrix
+        self.rows = None  # Entry id -> [(term, weight)], without NumPy
+        columns = tfidf_columns(index)
+        if numpy is None:
+            self.rows = [[] for _ in self.entries]
+            for term, (entry_ids, weights) in enumerate(columns):
+                for entry_id, weight in zip(entry_ids, weights):
+                    self.rows[entry_id].append((term, weight))
+            self.columns = columns
+        elif len(self.entries) * len(columns) <= RELATED_DENSE_CELLS:
+            self.matrix = numpy.zeros((len(self.entries), len(columns)), dtype=numpy.float32)
+            for term, (entry_ids, weights) in enumerate(columns):
+                self.matrix[entry_ids, term] = weights
+        else:
+            self.columns = columns
+            terms = numpy.concatenate([numpy.full(len(entry_ids), term) for term, (entry_ids, _) in enumerate(columns)])
+            entry_ids = numpy.concatenate([entry_ids for entry_ids, _ in columns])
+            order = numpy.argsort(entry_ids, kind="stable")
+            self.row_terms = terms[order]
+            self.row_weights = numpy.concatenate([weights for _, weights in columns])[order]
+            self.row_starts = numpy.searchsorted(entry_ids[order], numpy.arange(len(self.entries) + 1))
+        return columns
+
+    # Notes entries ((category, item) pairs) added, changed or removed by a reload; their rows
+    # are dropped by the next refresh()
+    def invalidate(self, entries):
+        self.changed |= entries
+
+    # True when invalidate() was called since the last refresh()
+    def needs_refresh(self):
+        return bool(self.changed)
+
+    # Catches up with the edits noted by invalidate(), given the search index as it is now. The
+    # vectors are set up again, and the rows of the changed entries, of entries that listed one
+    # of them and of entries sharing a term with one are computed again; the other rows are
+    # kept (term weights depend on the whole corpus, so a kept row can differ slightly from a
+    # fresh build). Like building the table, this takes seconds on a big corpus.
+    @traced("related.refresh")
+    def refresh(self, index):
+        old_entries, old_neighbours = self.entries, self.neighbours
+        self.entries = list(index.entries)
+        self.ids = {entry: entry_id for entry_id, entry in enumerate(self.entries) if entry is not None}
+        self.neighbours = [None] * len(self.entries)
+        for entry, others in zip(old_entries, old_neighbours):
+            if others is None or entry in self.changed or entry not in self.ids:
+                continue
+            others = [old_entries[other] for other in others]
+            if not any(other in self.changed for other in others):
+                self.neighbours[self.ids[entry]] = [self.ids[other] for other in others]
+
+        changed_ids = {self.ids[entry] for entry in self.changed if entry in self.ids}
+        for entry_ids, _ in self.load_vectors(index):
+            if not changed_ids.isdisjoint(entry_ids):
+                for entry_id in entry_ids:
+                    self.neighbours[int(entry_id)] = None
+        self.changed = set()
+        if len(self.entries) <= RELATED_PRECOMPUTE:
+            self.compute(entry_id for entry_id, others in enumerate(self.neighbours) if others is None)
+
+    # Plain-data copy for the snapshot; only complete tables are worth saving
+    def state(self):
+        if None in self.neighbours:
+            return None
+        return (self.entries, self.neighbours)
+
+    @classmethod
+    def from_state(cls, state):
+        related = cls.__new__(cls)
+        related.entries, related.neighbours = state
+        related.ids = {entry: entry_id for entry_id, entry in enumerate(related.entries) if entry is not None}
+        related.count = RELATED_COUNT
+        related.changed = set()
+        return related
+
+    # Returns up to `count` (category, item) pairs like the given entry, most similar first
+    def get(self, category, item):
+        entry_id = self.ids.get((category, item))
+        if entry_id is None:
+            return []
+        if self.neighbours[entry_id] is None:
+            self.compute([entry_id])
+        return [self.entries[other] for other in self.neighbours[entry_id]]
+
+    def compute(self, entry_ids):
+        entry_ids = list(entry_ids)
+        if self.matrix is not None:
+            for start in range(0, len(entry_ids), RELATED_BLOCK_ROWS):
+                block = numpy.asarray(entry_ids[start:start + RELATED_BLOCK_ROWS])
+                self.pick_best(block, self.matrix[block] @ self.matrix.T)
+        elif self.rows is None:
+            for entry_id in entry_ids:
+                self.pick_best(numpy.asarray([entry_id]), self.column_scores(entry_id)[numpy.newaxis])
+        else:
+            for entry_id in entry_ids:
+                self.compute_python(entry_id)
+
+    # Similarity of one entry to every entry, summing the sparse columns of its terms
+    def column_scores(self, entry_id):
+        start, stop = self.row_starts[entry_id], self.row_starts[entry_id + 1]
+        terms = self.row_terms[start:stop]
+        if not len(terms):
+            return numpy.zeros(len(self.entries), dtype=numpy.float32)
+        others = numpy.concatenate([self.columns[term][0] for term in terms])
+        products = numpy.concatenate([self.columns[term][1] * weight
+                                      for term, weight in zip(terms, self.row_weights[start:stop])])
+        return numpy.bincount(others, weights=products, minlength=len(self.entries))
+
+    # Keeps the top `count` of each row of a (rows x entries) similarity block
+    def pick_best(self, block, similarity):
+        similarity[numpy.arange(len(block)), block] = 0  # An entry is not related to itself
+        count = min(self.count, similarity.shape[1] - 1)
+        if count <= 0:
+            for entry_id in block:
+                self.neighbours[int(entry_id)] = []
+            return
+        top = numpy.argpartition(similarity, -count, axis=1)[:, -count:]
+        scores = numpy.take_along_axis(similarity, top, axis=1)
+        order = numpy.lexsort((top, -scores), axis=1)
+        for row, entry_id in enumerate(block):
+            self.neighbours[int(entry_id)] = [int(top[row, k]) for k in order[row] if scores[row, k] > 0]
+
+    def compute_python(self, entry_id):
+        scores = {}
+        for term, weight in self.rows[entry_id]:
+            for other, other_weight in zip(*self.columns[term]):
+                scores[other] = scores.get(other, 0.0) + weight * other_weight
+        scores.pop(entry_id, None)
+        best = heapq.nsmallest(self.count, scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        self.neighbours[entry_id] = [other for other, score in best if score > 0]
+
+# Function to turn search index postings into TF-IDF columns scaled so every entry's vector has
+# unit length: term -> (entry ids, weights), as NumPy arrays when NumPy is there. Terms in only
+# one entry cannot relate two entries and very common terms relate them all, so both are left out.
+def tfidf_columns(index):
+    total = len(index.entries)
+    most = max(2, RELATED_MAX_SHARE * total)
+    columns = []
+    for token in index.vocabulary:
+        entry_ids, weights = index.postings[token]
+        if 1 < len(entry_ids) <= most:
+            idf = math.log(total / len(entry_ids))
+            columns.append((list(entry_ids), [weight * idf for weight in weights]))
+
+    if numpy is None:
+        norms = [0.0] * total
+        for entry_ids, weights in columns:
+            for entry_id, weight in zip(entry_ids, weights):
+                norms[entry_id] += weight * weight
+        norms = [math.sqrt(norm) or 1.0 for norm in norms]
+        return [(entry_ids, [weight / norms[entry_id] for entry_id, weight in zip(entry_ids, weights)])
+                for entry_ids, weights in columns]
+
+    columns = [(numpy.asarray(entry_ids), numpy.asarray(weights, dtype=numpy.float32))
+               for entry_ids, weights in columns]
+    norms = numpy.zeros(total, dtype=numpy.float32)
+    for entry_ids, weights in columns:
+        norms[entry_ids] += weights * weights  # Entry ids are unique within a column
+    norms = numpy.sqrt(norms)
+    norms[norms == 0] = 1
+    return [(entry_ids, weights / norms[entry_ids]) for entry_ids, weights in columns]
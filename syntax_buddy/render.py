@@ -0,0 +1,124 @@
+# Formatting entries as text and painting highlight tags onto a Tk-style text widget.
+# Widgets are duck-typed (insert/delete/tag_add), so this module never imports tkinter.
+
+import re
+from bisect import bisect_right
+from collections import OrderedDict, namedtuple
+
+from syntax_buddy.lexer import lex_document
+from syntax_buddy.trace import traced
+
+# A rendered view: its text plus {tag: [index, index, ...]} ready for tag_add, so showing it
+# again needs no lexing
+RenderedView = namedtuple("RenderedView", "text tags")
+
+# Function to format one entry the way the detail view shows it
+def format_entry(item, details):
+    return (f"--- {item} ---\n\n"
+            f"  Syntax: {details['syntax']}\n"
+            f"  Example: {details['example']}\n"
+            f"  Why Use: {details['description']}\n")
+
+# Function to format one search hit; hits are separated by a blank line
+def format_result(category, item, details):
+    return (f"--- {category}: {item} ---\n"
+            f"  Syntax: {details['syntax']}\n"
+            f"  Example: {details['example']}\n"
+            f"  Why Use: {details['description']}\n\n")
+
+# Function to turn character offsets into Tk "line.column" indices; first_line is the widget
+# line the content starts on
+def spans_to_indices(content, spans, first_line=1):
+    line_starts = [0]
+    line_starts.extend(match.end() for match in re.finditer("\n", content))
+    indices = {}
+    for tag, ranges in spans.items():
+        flat = []
+        for start, end in ranges:
+            for offset in (start, end):
+                line = bisect_right(line_starts, offset) - 1
+                flat.append(f"{line + first_line}.{offset - line_starts[line]}")
+        indices[tag] = flat
+    return indices
+
+# Function to lex a document and precompute its tag indices
+@traced("render.lex")
+def render_document(content, language_of, category=None):
+    return RenderedView(content, spans_to_indices(content, lex_document(content, language_of, category)))
+
+# Function to replace a text widget's content with a rendered view
+@traced("render.paint")
+def paint(text_widget, view):
+    text_widget.delete("1.0", "end")
+    text_widget.insert("end", view.text)
+
+    # One tag_add call per tag with every range, instead of one Tk search per match
+    for tag, indices in view.tags.items():
+        if indices:
+            text_widget.tag_add(tag, *indices)
+
+# Function to replace a text widget's content and highlight it
+def insert_highlighted(text_widget, content, language_of, category=None):
+    paint(text_widget, render_document(content, language_of, category))
+
+# Bounded LRU cache of rendered views, keyed by tuples whose first element is the category
+# (the GUI uses (category, item))
+class RenderCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.views = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = set()  # Keys rendered by prefetch() and not looked up since
+        self.prefetches = 0
+        self.prefetch_hits = 0
+
+    # Returns the cached view for key, calling build() to render it on a miss
+    def get(self, key, build):
+        view = self.views.get(key)
+        if view is not None:
+            self.hits += 1
+            if key in self.prefetched:
+                self.prefetched.discard(key)
+                self.prefetch_hits += 1
+            self.views.move_to_end(key)
+            return view
+        self.misses += 1
+        view = self.views[key] = build()
+        self.evict()
+        return view
+
+    # Renders a view ahead of its first lookup (nothing happens if it is cached already); this
+    # is not counted as a lookup, but a later hit on it counts as a prefetch hit
+    def prefetch(self, key, build):
+        if key in self.views:
+            return False
+        self.views[key] = build()
+        self.prefetched.add(key)
+        self.prefetches += 1
+        self.evict()
+        return True
+
+    def evict(self):
+        while len(self.views) > self.maxsize:
+            key, _ = self.views.popitem(last=False)
+            self.prefetched.discard(key)
+
+    # Drops cached views of the given items of a category, the whole category, or everything
+    def invalidate(self, category=None, items=None):
+        if category is None:
+            self.views.clear()
+            self.prefetched.clear()
+            return
+        for key in [key for key in self.views
+                    if key[0] == category and (items is None or key[1] in items)]:
+            del self.views[key]
+            self.prefetched.discard(key)
+
+    # prefetch_hit_rate is the share of prefetched views that were looked up before being dropped
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.views),
+                "maxsize": self.maxsize, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "prefetches": self.prefetches, "prefetch_hits": self.prefetch_hits,
+                "prefetch_hit_rate": self.prefetch_hits / self.prefetches if self.prefetches else 0.0}
@@ -0,0 +1,159 @@
+# Running Python examples in a pool of pre-warmed worker processes.
+# Each worker is a separate "python -I" process with CPU and memory rlimits, a scratch working
+# directory and /dev/null as its console. Jobs are asynchronous: submit() returns at once and
+# poll() reports finished jobs, so a GUI can call it from its event loop.
+
+import base64
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+
+from syntax_buddy.trace import tracer
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_worker.py")
+
+# ok is False when the example raised, was killed, or timed out; error says why it was stopped
+RunResult = namedtuple("RunResult", "job_id ok stdout stderr error")
+
+# One worker process plus the thread that forwards its replies to the pool
+class Worker:
+    def __init__(self, pool):
+        self.job = None  # (job id, callback, deadline) while busy
+        self.process = subprocess.Popen(
+            [sys.executable, "-I", WORKER_SCRIPT, str(pool.cpu_seconds), str(pool.memory_mb)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=pool.scratch_dir, text=True, encoding="utf-8")
+        self.reader = threading.Thread(target=self.read_replies, args=(pool.replies,), daemon=True)
+        self.reader.start()
+
+    def read_replies(self, replies):
+        for line in self.process.stdout:
+            replies.put((self, line))
+        replies.put((self, None))
+
+    def send(self, job_id, source, code, callback, deadline):
+        self.job = (job_id, callback, deadline)
+        job = {"id": job_id, "source": source}
+        if code is not None:
+            job["code"] = base64.b64encode(code).decode("ascii")
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            pass  # The worker died; its reader thread reports that and poll() fails the job
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+class ExamplePool:
+    def __init__(self, workers=2, wall_seconds=5.0, cpu_seconds=2, memory_mb=256):
+        self.size = workers
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.scratch_dir = tempfile.mkdtemp(prefix="syntax-buddy-run-")
+        self.replies = queue.Queue()
+        self.pending = deque()  # (job id, source, code, callback) waiting for an idle worker
+        self.next_job_id = 0
+        self.submitted = {}  # Job id -> submit time in trace microseconds, while tracing
+        self.workers = [Worker(self) for _ in range(workers)]
+
+    # Queues an example; callback(result) is called from poll() once it finishes. `code` is the
+    # example already compiled and marshalled (e.g. from the startup snapshot), if available.
+    def submit(self, source, callback=None, code=None):
+        self.next_job_id += 1
+        if tracer.enabled:
+            self.submitted[self.next_job_id] = tracer.now_us()
+        self.pending.append((self.next_job_id, source, code, callback))
+        self.dispatch()
+        return self.next_job_id
+
+    def busy(self):
+        return bool(self.pending) or any(worker.job for worker in self.workers)
+
+    # Collects finished, crashed and timed-out jobs; call regularly (e.g. from root.after).
+    # With a timeout, waits up to that many seconds for the first reply (for batch use).
+    def poll(self, timeout=0):
+        results = []
+        while True:
+            try:
+                worker, line = self.replies.get(timeout > 0, timeout or None)
+            except queue.Empty:
+                break
+            timeout = 0
+            if worker not in self.workers:
+                continue  # Already replaced after a timeout
+            if line is None:
+                self.replace(worker, results, self.exit_reason(worker))
+            else:
+                reply = json.loads(line)
+                results.append(self.finish(worker, RunResult(reply["id"], reply["ok"], reply["stdout"],
+                                                             reply["stderr"], None)))
+                if reply.get("retire"):
+                    self.replace(worker, results, None)  # Near its CPU limit; it exits by itself
+        now = time.monotonic()
+        for worker in list(self.workers):
+            if worker.job and now > worker.job[2]:
+                worker.kill()
+                self.replace(worker, results, f"Stopped after {self.wall_seconds:g} seconds (time limit).")
+        self.dispatch()
+        return results
+
+    # Blocking helper for batch use: runs one example and returns its RunResult
+    def run(self, source):
+        job_id = self.submit(source)
+        while True:
+            for result in self.poll(0.05):
+                if result.job_id == job_id:
+                    return result
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.process.stdin.close()
+            worker.kill()
+        self.workers = []
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+    def dispatch(self):
+        for worker in self.workers:
+            if not self.pending:
+                return
+            if worker.job is None:
+                job_id, source, code, callback = self.pending.popleft()
+                worker.send(job_id, source, code, callback, time.monotonic() + self.wall_seconds)
+
+    def finish(self, worker, result):
+        callback = worker.job[1]
+        worker.job = None
+        start = self.submitted.pop(result.job_id, None)
+        if start is not None:
+            tracer.complete("example run", start, tracer.now_us() - start, "runner",
+                            {"job": result.job_id, "ok": result.ok, "error": result.error})
+        if callback is not None:
+            callback(result)
+        return result
+
+    # Swaps a dead or killed worker for a fresh one, failing the job it was running
+    def replace(self, worker, results, error):
+        if worker.job:
+            results.append(self.finish(worker, RunResult(worker.job[0], False, "", "", error)))
+        worker.kill()
+        self.workers[self.workers.index(worker)] = Worker(self)
+
+    def exit_reason(self, worker):
+        code = worker.process.wait()
+        if code == -getattr(signal, "SIGXCPU", 0):
+            return f"Stopped after {self.cpu_seconds:g} seconds of CPU time (CPU limit)."
+        if code == -getattr(signal, "SIGKILL", 0):
+            return "Stopped by the system (memory limit?)."
+        return f"The example process exited unexpectedly (exit code {code})."
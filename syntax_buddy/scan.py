@@ -0,0 +1,311 @@
+# Project scanner ("explain my project"): finds which constructs from the corpus a folder's
+# .py, .html and .css files use (For Loop, Lambda Function, Try-Except, Flexbox, Media Query, ...)
+# with file:line references. Python is parsed with ast, HTML with html.parser and CSS with the
+# tokenizer from verify.py. The folder is walked as a stream and files are parsed in batches
+# across a process pool while the walk goes on. Results are cached per file by size and mtime,
+# so scanning again only parses files that changed.
+
+import ast
+import hashlib
+import marshal
+import os
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+from syntax_buddy.batch import BatchPool, replace_file
+from syntax_buddy.trace import traced
+from syntax_buddy.verify import CSS_TOKEN_PATTERN
+
+SCAN_CACHE_DIR = os.environ.get("SYNTAX_BUDDY_SCAN_CACHE",
+                                os.path.join(os.path.expanduser("~"), ".cache", "syntax-buddy"))
+SCANNER_VERSION = 1  # Bump when the rules change so cached results are not reused
+SCAN_LANGUAGES = {".py": "python", ".pyw": "python", ".html": "html", ".htm": "html", ".css": "css"}
+# Folders never worth walking into
+SCAN_SKIP_DIRS = frozenset({".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+                            ".tox", ".nox", ".mypy_cache", ".pytest_cache", "site-packages"})
+SCAN_MAX_BYTES = 2 * 1024 * 1024  # Larger files are skipped (generated or minified, usually)
+SCAN_BATCH_SIZE = 64  # Files per process pool task
+SCAN_INLINE_LIMIT = 200  # Fewer changed files than this are parsed without a process pool
+SCAN_QUEUE_FACTOR = 4  # Batches in flight per worker while the walk goes on
+
+# hits maps (language, item) -> [(path, line), ...]; paths are relative to the root. HTML files
+# count for CSS items too, through their <style> blocks and style attributes.
+ScanResult = namedtuple("ScanResult", "root files parsed cached errors hits")
+
+# Python constructs, by AST node type, and the corpus item each one is
+PYTHON_NODE_ITEMS = {
+    ast.Assign: "Variable Assignment", ast.AnnAssign: "Variable Assignment", ast.AugAssign: "Variable Assignment",
+    ast.List: "List", ast.ListComp: "List", ast.If: "If Statement", ast.For: "For Loop",
+    ast.AsyncFor: "For Loop", ast.While: "While Loop", ast.Lambda: "Lambda Function",
+    ast.ClassDef: "Class Definition", ast.Import: "Import", ast.ImportFrom: "Import", ast.JoinedStr: "String",
+}
+
+# HTML elements and the corpus item each one is
+HTML_TAG_ITEMS = {
+    "h1": "Heading", "h2": "Heading", "h3": "Heading", "h4": "Heading", "h5": "Heading", "h6": "Heading",
+    "p": "Basic Tag", "img": "Image", "ul": "List (Unordered)", "ol": "List (Ordered)", "div": "Division",
+    "form": "Form", "input": "Input", "a": "Link", "table": "Table", "meta": "Meta Tags",
+    "script": "Script Tag", "style": "Style Tag",
+}
+
+# CSS properties (and their longhands, e.g. margin-top) and the corpus item each one is
+CSS_PROPERTY_ITEMS = {
+    "color": "Color", "background": "Background", "font-size": "Font Size", "margin": "Margin",
+    "padding": "Padding", "border": "Border", "display": "Display", "position": "Position",
+    "transition": "Transition", "flex": "Flexbox", "grid": "Grid",
+}
+CSS_DISPLAY_ITEMS = {"flex": "Flexbox", "inline-flex": "Flexbox", "grid": "Grid", "inline-grid": "Grid"}
+CSS_DECLARATION = re.compile(r"\s*(-?[a-zA-Z][\w-]*)\s*:\s*([^;]*)")
+CSS_SELECTOR_PARTS = [("Selector (ID)", re.compile(r"#[A-Za-z_-][\w-]*")),
+                      ("Selector (Class)", re.compile(r"\.[A-Za-z_-][\w-]*")),
+                      ("Selector (Element)", re.compile(r"(?:^|(?<=[\s>+~,(]))[a-zA-Z][\w-]*"))]
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+TRY_NODES = (ast.Try, getattr(ast, "TryStar", ast.Try))
+
+# Function to list a Python file's constructs as {("python", item): [line, ...]}. One pass:
+# ast.walk is breadth first, so a class is seen before the methods in its body.
+def scan_python(source):
+    hits = {}
+    methods = set()
+    for node in ast.walk(ast.parse(source)):
+        kind = type(node)
+        item = PYTHON_NODE_ITEMS.get(kind)
+        if kind is ast.Constant:
+            value = type(node.value)
+            item = "String" if value is str else "Integer" if value is int else None
+        elif kind is ast.Call:
+            item = "Open File" if type(node.func) is ast.Name and node.func.id == "open" else None
+        elif kind in FUNCTION_NODES:
+            item = "Method" if node in methods else "Function Definition"
+        elif kind in TRY_NODES:
+            item = "Try-Except" if node.handlers else None
+        elif kind is ast.ClassDef:
+            methods.update(child for child in node.body if type(child) in FUNCTION_NODES)
+        if item is not None:
+            hits.setdefault(("python", item), []).append(node.lineno)
+    return hits
+
+# Function to list a style sheet's constructs as {("css", item): [line, ...]}; first_line is
+# where the style sheet starts (for <style> blocks)
+def scan_css(source, hits=None, first_line=1):
+    hits = {} if hits is None else hits
+    line = first_line
+    text = []
+    text_line = line  # Line the pending selector or declaration starts on
+    depth = 0
+    for token in CSS_TOKEN_PATTERN.finditer(source):
+        kind = token.lastgroup
+        if kind == "unterminated":
+            break
+        if kind in ("text", "string"):
+            if not "".join(text).strip():
+                stripped = token.group().lstrip()
+                text_line = line + token.group()[:len(token.group()) - len(stripped)].count("\n")
+            text.append(token.group())
+        elif kind == "open":
+            prelude = "".join(text).strip()
+            if prelude.startswith("@media"):
+                hits.setdefault(("css", "Media Query"), []).append(text_line)
+            elif prelude and not prelude.startswith("@"):
+                scan_selector(prelude, hits, text_line)
+            depth += 1
+            text = []
+        elif kind in ("semicolon", "close"):
+            if depth:
+                scan_declaration("".join(text), hits, text_line)
+            text = []
+            if kind == "close":
+                depth = max(0, depth - 1)
+        line += token.group().count("\n")
+    return hits
+
+def scan_selector(selector, hits, line):
+    found = set()
+    for item, pattern in CSS_SELECTOR_PARTS:
+        if pattern.search(re.sub(r"\[[^\]]*\]|:[\w-]+(\([^)]*\))?", " ", selector)):
+            found.add(item)
+    for item in found:
+        hits.setdefault(("css", item), []).append(line)
+
+def scan_declaration(declaration, hits, line):
+    match = CSS_DECLARATION.match(declaration)
+    if match is None:
+        return
+    name = match.group(1).lower()
+    for prefix, item in CSS_PROPERTY_ITEMS.items():
+        if name == prefix or name.startswith(prefix + "-"):
+            hits.setdefault(("css", item), []).append(line)
+            break
+    value = match.group(2).strip().lower()
+    if name == "display" and value in CSS_DISPLAY_ITEMS:
+        hits.setdefault(("css", CSS_DISPLAY_ITEMS[value]), []).append(line)
+
+# Elements, attributes and the CSS in <style> blocks and style="" attributes of an HTML file
+class HTMLScanner(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hits = {}
+        self.in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        line = self.getpos()[0]
+        item = HTML_TAG_ITEMS.get(tag)
+        if item is not None:
+            self.hits.setdefault(("html", item), []).append(line)
+        if attrs:
+            self.hits.setdefault(("html", "Attribute"), []).append(line)
+        for name, value in attrs:
+            if name == "style" and value:
+                for declaration in value.split(";"):
+                    scan_declaration(declaration, self.hits, line)
+        self.in_style = tag == "style"
+
+    def handle_endtag(self, tag):
+        self.in_style = False
+
+    def handle_data(self, data):
+        if self.in_style:
+            scan_css(data, self.hits, self.getpos()[0])
+
+def scan_html(source):
+    scanner = HTMLScanner()
+    scanner.feed(source)
+    scanner.close()
+    return scanner.hits
+
+SCANNERS = {"python": scan_python, "html": scan_html, "css": scan_css}
+
+# Function to scan a batch of files; runs in the process pool. Returns [(path, hits or None,
+# error or None), ...]; paths are absolute.
+def scan_batch(paths):
+    results = []
+    for path in paths:
+        language = SCAN_LANGUAGES[os.path.splitext(path)[1].lower()]
+        try:
+            with open(path, "rb") as source_file:
+                source = source_file.read().decode("utf-8", errors="replace")
+            results.append((path, SCANNERS[language](source), None))
+        except (OSError, SyntaxError, ValueError, RecursionError) as e:
+            results.append((path, None, f"{type(e).__name__}: {e}"))
+    return results
+
+# Function to list the files worth scanning under root as (path, size, mtime_ns), as a stream
+def walk_files(root):
+    folders = [root]
+    while folders:
+        folder = folders.pop()
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+        for entry in sorted(entries, key=lambda entry: entry.name, reverse=True):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SCAN_SKIP_DIRS:
+                        folders.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in SCAN_LANGUAGES:
+                    status = entry.stat()
+                    if status.st_size <= SCAN_MAX_BYTES:
+                        yield entry.path, status.st_size, status.st_mtime_ns
+            except OSError:
+                continue
+
+def cache_path_for(root):
+    name = hashlib.sha256(root.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SCAN_CACHE_DIR, f"scan-{name}.bin")
+
+def load_cache(path):
+    try:
+        with open(path, "rb") as cache_file:
+            version, files = marshal.load(cache_file)
+    except (OSError, ValueError, EOFError, TypeError):
+        return {}
+    return files if version == SCANNER_VERSION else {}
+
+def save_cache(path, files):
+    with replace_file(path, "wb") as cache_file:
+        marshal.dump((SCANNER_VERSION, files), cache_file)
+
+# Function to scan every .py, .html and .css file under root. Unchanged files (same size and
+# mtime as in the cache) are not parsed again; cache_path=None disables the cache.
+@traced("scan.project")
+def scan_project(root, workers=None, cache_path="", use_cached=True):
+    root = os.path.abspath(root)
+    if cache_path == "":
+        cache_path = cache_path_for(root)
+    cache = load_cache(cache_path) if cache_path and use_cached else {}
+    files = {}  # Relative path -> (size, mtime_ns, hits or None, error or None)
+    stats = {}  # Absolute path -> (size, mtime_ns) of files being parsed
+    errors = []
+    parsed = 0
+
+    def collect(results):
+        nonlocal parsed
+        for path, hits, error in results:
+            relative = os.path.relpath(path, root)
+            size, mtime = stats.pop(path)
+            files[relative] = (size, mtime, hits, error)
+            parsed += 1
+
+    batch = []
+    with BatchPool(scan_batch, SCAN_INLINE_LIMIT, workers) as pool:
+        for path, size, mtime in walk_files(root):
+            relative = os.path.relpath(path, root)
+            cached = cache.get(relative)
+            if cached is not None and cached[0] == size and cached[1] == mtime:
+                files[relative] = cached
+                continue
+            stats[path] = (size, mtime)
+            batch.append(path)
+            if len(batch) == SCAN_BATCH_SIZE:
+                pool.submit(batch)
+                batch = []
+                for results in pool.throttle(pool.workers * SCAN_QUEUE_FACTOR):
+                    collect(results)
+        if batch:
+            pool.submit(batch)
+        for results in pool.results():
+            collect(results)
+
+    if cache_path:
+        save_cache(cache_path, files)
+    hits = {}
+    for relative in sorted(files):
+        size, mtime, file_hits, error = files[relative]
+        if error:
+            errors.append((relative, error))
+            continue
+        for construct, lines in file_hits.items():
+            hits.setdefault(construct, []).extend((relative, line) for line in sorted(lines))
+    return ScanResult(root, len(files), parsed, len(files) - parsed, errors, hits)
+
+# Function to pair scan hits with corpus entries: [((category, item), [(path, line), ...])] in
+# corpus order. A construct counts for the first category in its language with that item.
+def match_entries(corpus, result):
+    hits = dict(result.hits)
+    matches = []
+    for category in corpus:
+        language = corpus.language(category)
+        for item in corpus[category]:
+            refs = hits.pop((language, item), None)
+            if refs:
+                matches.append(((category, item), refs))
+    return matches
+
+# Function to format a scan as a plain-text report: each entry used, how often and where
+def format_scan_report(result, matches, seconds, refs=5):
+    lines = []
+    for (category, item), places in matches:
+        files = len({path for path, _ in places})
+        lines.append(f"{category}: {item} - {len(places)} use{'s' * (len(places) != 1)} in "
+                     f"{files} file{'s' * (files != 1)}\n")
+        lines += [f"    {path}:{line}\n" for path, line in places[:refs]]
+        if len(places) > refs:
+            lines.append(f"    ... and {len(places) - refs} more\n")
+    for path, error in result.errors:
+        lines.append(f"skipped {path}: {error}\n")
+    lines.append(f"{result.files} files ({result.parsed} parsed, {result.cached} from cache), "
+                 f"{len(matches)} entries used, in {seconds:.1f} s\n")
+    return "".join(lines)
@@ -0,0 +1,162 @@
+# Scratchpad editing of an example: the text widget holds the example's source on its own, and
+# edits are highlighted again after a short pause in typing. Only the lines that changed are
+# lexed again, plus any lines a multi-line string or comment carries the change into, and only
+# their tags are replaced. A longer pause calls on_settled(source) so the caller can run or
+# preview the edited code in the background. Like viewport.py, this works on any widget with
+# Tk's text and after methods.
+
+from syntax_buddy.lexer import LEXERS, TOKEN_TAGS
+from syntax_buddy.trace import traced
+
+RELEX_MS = 80  # Typing pause before edited lines are highlighted again
+SETTLE_MS = 600  # Typing pause before on_settled runs or previews the edited code
+SCRATCH_TAGS = ("keyword", "comment", "string")
+
+class Scratchpad:
+    def __init__(self, text_widget, on_settled=None):
+        self.text_widget = text_widget
+        self.on_settled = on_settled
+        self.active = False
+        self.language = None
+        self.relex_id = None
+        self.settle_id = None
+        self.reset()
+
+    def reset(self):
+        self.lines = []  # Text of each line as last lexed
+        self.tokens = []  # Per line: [(start column, end column, tag), ...]
+        self.carry = []  # Per line: True when a token continues onto the next line (None: not lexed)
+        self.relexed = 0  # Lines lexed by the last relex, for benchmarks
+
+    # Replaces the widget's content with `source` and starts following edits
+    def load(self, source, language):
+        self.close()
+        self.active = True
+        self.language = language
+        self.text_widget.delete("1.0", "end")
+        self.text_widget.insert("end", source)
+        self.relex(settle=False)
+
+    # Stops following edits (call before the widget shows something else)
+    def close(self):
+        for callback_id in (self.relex_id, self.settle_id):
+            if callback_id is not None:
+                self.text_widget.after_cancel(callback_id)
+        self.relex_id = None
+        self.settle_id = None
+        self.active = False
+        self.reset()
+
+    def source(self):
+        return self.text_widget.get("1.0", "end-1c")
+
+    # Call after anything that may have changed the text (e.g. on <KeyRelease>); debounced
+    def on_edit(self, event=None):
+        if not self.active:
+            return
+        if self.relex_id is not None:
+            self.text_widget.after_cancel(self.relex_id)
+        self.relex_id = self.text_widget.after(RELEX_MS, self.relex)
+
+    @traced("scratchpad.relex")
+    def relex(self, settle=True):
+        self.relex_id = None
+        lines = self.source().split("\n")
+        old = self.lines
+        # The edit is whatever lies between the unchanged lines at the start and at the end
+        first = 0
+        common = min(len(old), len(lines))
+        while first < common and old[first] == lines[first]:
+            first += 1
+        if first == len(old) == len(lines):
+            return  # Nothing changed (the cursor moved, say)
+        tail = 0
+        while tail < common - first and old[len(old) - 1 - tail] == lines[len(lines) - 1 - tail]:
+            tail += 1
+        old_stop = len(old) - tail
+        new_stop = len(lines) - tail
+        # Whether a token ran on into the first unchanged line after the edit
+        carried_in = self.carry[old_stop - 1] if old_stop > 0 else False
+        self.lines = lines
+        self.tokens[first:old_stop] = [[] for _ in range(first, new_stop)]
+        self.carry[first:old_stop] = [None] * (new_stop - first)
+
+        # Tokens can look behind and ahead past line breaks (a CSS property name follows a "{" or
+        # ";" and waits for its ":"), so the lines back to the second non-blank one before the
+        # edit are lexed again too, and so is every line a string or comment open before them
+        # reaches in from. When the last lines were deleted, the new last line is lexed again
+        # for its carry.
+        start = min(first, len(lines) - 1)
+        for _ in range(2):
+            if start > 0:
+                start -= 1
+                while start > 0 and not lines[start].strip():
+                    start -= 1
+        while start > 0 and self.carry[start - 1]:
+            start -= 1
+        stop = self.lex_lines(start, new_stop, carried_in)
+        self.relexed = stop - start
+        self.apply_tags(start, stop)
+
+        if settle and self.on_settled is not None:
+            if self.settle_id is not None:
+                self.text_widget.after_cancel(self.settle_id)
+            self.settle_id = self.text_widget.after(SETTLE_MS, self.settle)
+
+    def settle(self):
+        self.settle_id = None
+        self.on_settled(self.source())
+
+    # Lexes from line `start` until past line `stop` and at a line boundary where the tokens are
+    # back in step with the previous lexing (no token running on, before or now); returns the
+    # line after the last one lexed. carried_in is the old carry into line `stop`.
+    def lex_lines(self, start, stop, carried_in=None):
+        lexer = LEXERS.get(self.language)
+        if lexer is None or start >= len(self.lines):
+            return min(stop, len(self.lines))
+        # The trailing newline keeps "$" in the rules (an unclosed string or comment runs to the
+        # end) from matching before the last line break, so what follows never moves a token's end
+        text = "\n".join(self.lines[start:]) + "\n"
+        tokens = lexer.finditer(text)
+        token = next(tokens, None)
+        line = start
+        line_start = 0
+        open_end = open_tag = None  # A token carried over from the line before
+        while True:
+            line_end = line_start + len(self.lines[line])
+            pieces = []
+            if open_end is not None:
+                pieces.append((0, min(open_end, line_end) - line_start, open_tag))
+                if open_end <= line_end:
+                    open_end = None
+            while open_end is None and token is not None and token.start() <= line_end:
+                token_start, token_end = token.span()
+                tag = TOKEN_TAGS[token.lastgroup]
+                if token_end > token_start:
+                    pieces.append((token_start - line_start, min(token_end, line_end) - line_start, tag))
+                if token_end > line_end:
+                    open_end, open_tag = token_end, tag
+                token = next(tokens, None)
+            # The last line counts as carrying on: a line added after it may continue its tokens
+            carry = open_end is not None or line == len(self.lines) - 1
+            previous = carried_in if line == stop - 1 else self.carry[line]
+            self.tokens[line] = pieces
+            self.carry[line] = carry
+            line += 1
+            if line >= len(self.lines) or (line >= stop and not carry and previous is False):
+                return line
+            line_start = line_end + 1
+
+    # Replaces the highlight tags of lines [start, stop) with one tag_add per tag
+    def apply_tags(self, start, stop):
+        if stop <= start:
+            return
+        for tag in SCRATCH_TAGS:
+            self.text_widget.tag_remove(tag, f"{start + 1}.0", f"{stop + 1}.0")
+        indices = {tag: [] for tag in SCRATCH_TAGS}
+        for line in range(start, stop):
+            for column_start, column_end, tag in self.tokens[line]:
+                indices[tag] += [f"{line + 1}.{column_start}", f"{line + 1}.{column_end}"]
+        for tag, flat in indices.items():
+            if flat:
+                self.text_widget.tag_add(tag, *flat)
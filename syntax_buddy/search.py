@@ -0,0 +1,247 @@
+# Inverted search index over the syntax corpus
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+from syntax_buddy.trace import traced
+
+# Search tuning: title hits outrank syntax/example hits, which outrank description hits
+SEARCH_FIELD_WEIGHTS = {"item": 4.0, "syntax": 2.0, "example": 1.5, "description": 1.0}
+SEARCH_PREFIX_FACTOR = 0.8  # "flex" -> "flexbox"
+SEARCH_TYPO_FACTOR = 0.5  # "fucntion" -> "function"
+SEARCH_MAX_EXPANSIONS = 50  # Vocabulary terms one prefix or typo may expand to
+
+SEARCH_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Function to list the variants of a token with one character removed (typo lookups)
+def one_char_deletions(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+# Function to join an entry's fields into the lowercased text a query without word characters
+# is looked for in
+def entry_text(item, details):
+    return "\n".join((item, details["syntax"], details["example"], details["description"])).lower()
+
+# Function to weigh the tokens of an entry: token -> sum of the weights of the fields it is in
+def entry_weights(item, details):
+    fields = {"item": item, "syntax": details["syntax"],
+              "example": details["example"], "description": details["description"]}
+    weights = {}
+    for field, text in fields.items():
+        weight = SEARCH_FIELD_WEIGHTS[field]
+        for token in set(SEARCH_TOKEN_PATTERN.findall(text.lower())):
+            weights[token] = weights.get(token, 0.0) + weight
+    return weights
+
+# Inverted index over item names, syntax, examples and descriptions, built once at load time and
+# patched in place when a pack is edited (see update()). Each token's postings are two parallel
+# arrays, entry ids in ascending order and their weights, rather than a dict per token: at 100,000
+# entries that is a fraction of the memory. The index keeps no text of its own; queries without
+# word characters read the entries from `data` (the corpus it was built from).
+class SearchIndex:
+    @traced("search.build_index")
+    def __init__(self, data):
+        self.data = data
+        self.entries = []  # Entry id -> (category, item), None once removed
+        self.ids = None  # (category, item) -> entry id, built by the first update()
+        self.postings = {}  # Token -> (array("I") of entry ids, array("f") of weights)
+        self.vocabulary = []  # Sorted tokens, for prefix lookups
+        self.deletions = {}  # One-deletion variant -> tokens, for typo lookups
+        for category, items in data.items():
+            for item, details in items.items():
+                self.entries.append((category, item))
+                self.index_entry(len(self.entries) - 1, item, details)
+        self.finish()
+
+    # Adds an entry's postings; returns its tokens
+    def index_entry(self, entry_id, item, details):
+        token_weights = entry_weights(item, details)
+        for token, weight in token_weights.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = (array("I"), array("f"))
+            entry_ids, weights = postings
+            if not entry_ids or entry_ids[-1] < entry_id:
+                entry_ids.append(entry_id)
+                weights.append(weight)
+            else:  # An entry indexed again by update()
+                position = bisect_left(entry_ids, entry_id)
+                entry_ids.insert(position, entry_id)
+                weights.insert(position, weight)
+        return token_weights.keys()
+
+    # Drops an entry's postings (and tokens no other entry has) given the item and details it was
+    # indexed with; returns its tokens
+    def unindex_entry(self, entry_id, item, details):
+        tokens = entry_weights(item, details).keys()
+        for token in tokens:
+            entry_ids, weights = self.postings[token]
+            position = bisect_left(entry_ids, entry_id)
+            del entry_ids[position]
+            del weights[position]
+            if not entry_ids:
+                del self.postings[token]
+        return tokens
+
+    # Items of `category` whose text differs between the pack as indexed and `pack` (item ->
+    # details), or that only one of them has
+    def changed_items(self, category, pack):
+        self.build_ids()
+        indexed = {item for entry_category, item in self.ids if entry_category == category}
+        changed = indexed ^ pack.keys()
+        old = self.data[category]
+        for item in indexed & pack.keys():
+            if entry_text(item, old[item]) != entry_text(item, pack[item]):
+                changed.add(item)
+        return changed
+
+    # Applies an edit of one category in place: the entries of `items` are indexed again from
+    # `pack` (item -> details), added if new, or removed if no longer in it. Call it before the
+    # new pack replaces the old one in `data`, which is where the old postings are looked up. A
+    # removed entry's id is left unused so every other entry keeps its id (and its place among
+    # equal scores).
+    @traced("search.update")
+    def update(self, category, items, pack):
+        self.build_ids()
+        old = self.data[category]
+        touched = set()  # Tokens whose postings changed
+        for item in items:
+            entry_id = self.ids.get((category, item))
+            if entry_id is not None:
+                touched |= self.unindex_entry(entry_id, item, old[item])
+            if item in pack:
+                if entry_id is None:
+                    entry_id = self.ids[(category, item)] = len(self.entries)
+                    self.entries.append((category, item))
+                touched |= self.index_entry(entry_id, item, pack[item])
+            elif entry_id is not None:
+                del self.ids[(category, item)]
+                self.entries[entry_id] = None
+        for token in touched:
+            position = bisect_left(self.vocabulary, token)
+            listed = position < len(self.vocabulary) and self.vocabulary[position] == token
+            if token in self.postings and not listed:
+                self.vocabulary.insert(position, token)
+                for variant in one_char_deletions(token) | {token}:
+                    self.deletions.setdefault(variant, []).append(token)
+            elif token not in self.postings and listed:
+                del self.vocabulary[position]
+                for variant in one_char_deletions(token) | {token}:
+                    self.deletions[variant].remove(token)
+                    if not self.deletions[variant]:
+                        del self.deletions[variant]
+
+    def build_ids(self):
+        if self.ids is None:
+            self.ids = {entry: entry_id for entry_id, entry in enumerate(self.entries) if entry is not None}
+
+    def finish(self):
+        self.vocabulary = sorted(self.postings)
+        self.deletions = {}
+        for token in self.vocabulary:
+            for variant in one_char_deletions(token) | {token}:
+                self.deletions.setdefault(variant, []).append(token)
+
+    # Scores for one query term: exact hits, then prefix completions, then one-typo matches
+    def lookup(self, term):
+        scores = dict(zip(*self.postings[term])) if term in self.postings else {}
+        # Every token that starts with the term sorts between it and the term plus the last character
+        start = bisect_left(self.vocabulary, term)
+        stop = bisect_left(self.vocabulary, term + "\U0010ffff", start)
+        prefixed = (token for token in self.vocabulary[start:stop] if token != term)
+        for token in self.most_common(prefixed):
+            self.accumulate(scores, token, SEARCH_PREFIX_FACTOR)
+        if not scores and len(term) >= 4:
+            candidates = set()
+            for variant in one_char_deletions(term) | {term}:
+                candidates.update(self.deletions.get(variant, ()))
+            for token in self.most_common(candidates):
+                self.accumulate(scores, token, SEARCH_TYPO_FACTOR)
+        return scores
+
+    # The SEARCH_MAX_EXPANSIONS tokens found in the most entries (ties broken alphabetically), so
+    # a short prefix or a typo expands to the words people are likely to mean
+    def most_common(self, tokens):
+        return heapq.nsmallest(SEARCH_MAX_EXPANSIONS, tokens, key=lambda token: (-len(self.postings[token][0]), token))
+
+    def accumulate(self, scores, token, factor):
+        for entry_id, weight in zip(*self.postings[token]):
+            scores[entry_id] = max(scores.get(entry_id, 0.0), weight * factor)
+
+    # Plain-data copy of the index that marshal can store (see syntax_buddy.snapshot)
+    def state(self):
+        postings = {token: (entry_ids.tobytes(), weights.tobytes())
+                    for token, (entry_ids, weights) in self.postings.items()}
+        return (self.entries, postings, self.vocabulary, self.deletions)
+
+    # The index saved by state(), over the same `data`
+    @classmethod
+    def from_state(cls, state, data):
+        index = cls.__new__(cls)
+        index.entries, postings, index.vocabulary, index.deletions = state
+        index.data = data
+        index.ids = None
+        index.postings = {}
+        for token, (entry_ids, weights) in postings.items():
+            index.postings[token] = (array("I"), array("f"))
+            index.postings[token][0].frombytes(entry_ids)
+            index.postings[token][1].frombytes(weights)
+        return index
+
+    # Scores entries matching every query term, or None if the query has no word characters
+    def score(self, query):
+        terms = SEARCH_TOKEN_PATTERN.findall(query.lower())
+        if not terms:
+            return None
+
+        scores = None
+        for term in terms:
+            term_scores = self.lookup(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {i: score + term_scores[i] for i, score in scores.items() if i in term_scores}
+            if not scores:
+                break
+        return scores
+
+    # Returns (category, item) pairs matching every query term, best first
+    @traced("search.query")
+    def search(self, query, limit=None):
+        scores = self.score(query)
+        if scores is None:
+            return list(islice(self.substring_matches(query), limit))
+
+        def rank(entry_id):
+            return (scores[entry_id], -entry_id)
+        if limit is None:
+            ranked = sorted(scores, key=rank, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores, key=rank)
+        return [self.entries[i] for i in ranked]
+
+    # Yields the same pairs as search() one at a time; the ranking is a heap that is popped as
+    # results are consumed, so the first hits are ready without sorting every match
+    def stream(self, query):
+        scores = self.score(query)
+        if scores is None:
+            yield from self.substring_matches(query)
+            return
+
+        heap = [(-score, entry_id) for entry_id, score in scores.items()]
+        heapq.heapify(heap)
+        while heap:
+            yield self.entries[heapq.heappop(heap)[1]]
+
+    # Entries whose text contains the query, in entry id order, for queries the tokens cannot
+    # answer ("()", "<")
+    def substring_matches(self, query):
+        needle = query.lower()
+        for entry in self.entries:
+            if entry is not None:
+                category, item = entry
+                if needle in entry_text(item, self.data[category][item]):
+                    yield entry
@@ -0,0 +1,228 @@
+# HTTP/JSON lookup service for editor plugins and other tools (syntax-buddy serve). Endpoints:
+#
+#   GET /categories                      -> [{"category", "language", "items"}]
+#   GET /categories/<category>           -> ["item", ...]
+#   GET /lookup?category=C&item=I        -> {"category", "item", "language", "syntax", "example", "description"}
+#   GET /search?q=QUERY&limit=N          -> [{"category", "item"}, ...], best first
+#   GET /render?category=C&item=I        -> {"text", "tags": {tag: [[start, end], ...]}} (the GUI's view)
+#
+# A small asyncio HTTP/1.1 server (GET and HEAD, keep-alive). Responses are cached by request
+# target with strong ETags, so repeat requests, and conditional ones answered with 304, skip all
+# the work; any corpus change clears the cache. Responses not in the cache (a search over a big
+# corpus takes tens of milliseconds) are worked out on a worker thread, so the event loop keeps
+# serving other connections meanwhile. Edited pack files are picked up within
+# CORPUS_POLL_SECONDS, and applied on that same thread so no search sees a half-patched index.
+
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from syntax_buddy.lexer import lex_document
+from syntax_buddy.render import format_entry
+from syntax_buddy.trace import traced
+
+SERVER_CACHE_SIZE = 4096  # Responses kept by request target
+SERVER_MAX_HEAD = 16 * 1024  # Longest request line plus headers accepted
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 200
+CORPUS_POLL_SECONDS = 1.0  # How often pack files are checked for edits
+
+STATUS_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 431: "Request Header Fields Too Large"}
+
+# Answers requests from a Corpus; knows nothing about sockets
+class LookupService:
+    def __init__(self, corpus, cache_size=SERVER_CACHE_SIZE):
+        self.corpus = corpus
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Request target -> (status, head bytes, body bytes, etag)
+        self.lock = threading.Lock()  # The cache is read on the event loop and filled on the worker
+        self.hits = 0
+        self.misses = 0
+        corpus.add_listener(self.on_corpus_changed)
+
+    def on_corpus_changed(self, category, items):
+        with self.lock:
+            self.cache.clear()
+
+    # Returns the cached (status, head, body, etag) for a request target, or None
+    def cached(self, target):
+        with self.lock:
+            cached = self.cache.get(target)
+            if cached is not None:
+                self.cache.move_to_end(target)
+                self.hits += 1
+            return cached
+
+    # Returns (status, head, body, etag) for a request target such as "/search?q=flex"
+    def respond(self, target):
+        cached = self.cached(target)
+        if cached is not None:
+            return cached
+        with self.lock:
+            self.misses += 1
+        status, payload = self.handle(target)
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        head = (f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(body)}\r\n"
+                f"ETag: {etag}\r\nCache-Control: no-cache\r\n").encode("ascii")
+        response = (status, head, body, etag)
+        if status in (200, 404):
+            with self.lock:
+                self.cache[target] = response
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return response
+
+    @traced("server.handle")
+    def handle(self, target):
+        parts = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        path = unquote(parts.path).rstrip("/") or "/"
+        if path == "/categories":
+            return 200, [{"category": category, "language": self.corpus.language(category),
+                          "items": len(self.corpus[category])} for category in self.corpus]
+        if path.startswith("/categories/"):
+            category = self.corpus.find_category(path[len("/categories/"):])
+            if category is None:
+                return 404, {"error": f"no category {path[len('/categories/'):]!r}"}
+            return 200, list(self.corpus[category])
+        if path == "/search":
+            query = params.get("q", "").strip()
+            if not query:
+                return 400, {"error": "missing q"}
+            try:
+                limit = min(int(params.get("limit", SEARCH_DEFAULT_LIMIT)), SEARCH_MAX_LIMIT)
+            except ValueError:
+                return 400, {"error": "limit must be a number"}
+            hits = self.corpus.search_index().search(query, limit=max(limit, 0))
+            return 200, [{"category": category, "item": item} for category, item in hits]
+        if path in ("/lookup", "/render"):
+            found = self.corpus.find(params.get("category", ""), params.get("item", ""))
+            if found is None:
+                return 404, {"error": "no such entry"}
+            category, item = found
+            details = self.corpus[category][item]
+            if path == "/lookup":
+                return 200, {"category": category, "item": item, "language": self.corpus.language(category),
+                             **dict(details)}
+            text = format_entry(item, details)
+            spans = lex_document(text, self.corpus.language, category)
+            return 200, {"text": text, "tags": {tag: [list(span) for span in ranges]
+                                                for tag, ranges in spans.items() if ranges}}
+        return 404, {"error": f"unknown endpoint {path!r}"}
+
+# Serves a LookupService over HTTP/1.1 with asyncio streams
+class LookupServer:
+    def __init__(self, service, host="127.0.0.1", port=8765):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.server = None
+        # Works out responses that are not cached, and applies reloads (see watch_corpus)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lookup")
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                                 limit=SERVER_MAX_HEAD)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def serve_forever(self):
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while await self.handle_request(reader, writer):
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # Reads one request and writes its response; returns whether the connection stays open
+    async def handle_request(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            self.write(writer, 431, b"", b"", close=True)
+            return False
+        lines = head.decode("latin-1").split("\r\n")
+        request = lines[0].split(" ")
+        if len(request) != 3:
+            self.write(writer, 400, b"", b"", close=True)
+            return False
+        method, target, version = request
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+        if method not in ("GET", "HEAD"):
+            # Any request body is left unread, so the connection cannot be reused
+            self.write(writer, 405, b"Allow: GET, HEAD\r\nContent-Length: 0\r\n", b"", close=True)
+            await writer.drain()
+            return False
+        response = self.service.cached(target)
+        if response is None:
+            response = await asyncio.get_running_loop().run_in_executor(self.executor, self.service.respond, target)
+        status, head, body, etag = response
+        if status == 200 and etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+            self.write(writer, 304, f"ETag: {etag}\r\n".encode("ascii"), b"", not keep_alive)
+        else:
+            self.write(writer, status, head, b"" if method == "HEAD" else body, not keep_alive)
+        await writer.drain()
+        return keep_alive
+
+    def write(self, writer, status, head, body, close):
+        if not head and status != 304:
+            head = b"Content-Length: 0\r\n"
+        writer.write(f"HTTP/1.1 {status} {STATUS_REASONS[status]}\r\n".encode("ascii") + head
+                     + (b"Connection: close\r\n\r\n" if close else b"\r\n") + body)
+
+# Function to apply edits to the pack files as they happen, on the thread that answers requests
+# (`executor`), between two of them
+async def watch_corpus(corpus, executor):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(CORPUS_POLL_SECONDS)
+        for category in corpus.changed_packs():
+            try:
+                reloaded = await asyncio.to_thread(corpus.read_reload, category)  # Parsing is the slow part
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not reload {category}: {e}", file=sys.stderr, flush=True)
+            else:
+                await loop.run_in_executor(executor, corpus.apply_reload, reloaded)
+
+# Function to run the service until interrupted; prints its URL to stderr once listening
+def serve(corpus, host="127.0.0.1", port=8765):
+    corpus.search_index()  # Built (or read from the snapshot) now rather than on the first search
+
+    async def main():
+        server = await LookupServer(LookupService(corpus), host, port).start()
+        print(f"Serving on {server.url}", file=sys.stderr, flush=True)
+        watcher = asyncio.create_task(watch_corpus(corpus, server.executor))
+        try:
+            await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,173 @@
+# Startup snapshot: the parsed packs, the search index and the compiled Python examples of a
+# corpus, written to one file next to it so later launches skip JSON parsing, index building
+# and compiling. The file is memory-mapped and each section is unmarshalled the first time it
+# is needed. A digest of the manifest, every pack and the interpreter version guards it; a
+# snapshot whose digest does not match is ignored and rewritten. The size and mtime of each
+# source file are stored too, so an untouched corpus is accepted without hashing it.
+#
+# Layout: MAGIC, 8-byte header length, marshalled header {"digest", "stats", "sections": {name:
+# (offset, length)}}, then the sections: "entries:<category>" (a pack's store columns, see
+# store.py) with its raw text buffer "text:<category>", and the marshalled "index", "code" and,
+# once computed, "related".
+
+import hashlib
+import marshal
+import mmap
+import os
+import sys
+
+from syntax_buddy.batch import replace_file
+from syntax_buddy.store import PackStore
+from syntax_buddy.trace import traced
+
+SNAPSHOT_MAGIC = b"SBSNAP\x00\x03"
+SNAPSHOT_NAME = "snapshot.bin"
+# Where to keep snapshots: unset for the default, "off" to disable them, or a file path
+SNAPSHOT_SETTING = os.environ.get("SYNTAX_BUDDY_SNAPSHOT", "")
+SNAPSHOT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "syntax-buddy")
+
+# Function to pick the snapshot file for a corpus folder: inside it when it is writable
+# (or already has one), otherwise in the user's cache folder. None when snapshots are off.
+def snapshot_path(data_dir):
+    if SNAPSHOT_SETTING == "off":
+        return None
+    if SNAPSHOT_SETTING:
+        return SNAPSHOT_SETTING
+    path = os.path.join(data_dir, SNAPSHOT_NAME)
+    if os.path.exists(path) or os.access(data_dir, os.W_OK):
+        return path
+    name = hashlib.sha256(os.path.abspath(data_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SNAPSHOT_CACHE_DIR, f"snapshot-{name}.bin")
+
+# Function to hash everything a snapshot is built from; marshal and code objects are specific
+# to the interpreter version, so that is included too
+def source_digest(data_dir, manifest_bytes, packs):
+    digest = hashlib.sha256(SNAPSHOT_MAGIC + sys.implementation.cache_tag.encode("ascii"))
+    digest.update(manifest_bytes)
+    for pack in packs.values():
+        with open(os.path.join(data_dir, pack["file"]), "rb") as pack_file:
+            digest.update(hashlib.sha256(pack_file.read()).digest())
+    return digest.hexdigest()
+
+# Function to list the interpreter and the size and mtime of the manifest and every pack, for
+# a quick check that nothing changed since the snapshot was written
+def source_stats(data_dir, packs):
+    stats = [sys.implementation.cache_tag]
+    for name in ["manifest.json"] + [pack["file"] for pack in packs.values()]:
+        status = os.stat(os.path.join(data_dir, name))
+        stats.append((name, status.st_size, status.st_mtime_ns))
+    return stats
+
+# Function to key a compiled example by its source
+def example_key(source):
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+
+# A memory-mapped snapshot file
+class Snapshot:
+    def __init__(self, path):
+        with open(path, "rb") as snapshot_file:
+            self.map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.map)
+        length = int.from_bytes(view[8:16], "little")
+        if bytes(view[:8]) != SNAPSHOT_MAGIC:
+            raise ValueError("not a syntax-buddy snapshot")
+        header = marshal.loads(view[16:16 + length])
+        self.view = view
+        self.digest = header["digest"]
+        self.stats = header["stats"]
+        self.sections = header["sections"]
+        self.codes = None
+
+    def section(self, name):
+        return marshal.loads(self.raw(name))
+
+    # A section's bytes as a view of the mapped file (no copy)
+    def raw(self, name):
+        offset, length = self.sections[name]
+        return self.view[offset:offset + length]
+
+    def has_entries(self, category):
+        return f"entries:{category}" in self.sections
+
+    # A pack's PackStore; its text buffer stays in the mapped file
+    def entries(self, category):
+        return PackStore.from_state(self.section(f"entries:{category}"), self.raw(f"text:{category}"))
+
+    @traced("snapshot.search_index")
+    def search_index(self, corpus):
+        from syntax_buddy.search import SearchIndex
+
+        return SearchIndex.from_state(self.section("index"), corpus)
+
+    def has_related(self):
+        return "related" in self.sections
+
+    def related_entries(self):
+        from syntax_buddy.related import RelatedEntries
+
+        return RelatedEntries.from_state(self.section("related"))
+
+    # Marshalled code object for a Python example, or None if it is not in the snapshot
+    def example_code(self, source):
+        if self.codes is None:
+            self.codes = self.section("code")
+        return self.codes.get(example_key(source))
+
+# Function to open the snapshot for a corpus if it is up to date. Returns (snapshot or None,
+# digest of the sources or None). The packs are only hashed when there is a snapshot whose
+# sizes and mtimes no longer match (a pack touched but not changed, say); without one, the
+# digest is left to whoever writes the next snapshot, so a plain startup reads no pack.
+def load_snapshot(path, data_dir, manifest_bytes, packs, stats):
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, EOFError, TypeError, KeyError):
+        return None, None
+    if snapshot.stats == stats:
+        return snapshot, snapshot.digest
+    digest = source_digest(data_dir, manifest_bytes, packs)
+    if snapshot.digest == digest:
+        return snapshot, digest
+    return None, digest
+
+# Function to write a snapshot of every pack in `corpus` plus its search index and, if given, the
+# related entries table. Examples that do not compile are left out; they are compiled (and
+# fail) in the worker as before.
+@traced("snapshot.write")
+def write_snapshot(path, digest, stats, corpus, index, related=None):
+    sections = {}
+    codes = {}
+    for category in corpus:
+        columns, text = corpus[category].state()
+        sections[f"entries:{category}"] = marshal.dumps(columns)
+        sections[f"text:{category}"] = text
+        if corpus.language(category) == "python":
+            for details in corpus[category].values():
+                key = example_key(details["example"])
+                if key in codes:
+                    continue
+                try:
+                    codes[key] = marshal.dumps(compile(details["example"], "<example>", "exec"))
+                except (SyntaxError, ValueError):
+                    pass
+    sections["index"] = marshal.dumps(index.state())
+    sections["code"] = marshal.dumps(codes)
+    if related is not None:
+        sections["related"] = marshal.dumps(related)
+
+    # Offsets depend on the header's length, which depends on the offsets: lay out until stable
+    layout = {}
+    header = b""
+    while True:
+        offset = 16 + len(header)
+        for name, data in sections.items():
+            layout[name] = (offset, len(data))
+            offset += len(data)
+        previous = header
+        header = marshal.dumps({"digest": digest, "stats": stats, "sections": layout})
+        if len(header) == len(previous):
+            break
+
+    with replace_file(path, "wb") as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC + len(header).to_bytes(8, "little") + header)
+        for data in sections.values():
+            snapshot_file.write(data)
@@ -0,0 +1,126 @@
+# Compact, read-only storage for a language pack. Instead of a dict of three strings per entry,
+# a pack keeps its item names (interned), a table of distinct syntax strings, and all examples
+# and descriptions UTF-8 encoded in one shared buffer, addressed by offsets and decoded only
+# when read. Identical texts are stored once. The buffer can be a slice of the memory-mapped
+# startup snapshot, so loading a pack from there copies no text at all.
+#
+# PackStore is a Mapping of item -> EntryView, and EntryView a Mapping with the usual "syntax",
+# "example" and "description" keys, so code written against the JSON dicts works unchanged.
+
+import sys
+from array import array
+from collections.abc import Mapping
+
+ENTRY_FIELDS = ("syntax", "example", "description")
+
+class PackStore(Mapping):
+    def __init__(self, items, syntaxes, syntax_ids, offsets, buffer):
+        self.names = items  # Row -> item name
+        self.rows = {item: row for row, item in enumerate(items)}
+        self.syntaxes = syntaxes  # Distinct syntax strings
+        self.syntax_ids = syntax_ids  # array("I"): row -> index into syntaxes
+        self.offsets = offsets  # array("Q"): example start, end, description start, end per row
+        self.buffer = buffer  # UTF-8 bytes (or memoryview) holding the examples and descriptions
+
+    # Builds a store from a pack's "entries" dict as read from JSON
+    @classmethod
+    def from_entries(cls, entries):
+        items = []
+        syntaxes = []
+        syntax_index = {}
+        syntax_ids = array("I")
+        offsets = array("Q")
+        chunks = []
+        spans = {}  # Text -> (start, end) in the buffer
+        size = 0
+        for item, details in entries.items():
+            items.append(sys.intern(item))
+            syntax = details["syntax"]
+            if syntax not in syntax_index:
+                syntax_index[syntax] = len(syntaxes)
+                syntaxes.append(sys.intern(syntax))
+            syntax_ids.append(syntax_index[syntax])
+            for text in (details["example"], details["description"]):
+                span = spans.get(text)
+                if span is None:
+                    data = text.encode("utf-8")
+                    span = spans[text] = (size, size + len(data))
+                    chunks.append(data)
+                    size += len(data)
+                offsets.extend(span)
+        return cls(items, syntaxes, syntax_ids, offsets, b"".join(chunks))
+
+    # Plain data for the snapshot: (marshal-able columns, text buffer)
+    def state(self):
+        return (self.names, self.syntaxes, self.syntax_ids.tobytes(), self.offsets.tobytes()), bytes(self.buffer)
+
+    @classmethod
+    def from_state(cls, columns, buffer):
+        items, syntaxes, syntax_ids, offsets = columns
+        syntax_ids_array = array("I")
+        syntax_ids_array.frombytes(syntax_ids)
+        offsets_array = array("Q")
+        offsets_array.frombytes(offsets)
+        return cls([sys.intern(item) for item in items], [sys.intern(syntax) for syntax in syntaxes],
+                   syntax_ids_array, offsets_array, buffer)
+
+    # Items added, changed or removed in `other` (another PackStore) compared with this one;
+    # texts are compared as encoded, without decoding them
+    def changed_items(self, other):
+        changed = self.rows.keys() ^ other.rows.keys()
+        offsets, other_offsets = self.offsets, other.offsets
+        buffer, other_buffer = bytes(self.buffer), bytes(other.buffer)
+        other_rows = other.rows
+        for item, row in self.rows.items():
+            other_row = other_rows.get(item)
+            if other_row is None:
+                continue
+            mine, theirs = 4 * row, 4 * other_row
+            if (self.syntaxes[self.syntax_ids[row]] != other.syntaxes[other.syntax_ids[other_row]]
+                    or buffer[offsets[mine]:offsets[mine + 1]]
+                    != other_buffer[other_offsets[theirs]:other_offsets[theirs + 1]]
+                    or buffer[offsets[mine + 2]:offsets[mine + 3]]
+                    != other_buffer[other_offsets[theirs + 2]:other_offsets[theirs + 3]]):
+                changed.add(item)
+        return changed
+
+    def text(self, position):
+        return str(self.buffer[self.offsets[position]:self.offsets[position + 1]], "utf-8")
+
+    def __getitem__(self, item):
+        return EntryView(self, self.rows[item])
+
+    def __contains__(self, item):
+        return item in self.rows
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+# One entry of a PackStore, read-only; fields are decoded each time they are read
+class EntryView(Mapping):
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, field):
+        if field == "syntax":
+            return self.store.syntaxes[self.store.syntax_ids[self.row]]
+        if field == "example":
+            return self.store.text(4 * self.row)
+        if field == "description":
+            return self.store.text(4 * self.row + 2)
+        raise KeyError(field)
+
+    def __iter__(self):
+        return iter(ENTRY_FIELDS)
+
+    def __len__(self):
+        return len(ENTRY_FIELDS)
+
+    def __repr__(self):
+        return f"EntryView({dict(self)!r})"
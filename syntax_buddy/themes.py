@@ -0,0 +1,87 @@
+# Colour schemes shared by the GUI and terminal output, plus the registry that applies them
+
+import json
+import os
+
+themes = {
+    "light": {
+        "bg": "#f0f0f0", "fg": "black", "button_bg": "#e0e0e0", "button_fg": "black",
+        "text_bg": "white", "text_fg": "black", "keyword": "blue", "comment": "green", "string": "orange",
+        "description": "green"
+    },
+    "dark": {
+        "bg": "#2b2b2b", "fg": "white", "button_bg": "#4a4a4a", "button_fg": "white",
+        "text_bg": "#1e1e1e", "text_fg": "white", "keyword": "#569cd6", "comment": "#6a9955", "string": "#ce9178",
+        "description": "#2ecc71"
+    }
+}
+
+# User themes: {"name": {"base": "dark", "keyword": "#ff79c6", ...}, ...}; keys left out come from base
+USER_THEMES_PATH = os.environ.get("SYNTAX_BUDDY_THEMES",
+                                  os.path.join(os.path.expanduser("~"), ".config", "syntax-buddy", "themes.json"))
+
+# Which theme colour each configure option of a kind of widget uses
+WIDGET_ROLES = {
+    "frame": {"bg": "bg"},
+    "label": {"bg": "bg", "fg": "fg"},
+    "button": {"bg": "button_bg", "fg": "button_fg"},
+    "entry": {"bg": "text_bg", "fg": "text_fg", "insertbackground": "fg"},
+    "text": {"bg": "text_bg", "fg": "text_fg", "insertbackground": "fg"},
+}
+
+# Highlight tags (and "See also" links) and the theme colour of each
+TAG_COLOURS = {"keyword": "keyword", "comment": "comment", "string": "string", "description": "description",
+               "link": "keyword"}
+
+# Function to add the themes from a user themes file to `themes`; returns the names added.
+# A missing file is not an error; a malformed one raises ValueError.
+def load_user_themes(path=USER_THEMES_PATH):
+    try:
+        with open(path, encoding="utf-8") as themes_file:
+            user_themes = json.load(themes_file)
+    except FileNotFoundError:
+        return []
+    added = []
+    for name, colours in user_themes.items():
+        base = colours.get("base", "light")
+        if base not in themes:
+            raise ValueError(f"Theme '{name}' in {path} is based on unknown theme '{base}'")
+        themes[name] = {**themes[base], **{key: value for key, value in colours.items() if key != "base"}}
+        added.append(name)
+    return added
+
+# Widgets and text tags that follow the current theme. Switching themes only reconfigures
+# colours: tag ranges in text widgets are left alone, so nothing is re-highlighted.
+class ThemeRegistry:
+    def __init__(self, theme):
+        self.theme = theme
+        self.widgets = {}  # Widget -> {configure option: theme key}
+        self.text_widgets = []  # Text widgets whose highlight tags follow the theme
+
+    # Styles a widget for its role ("frame", "label", "button", "entry" or "text") and keeps it
+    # styled on later theme changes; returns the widget
+    def register(self, widget, role):
+        self.widgets[widget] = WIDGET_ROLES[role]
+        self.configure_widget(widget, WIDGET_ROLES[role])
+        return widget
+
+    def unregister(self, widget):
+        self.widgets.pop(widget, None)
+
+    def register_tags(self, text_widget):
+        self.text_widgets.append(text_widget)
+        self.configure_tags(text_widget)
+
+    def apply(self, theme):
+        self.theme = theme
+        for widget, options in self.widgets.items():
+            self.configure_widget(widget, options)
+        for text_widget in self.text_widgets:
+            self.configure_tags(text_widget)
+
+    def configure_widget(self, widget, options):
+        widget.configure(**{option: self.theme[key] for option, key in options.items()})
+
+    def configure_tags(self, text_widget):
+        for tag, key in TAG_COLOURS.items():
+            text_widget.tag_configure(tag, foreground=self.theme[key])
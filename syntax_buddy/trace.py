@@ -0,0 +1,105 @@
+# Opt-in tracing of hot paths, exported as Chrome trace-event JSON (load it in chrome://tracing
+# or ui.perfetto.dev). Enable it with SYNTAX_BUDDY_TRACE=trace.json or the --trace option of the
+# GUI and CLI. While disabled, traced functions cost one extra call and attribute check.
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+TRACE_ENV = "SYNTAX_BUDDY_TRACE"  # Path to write the trace to at exit
+STALL_ENV = "SYNTAX_BUDDY_STALL_MS"  # Mainloop stall threshold
+DEFAULT_STALL_MS = 100
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+
+    # Starts recording; the trace is written to path when the process exits
+    def enable(self, path):
+        if not self.enabled:
+            atexit.register(self.export)
+        self.enabled = True
+        self.path = path
+
+    def now_us(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def complete(self, name, start_us, duration_us, category="app", args=None):
+        self.events.append({"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": duration_us,
+                            "pid": self.pid, "tid": threading.get_ident(), "args": args or {}})
+
+    def instant(self, name, category="app", **args):
+        if self.enabled:
+            self.events.append({"name": name, "cat": category, "ph": "i", "s": "p", "ts": self.now_us(),
+                                "pid": self.pid, "tid": threading.get_ident(), "args": args})
+
+    # Records numeric series (cache sizes, hit counts) shown as counter tracks
+    def counter(self, name, **values):
+        if self.enabled:
+            self.events.append({"name": name, "ph": "C", "ts": self.now_us(), "pid": self.pid, "args": values})
+
+    @contextmanager
+    def span(self, name, category="app", **args):
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            self.complete(name, start, self.now_us() - start, category, args)
+
+    def export(self, path=None):
+        path = path or self.path
+        if path:
+            with open(path, "w", encoding="utf-8") as trace_file:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace_file)
+        return path
+
+tracer = Tracer()
+if os.environ.get(TRACE_ENV):
+    tracer.enable(os.environ[TRACE_ENV])
+
+# Context manager timing a block, e.g. "with span('search.query', query=q):"
+def span(name, category="app", **args):
+    if not tracer.enabled:
+        return nullcontext()
+    return tracer.span(name, category, **args)
+
+# Decorator timing every call of a function under the given span name
+def traced(name, category="app"):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# Decorator for functions Tk calls back (button commands, bindings, after() callbacks)
+def tk_callback(name):
+    return traced(name, category="tk")
+
+# Watches a Tk mainloop through a widget's after() heartbeat and records a "mainloop stall"
+# span whenever a beat arrives more than threshold_ms late, i.e. the loop was blocked
+def install_stall_monitor(widget, threshold_ms=None, interval_ms=50):
+    if not tracer.enabled:
+        return
+    if threshold_ms is None:
+        threshold_ms = float(os.environ.get(STALL_ENV, DEFAULT_STALL_MS))
+
+    def beat(expected_us):
+        now = tracer.now_us()
+        late_ms = (now - expected_us) / 1000
+        if late_ms > threshold_ms:
+            tracer.complete("mainloop stall", expected_us, now - expected_us, "stall", {"late_ms": round(late_ms, 1)})
+        widget.after(interval_ms, beat, tracer.now_us() + interval_ms * 1000)
+
+    widget.after(interval_ms, beat, tracer.now_us() + interval_ms * 1000)
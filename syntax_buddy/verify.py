@@ -0,0 +1,224 @@
+# Batch verification of the corpus: runs every Python example in the example pool and checks
+# every HTML/CSS example for markup mistakes in a process pool. Results are cached by content
+# hash, so a second run only re-checks entries whose example changed.
+
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+from syntax_buddy.batch import BatchPool, replace_file, split_batches
+from syntax_buddy.runner import ExamplePool
+from syntax_buddy.trace import traced
+
+# Cache of earlier results: {content hash: [ok, message]}
+VERIFY_CACHE_PATH = os.environ.get("SYNTAX_BUDDY_VERIFY_CACHE",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "syntax-buddy", "verify.json"))
+VERIFIER_VERSION = 2  # Bump when the checks change so cached results are not reused
+MARKUP_BATCH_SIZE = 256  # Examples per process pool task
+MARKUP_INLINE_LIMIT = 200  # Fewer markup examples than this are checked without a process pool
+
+# ok is None for entries in a language nothing can check
+VerifyResult = namedtuple("VerifyResult", "category item language ok message cached")
+
+VOID_ELEMENTS = frozenset("area base br col embed hr img input link meta param source track wbr".split())
+# Elements whose end tag HTML lets authors leave out
+OPTIONAL_END_TAGS = frozenset("body colgroup dd dt head html li optgroup option p rp rt tbody td tfoot th thead tr"
+                              .split())
+
+# Tags that are never closed or closed without being opened, plus CSS problems in <style>
+class MarkupChecker(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.open_tags = []  # (tag, line) of unclosed elements, innermost last
+        self.problems = []
+        self.style = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.open_tags.append((tag, self.getpos()[0]))
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        for depth in range(len(self.open_tags) - 1, -1, -1):
+            if self.open_tags[depth][0] == tag:
+                self.report_unclosed(self.open_tags[depth + 1:])
+                del self.open_tags[depth:]
+                return
+        self.problems.append(f"line {self.getpos()[0]}: </{tag}> has no matching <{tag}>")
+
+    def handle_data(self, data):
+        if self.open_tags and self.open_tags[-1][0] == "style":
+            self.style.append(data)
+
+    def report_unclosed(self, open_tags):
+        for tag, line in open_tags:
+            if tag not in OPTIONAL_END_TAGS:
+                self.problems.append(f"line {line}: <{tag}> is never closed")
+
+    def check(self, source):
+        self.feed(source)
+        self.close()
+        self.report_unclosed(self.open_tags)
+        self.problems += [f"<style>: {problem}" for problem in check_css("".join(self.style))]
+        return self.problems
+
+def check_html(source):
+    return MarkupChecker().check(source)
+
+CSS_TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>/\*.*?\*/)
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<open>\{) | (?P<close>\}) | (?P<semicolon>;)
+  | (?P<unterminated>/\*|["'])
+  | (?P<text>[^{};"'/]+|/)
+""", re.S | re.X)
+CSS_DECLARATION_PATTERN = re.compile(r"(--[\w-]+|-?[a-zA-Z][\w-]*)\s*:\s*\S")
+
+# Function to list the structural mistakes in a style sheet: unbalanced braces, unterminated
+# strings and comments, rules without selectors and declarations that are not "property: value"
+def check_css(source):
+    problems = []
+    blocks = []  # Line each open block started on
+    text = []  # Text since the last brace or semicolon
+    line = 1
+    for token in CSS_TOKEN_PATTERN.finditer(source):
+        kind = token.lastgroup
+        if kind == "unterminated":
+            problems.append(f"line {line}: unterminated {'comment' if token.group() == '/*' else 'string'}")
+            return problems
+        if kind in ("text", "string"):
+            text.append(token.group())
+        elif kind == "open":
+            if not "".join(text).strip():
+                problems.append(f"line {line}: block without a selector")
+            blocks.append(line)
+            text = []
+        elif kind in ("semicolon", "close"):
+            statement = "".join(text).strip()
+            text = []
+            if statement and blocks and not CSS_DECLARATION_PATTERN.match(statement):
+                problems.append(f"line {line}: '{statement}' is not a property: value declaration")
+            elif statement and not blocks and not statement.startswith("@"):
+                problems.append(f"line {line}: '{statement}' is outside any rule")
+            if kind == "close":
+                if blocks:
+                    blocks.pop()
+                else:
+                    problems.append(f"line {line}: '}}' has no matching '{{'")
+        line += token.group().count("\n")
+    statement = "".join(text).strip()
+    if statement and not blocks:
+        problems.append(f"line {line}: '{statement}' is outside any rule")
+    problems += [f"line {start}: '{{' is never closed" for start in blocks]
+    return problems
+
+MARKUP_CHECKS = {"html": check_html, "css": check_css}
+
+# Function to check a batch of (language, source) markup examples; runs in the process pool
+def check_markup_batch(jobs):
+    return [MARKUP_CHECKS[language](source) for language, source in jobs]
+
+# Function to key a result by everything that decides it
+def content_key(language, source):
+    return hashlib.sha256(f"{VERIFIER_VERSION}\0{language}\0{source}".encode("utf-8")).hexdigest()
+
+def load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(path, cache):
+    with replace_file(path) as cache_file:
+        json.dump(cache, cache_file)
+
+# Function to summarize a failed example run in one line
+def run_message(result):
+    if result.ok:
+        return ""
+    if result.error:
+        return result.error
+    lines = [line for line in result.stderr.splitlines() if line.strip()]
+    return lines[-1] if lines else "exited with an error"
+
+# Function to verify every example in the given categories (default: all). Python examples run
+# in an ExamplePool while HTML/CSS examples are checked in a process pool at the same time.
+# Returns VerifyResults in corpus order; cache_path=None disables the cache.
+@traced("verify.corpus")
+def verify_corpus(corpus, categories=None, workers=None, cache_path=VERIFY_CACHE_PATH, use_cached=True):
+    markup_pool = BatchPool(check_markup_batch, MARKUP_INLINE_LIMIT, workers)
+    cache = load_cache(cache_path) if cache_path else {}
+    entries = []  # (category, item, language, key)
+    outcomes = {}  # key -> (ok, message, cached)
+    python_jobs = {}  # key -> source
+    markup_jobs = {}  # key -> (language, source)
+    for category in categories or corpus:
+        language = corpus.language(category)
+        for item, details in corpus[category].items():
+            key = content_key(language, details["example"])
+            entries.append((category, item, language, key))
+            if key in outcomes or key in python_jobs or key in markup_jobs:
+                continue
+            if use_cached and key in cache:
+                ok, message = cache[key]
+                outcomes[key] = (ok, message, True)
+            elif language == "python":
+                python_jobs[key] = details["example"]
+            elif language in MARKUP_CHECKS:
+                markup_jobs[key] = (language, details["example"])
+            else:
+                outcomes[key] = (None, f"no checks for {language} examples", False)
+
+    keys = list(markup_jobs)
+    with markup_pool:
+        # Enough markup examples start checking in the process pool while the Python ones run
+        for batch in split_batches([markup_jobs[key] for key in keys], MARKUP_BATCH_SIZE):
+            markup_pool.submit(batch)
+
+        # Runs that hit a time or memory limit are reported but not cached: they depend on load
+        uncacheable = set()
+        if python_jobs:
+            pool = ExamplePool(workers=markup_pool.workers)
+            try:
+                job_keys = {pool.submit(source, code=corpus.example_code(source)): key
+                            for key, source in python_jobs.items()}
+                while job_keys:
+                    for result in pool.poll(0.05):
+                        key = job_keys.pop(result.job_id)
+                        outcomes[key] = (result.ok, run_message(result), False)
+                        if result.error:
+                            uncacheable.add(key)
+            finally:
+                pool.shutdown()
+
+        problem_lists = [problems for batch in markup_pool.results() for problems in batch]
+    for key, problems in zip(keys, problem_lists):
+        outcomes[key] = (not problems, "; ".join(problems), False)
+
+    if cache_path:
+        for key, (ok, message, cached) in outcomes.items():
+            if ok is not None and key not in uncacheable:
+                cache[key] = [ok, message]
+        save_cache(cache_path, cache)
+    return [VerifyResult(category, item, language, *outcomes[key]) for category, item, language, key in entries]
+
+# Function to format verification results as a plain-text report (failures only unless verbose)
+def format_report(results, seconds, verbose=False):
+    lines = []
+    for result in results:
+        if result.ok is False or verbose:
+            status = {True: "ok", False: "FAIL", None: "skip"}[result.ok]
+            lines.append(f"{status:<5} {result.category}: {result.item}\n")
+            if result.message:
+                lines.append(f"      {result.message}\n")
+    passed = sum(result.ok is True for result in results)
+    failed = sum(result.ok is False for result in results)
+    skipped = sum(result.ok is None for result in results)
+    cached = sum(result.cached for result in results)
+    lines.append(f"{passed} passed, {failed} failed, {skipped} skipped ({cached} from cache) in {seconds:.1f} s\n")
+    return "".join(lines)
@@ -0,0 +1,131 @@
+# Viewport-first highlighting for large documents such as broad search results.
+# The document is a list of sections (one formatted entry each). Sections on screen, plus a
+# margin, are highlighted as soon as the text is inserted; the rest are tagged in short
+# after_idle slices, and scrolling pulls the newly visible sections to the front. Like
+# render.py, this works on any widget with Tk's text and after/after_idle methods.
+
+import time
+from bisect import bisect_right
+
+from syntax_buddy.lexer import ENTRY_PATTERN, HIGHLIGHT_TAGS, lex_entry
+from syntax_buddy.render import spans_to_indices
+from syntax_buddy.trace import traced
+
+MARGIN_LINES = 100  # Lines above and below the viewport highlighted with it
+IDLE_SLICE_MS = 8  # Work done per idle slice before yielding to the event loop
+IDLE_GAP_MS = 1  # Pause between slices so input events get handled
+
+class LazyHighlighter:
+    def __init__(self, text_widget, language_of):
+        self.text_widget = text_widget
+        self.language_of = language_of
+        self.idle_id = None
+        self.visible_id = None
+        self.reset()
+
+    def reset(self):
+        self.sections = []  # Section text
+        self.first_lines = []  # Widget line each section starts on
+        self.categories = []  # Category for sections whose header does not name one
+        self.done = bytearray()  # 1 once a section is tagged
+        self.remaining = 0
+        self.next_line = 1
+        self.cursor = 0  # Where idle slices continue from
+
+    # Forgets the document and cancels pending slices (call before showing something else)
+    def clear(self):
+        for callback_id in (self.idle_id, self.visible_id):
+            if callback_id is not None:
+                self.text_widget.after_cancel(callback_id)
+        self.idle_id = None
+        self.visible_id = None
+        self.reset()
+
+    # Replaces the widget's content with the given sections
+    def show(self, sections, category=None):
+        self.clear()
+        self.text_widget.delete("1.0", "end")
+        self.append(sections, category)
+
+    # Adds sections at the end of the document
+    def append(self, sections, category=None):
+        sections = list(sections)
+        self.text_widget.insert("end", "".join(sections))
+        for section in sections:
+            self.sections.append(section)
+            self.first_lines.append(self.next_line)
+            self.categories.append(category)
+            self.next_line += section.count("\n")
+        self.done.extend(bytes(len(sections)))
+        self.remaining += len(sections)
+        self.highlight_visible()
+        self.schedule_idle()
+
+    # Call when the view scrolls (e.g. from yscrollcommand); coalesced into one idle callback
+    def on_scroll(self):
+        if self.visible_id is None and self.remaining:
+            self.visible_id = self.text_widget.after_idle(self.highlight_visible_from_scroll)
+
+    def highlight_visible_from_scroll(self):
+        self.visible_id = None
+        self.highlight_visible()
+
+    @traced("viewport.highlight_visible")
+    def highlight_visible(self):
+        if not self.remaining:
+            return
+        top = int(self.text_widget.index("@0,0").split(".")[0])
+        bottom = int(self.text_widget.index(f"@0,{self.text_widget.winfo_height()}").split(".")[0])
+        first = max(0, bisect_right(self.first_lines, top - MARGIN_LINES) - 1)
+        last = bisect_right(self.first_lines, bottom + MARGIN_LINES)
+        self.highlight(range(first, last))
+        self.cursor = max(self.cursor, last)
+
+    def schedule_idle(self):
+        if self.idle_id is None and self.remaining:
+            self.idle_id = self.text_widget.after(IDLE_GAP_MS, self.queue_idle_slice)
+
+    def queue_idle_slice(self):
+        self.idle_id = self.text_widget.after_idle(self.idle_slice)
+
+    @traced("viewport.idle_slice")
+    def idle_slice(self):
+        self.idle_id = None
+        deadline = time.perf_counter() + IDLE_SLICE_MS / 1000
+        while self.remaining and time.perf_counter() < deadline:
+            if self.cursor >= len(self.sections):
+                self.cursor = 0
+            batch = range(self.cursor, min(self.cursor + 16, len(self.sections)))
+            self.cursor = batch.stop
+            self.highlight(batch)
+        self.schedule_idle()
+
+    # (category, item) of the section shown on widget line `line`, or None
+    def entry_at(self, line):
+        index = bisect_right(self.first_lines, line) - 1
+        if index < 0:
+            return None
+        entry = ENTRY_PATTERN.match(self.sections[index])
+        if entry is None:
+            return None
+        return entry.group("category") or self.categories[index], entry.group("item")
+
+    # Lexes the untagged sections among `indexes` and applies them with one tag_add per tag
+    def highlight(self, indexes):
+        batch = {tag: [] for tag in HIGHLIGHT_TAGS}
+        for index in indexes:
+            if self.done[index]:
+                continue
+            self.done[index] = 1
+            self.remaining -= 1
+            section = self.sections[index]
+            entry = ENTRY_PATTERN.match(section)
+            if entry is None:
+                continue
+            spans = {tag: [] for tag in HIGHLIGHT_TAGS}
+            lex_entry(section, entry, self.language_of(entry.group("category") or self.categories[index]), spans)
+            for tag, indices in spans_to_indices(section, spans, self.first_lines[index]).items():
+                batch[tag].extend(indices)
+        for tag, indices in batch.items():
+            if indices:
+                self.text_widget.tag_add(tag, *indices)
@@ -0,0 +1,26 @@
+# Shared fixtures: language packs and their manifest written to a temporary folder
+
+import json
+
+import pytest
+
+# Returns a function that writes packs, {category: (language, {item: {"syntax", "example",
+# "description"}})}, into tmp_path and returns the folder. Calling it again rewrites just the packs
+# given (as an edit would), and the manifest only if a category is new.
+@pytest.fixture
+def make_corpus(tmp_path):
+    languages = {}  # Category -> language, in manifest order
+
+    def make(packs):
+        for category, (language, entries) in packs.items():
+            with open(tmp_path / f"{category.lower()}.json", "w", encoding="utf-8") as pack_file:
+                json.dump({"category": category, "language": language, "entries": entries}, pack_file)
+        if not packs.keys() <= languages.keys():
+            languages.update((category, language) for category, (language, _) in packs.items())
+            manifest = [{"category": category, "language": language, "file": f"{category.lower()}.json"}
+                        for category, language in languages.items()]
+            with open(tmp_path / "manifest.json", "w", encoding="utf-8") as manifest_file:
+                json.dump({"packs": manifest}, manifest_file)
+        return str(tmp_path)
+    return make
+
@@ -0,0 +1,38 @@
+# Tests for the batch helpers: process pools only for enough work, results in order, and files
+# replaced in one step
+
+import os
+
+import pytest
+
+from syntax_buddy.batch import BatchPool, replace_file, split_batches
+
+def double_all(batch):
+    return [value * 2 for value in batch]
+
+@pytest.mark.parametrize("inline_limit, pooled", [(1000, False), (10, True)])
+def test_batch_pool_returns_results_in_submit_order(inline_limit, pooled):
+    with BatchPool(double_all, inline_limit, workers=2) as pool:
+        for batch in split_batches(list(range(50)), 7):
+            pool.submit(batch)
+        assert (pool.executor is not None) == pooled
+        assert [value for batch in pool.results() for value in batch] == [value * 2 for value in range(50)]
+
+def test_batch_pool_stays_in_process_with_one_worker():
+    with BatchPool(double_all, 1, workers=1) as pool:
+        pool.submit([1, 2])
+        assert pool.executor is None
+        assert list(pool.throttle(0)) == []  # Nothing running; held batches wait for results()
+        assert list(pool.results()) == [[2, 4]]
+
+def test_replace_file_leaves_the_old_file_when_writing_fails(tmp_path):
+    path = str(tmp_path / "cache" / "state.json")
+    with replace_file(path) as state_file:
+        state_file.write("old")
+    with pytest.raises(RuntimeError):
+        with replace_file(path) as state_file:
+            state_file.write("half")
+            raise RuntimeError("interrupted")
+    with open(path, encoding="utf-8") as state_file:
+        assert state_file.read() == "old"
+    assert os.listdir(tmp_path / "cache") == ["state.json"]
@@ -0,0 +1,53 @@
+# Tests for the HTML export: a re-export only renders what changed and deletes the pages of
+# removed entries, and the CLI takes its categories as repeated --category options
+
+import os
+
+from syntax_buddy.cli import main
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.export import export_corpus
+
+def entry(example):
+    return {"syntax": "", "example": example, "description": "An example."}
+
+PACKS = {
+    "Python": ("python", {"For Loop": entry("for n in range(2): pass"), "If": entry("if True: pass")}),
+    "CSS": ("css", {"Color": entry("p { color: red; }")}),
+}
+
+def export(data_dir, output_dir, **options):
+    return export_corpus(Corpus(data_dir, use_snapshot=False), str(output_dir), workers=1, **options)
+
+def test_re_export_renders_only_changed_entries(make_corpus, tmp_path):
+    data_dir = make_corpus(PACKS)
+    site = tmp_path / "site"
+    assert export(data_dir, site) == {"rendered": 3, "unchanged": 0, "removed": 0}
+    assert (site / "python" / "for-loop.html").exists() and (site / "css" / "color.preview.html").exists()
+    assert export(data_dir, site) == {"rendered": 0, "unchanged": 3, "removed": 0}
+
+    make_corpus({"Python": ("python", {"For Loop": entry("for n in range(3): pass")})})
+    assert export(data_dir, site) == {"rendered": 1, "unchanged": 1, "removed": 1}
+    assert "range(3)" in (site / "python" / "for-loop.html").read_text(encoding="utf-8")
+    assert not (site / "python" / "if.html").exists()
+    assert "if.html" not in (site / "python" / "index.html").read_text(encoding="utf-8")
+    assert export(data_dir, site, force=True) == {"rendered": 2, "unchanged": 0, "removed": 0}
+
+def test_cheat_sheet_reuses_unchanged_fragments(make_corpus, tmp_path):
+    data_dir = make_corpus(PACKS)
+    sheets = tmp_path / "sheets"
+    export(data_dir, sheets, cheat_sheet=True)
+    make_corpus({"Python": ("python", dict(PACKS["Python"][1], If=entry("if False: pass")))})
+    assert export(data_dir, sheets, cheat_sheet=True) == {"rendered": 1, "unchanged": 2, "removed": 0}
+    sheet = (sheets / "python.html").read_text(encoding="utf-8")
+    assert 'id="for-loop"' in sheet and "False" in sheet
+
+def test_cli_exports_the_categories_given(make_corpus, tmp_path, capsys):
+    data_dir = make_corpus(dict(PACKS, HTML=("html", {"Div": entry("<div>x</div>")})))
+    site = tmp_path / "site"
+    assert main(["--data", data_dir, "export", str(site), "--category", "css", "--category", "HTML",
+                 "--workers", "1"]) == 0
+    assert "2 entries rendered" in capsys.readouterr().out
+    assert sorted(name for name in os.listdir(site) if not name.startswith(".")) == [
+        "css", "html", "index.html", "style.css"]
+    assert main(["--data", data_dir, "export", str(site), "--category", "Ruby"]) == 1
+    assert "Unknown category 'Ruby'" in capsys.readouterr().err
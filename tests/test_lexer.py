@@ -0,0 +1,51 @@
+# Tests for the single-pass lexers and the spans they give each entry
+
+from syntax_buddy.lexer import LEXERS, TOKEN_TAGS, lex_document
+from syntax_buddy.render import format_entry, format_result
+
+def tokens(language, code):
+    return [(TOKEN_TAGS[token.lastgroup], token.group()) for token in LEXERS[language].finditer(code)]
+
+def test_python_tokens():
+    assert tokens("python", "for x in y:  # not 'a string'\n    s = \"in\" if self else 'x'") == [
+        ("keyword", "for"), ("keyword", "in"), ("comment", "# not 'a string'"),
+        ("string", '"in"'), ("keyword", "if"), ("keyword", "self"), ("keyword", "else"), ("string", "'x'")]
+
+def test_python_keywords_need_word_boundaries():
+    assert tokens("python", "format information isinstance") == []
+
+def test_python_unclosed_strings_run_to_the_end():
+    assert tokens("python", 'x = """never closed\nfor') == [("string", '"""never closed\nfor')]
+    assert tokens("python", "x = 'open\nfor") == [("string", "'open"), ("keyword", "for")]
+
+def test_html_tokens():
+    assert tokens("html", '<!-- note --><a href="x.html">link</a>') == [
+        ("comment", "<!-- note -->"), ("keyword", "<a"), ("string", '"x.html"'), ("keyword", ">"),
+        ("keyword", "</a"), ("keyword", ">")]
+
+def test_css_tokens():
+    # Property names follow "{" or ";" and come before ":"; selectors and values are not marked
+    assert tokens("css", "@media print { p { color: red; font-family: 'a'; } /* hi */ }") == [
+        ("keyword", "@media"), ("keyword", " color"), ("keyword", " font-family"), ("string", "'a'"),
+        ("comment", "/* hi */")]
+
+def spans_text(content, spans):
+    return {tag: [content[start:end] for start, end in ranges] for tag, ranges in spans.items()}
+
+def test_entry_spans_cover_syntax_example_and_description():
+    content = format_entry("If", {"syntax": "if x:", "example": "if True: pass", "description": "Branch if true."})
+    assert spans_text(content, lex_document(content, lambda category: "python", "Python")) == {
+        "keyword": ["if", "if", "True", "pass"], "comment": [], "string": [], "description": ["Branch if true."]}
+
+def test_search_results_use_the_language_of_their_category():
+    languages = {"Python": "python", "HTML": "html"}
+    content = (format_result("Python", "Pass", {"syntax": "pass", "example": "pass", "description": "Nothing."})
+               + format_result("HTML", "Pass", {"syntax": "<b>", "example": "<b>pass</b>", "description": "Bold."}))
+    spans = spans_text(content, lex_document(content, languages.get))
+    assert spans["keyword"] == ["pass", "pass", "<b", ">", "<b", ">", "</b", ">"]
+    assert spans["description"] == ["Nothing.", "Bold."]
+
+def test_unknown_language_only_marks_the_description():
+    content = format_entry("X", {"syntax": "if x", "example": "for y", "description": "Plain."})
+    assert spans_text(content, lex_document(content, lambda category: None)) == {
+        "keyword": [], "comment": [], "string": [], "description": ["Plain."]}
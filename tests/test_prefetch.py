@@ -0,0 +1,63 @@
+# Tests for idle-time prefetching: the entries around the one shown are rendered and their
+# examples compiled before they are opened, and a later lookup counts as a prefetch hit
+
+import marshal
+
+import pytest
+
+from benchmarks.headless import HeadlessText
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.prefetch import Prefetcher
+from syntax_buddy.render import RenderCache, format_entry, render_document
+
+def entry(example):
+    return {"syntax": "", "example": example, "description": ""}
+
+PACKS = {
+    "Python": ("python", {f"Item {number}": entry(f"print({number})") for number in range(8)}),
+    "CSS": ("css", {"Color": entry("p { color: red; }")}),
+}
+
+@pytest.fixture
+def prefetcher(make_corpus):
+    corpus = Corpus(make_corpus(PACKS), use_snapshot=False)
+
+    def build_view(category, item):
+        return render_document(format_entry(item, corpus[category][item]), corpus.language, category)
+    return Prefetcher(HeadlessText(), corpus, RenderCache(), build_view)
+
+def test_neighbours_are_prefetched_nearest_first(prefetcher):
+    prefetcher.neighbours("Python", "Item 3")
+    assert list(prefetcher.queue) == [("Python", "Item 4"), ("Python", "Item 2"),
+                                      ("Python", "Item 5"), ("Python", "Item 1")]
+    prefetcher.widget.run_pending()
+    assert not prefetcher.queue and prefetcher.idle_id is None
+    cache = prefetcher.render_cache
+    assert set(cache.views) == {("Python", "Item 1"), ("Python", "Item 2"), ("Python", "Item 4"), ("Python", "Item 5")}
+
+    cache.get(("Python", "Item 4"), lambda: None)
+    cache.get(("Python", "Item 6"), lambda: prefetcher.build_view("Python", "Item 6"))
+    stats = prefetcher.stats()
+    assert (stats["prefetches"], stats["prefetch_hits"], stats["prefetch_hit_rate"]) == (4, 1, 0.25)
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+def test_python_examples_are_compiled_ahead_of_a_run(prefetcher):
+    prefetcher.category_top("Python")
+    prefetcher.widget.run_pending()
+    assert marshal.loads(prefetcher.example_code("print(0)")) is not None
+    assert prefetcher.example_code("print('never shown')") is None
+    prefetcher.compile("print(")  # Broken examples are left for the worker to report
+    assert "print(" not in prefetcher.codes
+    stats = prefetcher.stats()
+    assert (stats["code_hits"], stats["code_misses"], stats["code_hit_rate"]) == (1, 1, 0.5)
+
+def test_a_new_view_replaces_the_queue(prefetcher):
+    prefetcher.category_top("Python")
+    prefetcher.search_hits([("CSS", "Color"), ("Python", "Gone")])
+    prefetcher.widget.run_pending()
+    assert list(prefetcher.render_cache.views) == [("CSS", "Color")]  # Missing entries are skipped
+
+    prefetcher.neighbours("Python", "Item 0")
+    prefetcher.cancel()
+    prefetcher.widget.run_pending()
+    assert list(prefetcher.render_cache.views) == [("CSS", "Color")]
@@ -0,0 +1,59 @@
+# Tests for the preview server: stable page URLs and the live page's event stream
+
+import socket
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from syntax_buddy.preview import LIVE_CHECK_SECONDS, LIVE_RECONNECT_GRACE, PreviewServer, build_preview_page
+
+@pytest.fixture
+def server():
+    server = PreviewServer()
+    yield server
+    server.shutdown()
+
+def test_pages_have_stable_urls(server):
+    url = server.publish(build_preview_page("html", "Bold", "<b>hi</b>"))
+    assert server.publish(build_preview_page("html", "Bold", "<b>hi</b>")) == url
+    with urllib.request.urlopen(url) as reply:
+        assert b"<b>hi</b>" in reply.read()
+        etag = reply.headers["ETag"]
+    request = urllib.request.Request(url, headers={"If-None-Match": etag})
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request)
+    assert error.value.code == 304
+
+def test_live_page_shows_the_latest_preview(server):
+    server.publish(build_preview_page("css", "Old", "p { color: red; }"))
+    server.publish(build_preview_page("css", "New", "p { color: blue; }"))
+    with urllib.request.urlopen(server.live_url) as reply:
+        body = reply.read()
+    assert b"CSS Preview: New" in body and b'new EventSource("/events")' in body
+
+def read_event(stream):
+    data = b""
+    while not data.endswith(b"\n\n"):
+        data += stream.recv(4096)
+    return data.rsplit(b"data: ", 1)[1].strip().decode("ascii")
+
+def test_event_stream_marks_the_tab_live_until_it_closes(server):
+    first = server.publish("<p>one</p>").rsplit("/", 1)[1]
+    assert not server.live_client_connected()
+    stream = socket.create_connection(server.httpd.server_address[:2])
+    stream.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    assert read_event(stream) == first
+    assert server.live_client_connected()
+
+    # Publishing pushes the new version at once, however long the tab has been idle
+    second = server.publish("<p>two</p>").rsplit("/", 1)[1]
+    assert read_event(stream) == second
+
+    stream.close()
+    time.sleep(LIVE_CHECK_SECONDS * 3)
+    assert server.live_streams == 0
+    assert server.live_client_connected()  # A reloading page gets a moment to reconnect
+    time.sleep(LIVE_RECONNECT_GRACE)
+    assert not server.live_client_connected()
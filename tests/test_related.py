@@ -0,0 +1,64 @@
+# Tests for "See also" suggestions: entries sharing rare words relate, and the NumPy (dense and
+# sparse), lazy and pure-Python ways of computing them agree
+
+import pytest
+
+from benchmarks.run import build_corpus
+from syntax_buddy import related
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.related import RelatedEntries
+from syntax_buddy.search import SearchIndex
+
+def entry(description):
+    return {"syntax": "", "example": "", "description": description}
+
+DATA = {
+    "Python": {
+        "For Loop": entry("Repeat code for every element of a sequence."),
+        "While Loop": entry("Repeat code until a condition turns false."),
+        "Open": entry("Read a file from disk."),
+        "Pathlib": entry("Build file paths on disk."),
+        "Lambda": entry("Small anonymous function."),
+    },
+    "CSS": {
+        "Flexbox": entry("Arrange boxes along one axis."),
+        "Grid": entry("Arrange boxes in rows and columns."),
+        "Color": entry("Text colour."),
+    },
+}
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("corpus")
+    build_corpus(600, str(directory))
+    return SearchIndex(Corpus(str(directory), use_snapshot=False))
+
+def all_related(index):
+    table = RelatedEntries(index)
+    return [table.get(*entry) for entry in index.entries]
+
+def test_entries_sharing_rare_words_are_related():
+    table = RelatedEntries(SearchIndex(DATA))
+    assert table.get("Python", "For Loop")[0] == ("Python", "While Loop")
+    assert table.get("Python", "Open")[0] == ("Python", "Pathlib")
+    assert table.get("CSS", "Grid")[0] == ("CSS", "Flexbox")
+    assert table.get("CSS", "Color") == []  # No word in common with anything
+    assert table.get("CSS", "Missing") == []
+
+def test_every_way_of_computing_gives_the_same_table(index, monkeypatch):
+    dense = all_related(index)
+    assert sum(map(len, dense)) > 0
+    assert all(entry not in others for entry, others in zip(index.entries, dense))
+    monkeypatch.setattr(related, "RELATED_DENSE_CELLS", 0)
+    assert all_related(index) == dense
+    monkeypatch.setattr(related, "RELATED_PRECOMPUTE", 0)  # Rows computed as they are asked for
+    assert all_related(index) == dense
+    monkeypatch.setattr(related, "numpy", None)
+    assert all_related(index) == dense
+
+def test_table_survives_the_snapshot_state(index, monkeypatch):
+    table = RelatedEntries(index)
+    restored = RelatedEntries.from_state(table.state())
+    assert [restored.get(*entry) for entry in index.entries] == all_related(index)
+    monkeypatch.setattr(related, "RELATED_PRECOMPUTE", 0)
+    assert RelatedEntries(index).state() is None  # Only complete tables are saved
@@ -0,0 +1,86 @@
+# Tests for reloading an edited pack while running: only the entries that changed are reported
+# and indexed again, the patched index finds what a fresh one finds, and the "See also" table
+# recomputes just the rows the edit touches
+
+import json
+import os
+
+import pytest
+
+from benchmarks.run import build_corpus
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.related import RelatedEntries
+from syntax_buddy.search import SearchIndex
+
+def entry(description):
+    return {"syntax": "", "example": "", "description": description}
+
+PACKS = {
+    "Python": ("python", {"For Loop": entry("Repeat code."), "If": entry("Branch."), "Pass": entry("Do nothing.")}),
+    "CSS": ("css", {"Color": entry("Text colour.")}),
+}
+
+def test_reload_reports_and_applies_only_the_changed_entries(make_corpus):
+    data_dir = make_corpus(PACKS)
+    corpus = Corpus(data_dir, use_snapshot=False)
+    corpus.search_index()
+    heard = []
+    corpus.add_listener(lambda category, items: heard.append((category, items)))
+
+    make_corpus({"Python": ("python", {"For Loop": entry("Repeat code for each item."), "If": entry("Branch."),
+                                       "Match": entry("Branch on a pattern.")})})
+    assert corpus.changed_packs() == ["Python"]
+    category, pack, items, _ = reloaded = corpus.read_reload("Python")
+    assert (category, items) == ("Python", {"For Loop", "Pass", "Match"})
+    assert "Pass" in corpus["Python"]  # Nothing applied yet
+    assert corpus.apply_reload(reloaded) == items
+    assert heard == [("Python", items)]
+    assert list(corpus["Python"]) == ["For Loop", "If", "Match"]
+    assert corpus.changed_packs() == []
+    assert corpus.search_index().search("pattern") == [("Python", "Match")]
+    assert corpus.search_index().search("nothing") == []
+
+    # Saving a pack unchanged tells nobody
+    make_corpus({"CSS": PACKS["CSS"]})
+    os.utime(os.path.join(data_dir, "css.json"), ns=(0, 0))
+    assert corpus.reload("CSS") == set()
+    assert len(heard) == 1
+
+@pytest.fixture
+def edited_corpus(tmp_path):
+    build_corpus(600, str(tmp_path))
+    corpus = Corpus(str(tmp_path), use_snapshot=False)
+    corpus.related_entries()
+    path = tmp_path / "python.json"
+    pack = json.loads(path.read_text(encoding="utf-8"))
+    items = list(pack["entries"])
+    pack["entries"][items[0]]["description"] = pack["entries"][items[1]]["description"]
+    del pack["entries"][items[2]]
+    pack["entries"]["Brand New"] = entry("open file close handle context manager")
+    path.write_text(json.dumps(pack), encoding="utf-8")
+    edits = {("Python", items[0]), ("Python", items[2]), ("Python", "Brand New")}
+    assert {("Python", item) for item in corpus.reload("Python")} == edits
+    return corpus, edits
+
+def test_patched_index_matches_a_fresh_build(edited_corpus):
+    corpus, _ = edited_corpus
+    patched, fresh = corpus.search_index(), SearchIndex(corpus)
+    assert patched.vocabulary == fresh.vocabulary
+    assert {variant: sorted(tokens) for variant, tokens in patched.deletions.items()} == \
+        {variant: sorted(tokens) for variant, tokens in fresh.deletions.items()}
+    queries = fresh.vocabulary[::7] + ["contxt", "cont", "brand new", "==", "def name"]
+    for query in queries:
+        assert set(patched.search(query, limit=None)) == set(fresh.search(query, limit=None)), query
+
+def test_related_table_recomputes_the_rows_the_edit_touches(edited_corpus):
+    corpus, edits = edited_corpus
+    assert not corpus.has_related()
+    related = corpus.related_entries()
+    assert corpus.has_related()
+    fresh = RelatedEntries(SearchIndex(corpus))
+    assert set(related.ids) == set(fresh.ids)
+    removed = edits - set(fresh.ids)
+    assert len(removed) == 1
+    for entry in edits - removed:
+        assert related.get(*entry) == fresh.get(*entry)
+    assert not any(removed & set(related.get(*entry)) for entry in fresh.ids)
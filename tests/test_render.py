@@ -0,0 +1,45 @@
+# Tests for the render cache: views are built once, the least recently shown go first, and
+# invalidation drops only what it names
+
+from benchmarks.headless import HeadlessText
+from syntax_buddy.render import RenderCache, format_entry, paint, render_document
+
+LANGUAGES = {"Python": "python", "CSS": "css"}
+
+def build(key):
+    category, item = key
+    details = {"syntax": "for x in y:", "example": "for n in 'ab': print(n)", "description": "Loop."}
+    return lambda: render_document(format_entry(item, details), LANGUAGES.get, category)
+
+def test_views_are_built_once_and_least_recently_used_go_first():
+    cache = RenderCache(maxsize=2)
+    first = cache.get(("Python", "For"), build(("Python", "For")))
+    assert cache.get(("Python", "For"), build(("Python", "While"))) is first
+    cache.get(("Python", "If"), build(("Python", "If")))
+    cache.get(("Python", "For"), build(("Python", "For")))  # Now the most recently shown
+    cache.get(("CSS", "Color"), build(("CSS", "Color")))
+    assert list(cache.views) == [("Python", "For"), ("CSS", "Color")]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"], stats["hit_rate"]) == (2, 3, 2, 0.4)
+
+def test_invalidate_drops_items_categories_or_everything():
+    cache = RenderCache()
+    keys = [("Python", "For"), ("Python", "If"), ("CSS", "Color")]
+    for key in keys:
+        cache.get(key, build(key))
+    cache.invalidate("Python", {"If"})
+    assert list(cache.views) == [("Python", "For"), ("CSS", "Color")]
+    cache.invalidate("Python")
+    assert list(cache.views) == [("CSS", "Color")]
+    cache.invalidate()
+    assert not cache.views
+
+def test_cached_view_paints_the_same_tags_as_a_fresh_one():
+    cache = RenderCache()
+    key = ("Python", "For")
+    cache.get(key, build(key))
+    cached, fresh = HeadlessText(), HeadlessText()
+    paint(cached, cache.get(key, build(key)))
+    paint(fresh, build(key)())
+    assert cached.get("1.0", "end") == fresh.get("1.0", "end")
+    assert cached.tags == fresh.tags and cached.tags["keyword"]
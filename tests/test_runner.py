@@ -0,0 +1,116 @@
+# Tests for the example pool: output capture, errors, limits and the worker's sandbox
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from syntax_buddy.runner import ExamplePool
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ExamplePool(workers=1, wall_seconds=2.0)
+    yield pool
+    pool.shutdown()
+
+# Runs one example and waits for its RunResult
+def run(pool, source):
+    job_id = pool.submit(source)
+    while True:
+        for result in pool.poll(0.05):
+            if result.job_id == job_id:
+                return result
+
+def last_line(text):
+    return text.strip().splitlines()[-1]
+
+def test_output_is_captured(pool):
+    result = run(pool, "import sys\nprint('out')\nprint('err', file=sys.stderr)")
+    assert (result.ok, result.stdout, result.stderr) == (True, "out\n", "err\n")
+
+def test_exceptions_fail_the_run(pool):
+    result = run(pool, "raise KeyError('missing')")
+    assert not result.ok and last_line(result.stderr) == "KeyError: 'missing'"
+
+def test_exit_status(pool):
+    assert run(pool, "raise SystemExit(0)").ok
+    assert not run(pool, "raise SystemExit(3)").ok
+
+def test_endless_example_is_stopped(pool):
+    result = run(pool, "while True: pass")
+    assert not result.ok and result.error
+    assert run(pool, "print('next')").stdout == "next\n"  # A fresh worker takes over
+
+def test_examples_can_use_their_scratch_folder(pool):
+    result = run(pool, "import tempfile\nopen('a.txt', 'w').write('saved')\n"
+                       "with tempfile.TemporaryFile() as f: f.write(b'x')\nprint(open('a.txt').read())")
+    assert (result.ok, result.stdout) == (True, "saved\n")
+
+@pytest.mark.parametrize("source", [
+    "open({outside!r}, 'w')",
+    "import os\nos.open({outside!r}, os.O_WRONLY | os.O_CREAT)",
+    "open(__import__('os').path.expanduser('~/.bashrc')).read()",
+    "import socket\nsocket.create_connection(('127.0.0.1', 9))",
+    "import subprocess\nsubprocess.run(['true'])",
+    "import os\nos.system('true')",
+    "import ctypes",
+    "import os\nos.kill(os.getppid(), 0)",
+    "import os, signal\nos.killpg(os.getpgid(0), signal.SIGTERM)",
+    "import signal, threading\nsignal.pthread_kill(threading.main_thread().ident, signal.SIGTERM)",
+    "import resource\nresource.setrlimit(resource.RLIMIT_CPU, (-1, -1))",
+])
+def test_sandbox_refuses(pool, tmp_path, source):
+    outside = str(tmp_path / "outside.txt")
+    result = run(pool, source.format(outside=outside))
+    assert not result.ok
+    assert last_line(result.stderr).startswith("PermissionError: examples may not do this")
+    assert not os.path.exists(outside)
+
+@pytest.mark.parametrize("change", [
+    "import builtins\nbuiltins.print = lambda *args, **kwargs: None",
+    "import sys\nsys.stdout = open('other.txt', 'w')",
+    "import os\nos.chdir('..')",
+    "import json\njson.dumps = None\nimport sys\nsys.path.insert(0, '/nowhere')",
+    "import os\nos.environ['PYTHONHOME'] = '/nowhere'\nimport sys\nsys.setrecursionlimit(50)",
+])
+def test_jobs_do_not_see_what_earlier_jobs_changed(pool, change):
+    # Two jobs in a row on the same worker: the second runs as if the first never had
+    assert run(pool, change).ok
+    check = ("import json, os, sys\nprint('hello')\n"
+             f"print(json.dumps(os.path.realpath(os.getcwd()) == {os.path.realpath(pool.scratch_dir)!r}))\n"
+             "print('/nowhere' in sys.path, 'PYTHONHOME' in os.environ, sys.getrecursionlimit() > 50)")
+    result = run(pool, check)
+    assert (result.ok, result.stdout) == (True, "hello\ntrue\nFalse False True\n")
+
+def test_modules_imported_by_a_job_are_imported_afresh(pool):
+    assert run(pool, "import textwrap\ntextwrap.marker = 1").ok
+    assert run(pool, "import textwrap\nprint(hasattr(textwrap, 'marker'))").stdout == "False\n"
+
+def test_examples_cannot_add_audit_hooks(pool):
+    # sys.addaudithook swallows the refusal, but the hook is never added
+    result = run(pool, "import sys\nsys.addaudithook(lambda event, args: print('hooked', event))\n"
+                       "open('hooked.txt', 'w').close()")
+    assert (result.ok, result.stdout) == (True, "")
+
+def test_examples_cannot_signal_other_processes(pool):
+    bystander = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        result = run(pool, f"import os, signal\nos.kill({bystander.pid}, signal.SIGKILL)")
+        assert not result.ok and "PermissionError" in result.stderr
+        assert bystander.poll() is None
+    finally:
+        bystander.kill()
+        bystander.wait()
+
+def test_cpu_limit_stops_busy_examples_and_workers_retire_before_it():
+    pool = ExamplePool(workers=1, wall_seconds=10.0, cpu_seconds=0.2)
+    try:
+        result = run(pool, "while True: pass")
+        assert not result.ok and "CPU limit" in result.error
+        first = run(pool, "import os\nprint(os.getpid())").stdout
+        # Leaves less than one job's CPU time under the worker's limit, so it is replaced after
+        assert run(pool, "import time\nwhile time.process_time() < 0.9: pass").ok
+        assert run(pool, "import os\nprint(os.getpid())").stdout != first
+    finally:
+        pool.shutdown()
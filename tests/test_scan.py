@@ -0,0 +1,77 @@
+# Tests for the project scanner: the constructs found in each language, skipped folders and
+# broken files, the per-file cache, and pairing hits with corpus entries
+
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.scan import format_scan_report, match_entries, scan_css, scan_html, scan_project, scan_python
+
+PYTHON_SOURCE = """import os
+
+class Greeter:
+    def greet(self):
+        try:
+            for name in ["a"]:
+                print(f"hi {name}")
+        except OSError:
+            pass
+
+def main():
+    return open(os.devnull)
+"""
+
+def test_python_constructs():
+    hits = scan_python(PYTHON_SOURCE)
+    assert hits[("python", "Import")] == [1]
+    assert hits[("python", "Class Definition")] == [3]
+    assert hits[("python", "Method")] == [4]
+    assert hits[("python", "Function Definition")] == [11]
+    assert hits[("python", "Try-Except")] == [5]
+    assert hits[("python", "For Loop")] == [6]
+    assert hits[("python", "Open File")] == [12]
+
+def test_css_and_html_constructs():
+    assert scan_css("#top .nav a {\n  display: flex;\n  margin-top: 0;\n}\n@media print { p { color: red; } }") == {
+        ("css", "Selector (ID)"): [1], ("css", "Selector (Class)"): [1], ("css", "Selector (Element)"): [1, 5],
+        ("css", "Display"): [2], ("css", "Flexbox"): [2], ("css", "Margin"): [3], ("css", "Media Query"): [5],
+        ("css", "Color"): [5]}
+    hits = scan_html('<h1>Title</h1>\n<p style="padding: 1em">x</p>\n<style>\n.box { grid-area: a; }\n</style>')
+    assert hits[("html", "Heading")] == [1]
+    assert hits[("html", "Attribute")] == [2]
+    assert hits[("css", "Padding")] == [2]
+    assert hits[("css", "Grid")] == [4]
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+def test_scan_caches_unchanged_files(tmp_path):
+    project = tmp_path / "project"
+    write(project / "app.py", PYTHON_SOURCE)
+    write(project / "web" / "index.html", "<h1>Title</h1>")
+    write(project / "broken.py", "def (:\n")
+    write(project / "node_modules" / "lib.py", "import sys")
+    write(project / "notes.txt", "for x in y")
+    cache_path = str(tmp_path / "scan.bin")
+
+    result = scan_project(str(project), workers=1, cache_path=cache_path)
+    assert (result.files, result.parsed, result.cached) == (3, 3, 0)
+    assert [path for path, _ in result.errors] == ["broken.py"]
+    assert result.hits[("python", "Import")] == [("app.py", 1)]
+
+    write(project / "web" / "index.html", "<h1>Title</h1>\n<h2>More</h2>")
+    result = scan_project(str(project), workers=1, cache_path=cache_path)
+    assert (result.files, result.parsed, result.cached) == (3, 1, 2)
+    assert result.hits[("html", "Heading")] == [("web/index.html", 1), ("web/index.html", 2)]
+    assert scan_project(str(project), workers=1, cache_path=cache_path, use_cached=False).parsed == 3
+
+def test_hits_are_matched_to_corpus_entries(make_corpus, tmp_path):
+    entry = {"syntax": "", "example": "", "description": ""}
+    corpus = Corpus(make_corpus({"Python": ("python", {"For Loop": entry, "Import": entry, "Lambda Function": entry})}),
+                    use_snapshot=False)
+    project = tmp_path / "project"
+    write(project / "app.py", PYTHON_SOURCE)
+    result = scan_project(str(project), workers=1, cache_path=None)
+    matches = match_entries(corpus, result)
+    assert matches == [(("Python", "For Loop"), [("app.py", 6)]), (("Python", "Import"), [("app.py", 1)])]
+    report = format_scan_report(result, matches, 0.5)
+    assert report.startswith("Python: For Loop - 1 use in 1 file\n    app.py:6\n")
+    assert report.endswith("1 files (1 parsed, 0 from cache), 2 entries used, in 0.5 s\n")
@@ -0,0 +1,101 @@
+# Tests for scratchpad highlighting: after any run of edits, relexing only the changed lines
+# leaves the same tokens as lexing the whole source again, and pauses are debounced
+
+import random
+
+import pytest
+
+from syntax_buddy.scratchpad import RELEX_MS, SETTLE_MS, Scratchpad
+
+# Just enough of a Tk text widget: the whole text as one string and a queue of after() callbacks
+class EditableText:
+    def __init__(self):
+        self.text = ""
+        self.callbacks = {}
+        self.next_callback_id = 0
+
+    def delete(self, start, end=None):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += text
+
+    def get(self, start, end=None):
+        return self.text
+
+    def tag_add(self, tag, *indices):
+        pass
+
+    def tag_remove(self, tag, start, end=None):
+        pass
+
+    def after(self, ms, callback, *args):
+        self.next_callback_id += 1
+        self.callbacks[self.next_callback_id] = (ms, callback, args)
+        return self.next_callback_id
+
+    def after_cancel(self, callback_id):
+        self.callbacks.pop(callback_id, None)
+
+    # Runs the callbacks queued now (not the ones they queue); returns their delays
+    def run_pending(self):
+        pending, self.callbacks = self.callbacks, {}
+        for ms, callback, args in pending.values():
+            callback(*args)
+        return [ms for ms, _, _ in pending.values()]
+
+SOURCES = {
+    "python": 'def greet(name):\n    """Say hi."""\n    # greet\n    return f"hi {name}" if name else None\n',
+    "css": "p {\n  color: red; /* note */\n  content: 'x';\n}\n@media print { p { margin: 0; } }\n",
+    "html": '<div class="box">\n  <!-- note -->\n  <p>Hi</p>\n</div>\n',
+}
+# Pieces typed in, including ones that open or close multi-line strings and comments
+SNIPPETS = ['"""', "'", "/*", "*/", "<!--", "-->", "\n", "\n\n", "for x in y:", " color: blue;", "{", "}", "#", ""]
+
+def fresh_tokens(source, language):
+    widget = EditableText()
+    scratchpad = Scratchpad(widget)
+    scratchpad.load(source, language)
+    return scratchpad.tokens
+
+@pytest.mark.parametrize("language", sorted(SOURCES))
+def test_relexed_tokens_match_a_full_lex(language):
+    rng = random.Random(language)
+    widget = EditableText()
+    scratchpad = Scratchpad(widget)
+    scratchpad.load(SOURCES[language], language)
+    for _ in range(300):
+        text = widget.text
+        start = rng.randrange(len(text) + 1)
+        end = min(len(text), start + rng.choice([0, 0, 1, 3, 12]))
+        widget.text = text[:start] + rng.choice(SNIPPETS) + text[end:]
+        scratchpad.relex(settle=False)
+        assert scratchpad.tokens == fresh_tokens(widget.text, language), widget.text
+
+def test_small_edit_relexes_few_lines():
+    widget = EditableText()
+    scratchpad = Scratchpad(widget)
+    scratchpad.load("x = 1\n" * 200, "python")
+    lines = widget.text.split("\n")
+    lines[100] = "y = 'two'  # changed"
+    widget.text = "\n".join(lines)
+    scratchpad.relex(settle=False)
+    assert scratchpad.relexed <= 4
+
+def test_edits_are_debounced_and_settle_with_the_source():
+    settled = []
+    widget = EditableText()
+    scratchpad = Scratchpad(widget, settled.append)
+    scratchpad.load("print('a')", "python")
+    widget.text = "print('ab')"
+    scratchpad.on_edit()
+    scratchpad.on_edit()
+    assert widget.run_pending() == [RELEX_MS]
+    assert widget.run_pending() == [SETTLE_MS]
+    assert settled == ["print('ab')"]
+
+    scratchpad.on_edit()
+    scratchpad.close()
+    assert widget.callbacks == {}
+    scratchpad.on_edit()  # Closed: edits are not followed
+    assert widget.callbacks == {}
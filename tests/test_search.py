@@ -0,0 +1,73 @@
+# Tests for the inverted search index: ranking, prefix and typo lookups, streaming
+
+import marshal
+
+from syntax_buddy.search import SEARCH_MAX_EXPANSIONS, SearchIndex
+
+def entry(syntax="", example="", description=""):
+    return {"syntax": syntax, "example": example, "description": description}
+
+DATA = {
+    "Python": {
+        "For Loop": entry("for item in iterable:", "for n in range(3): print(n)", "Repeat code for each item."),
+        "Function Definition": entry("def name(args):", "def greet(): pass", "Reuse a block of code."),
+        "While Loop": entry("while condition:", "while True: break", "Repeat until a condition fails."),
+    },
+    "CSS": {
+        "Flexbox": entry("display: flex;", ".box { display: flex; }", "Lay items out in a row."),
+        "Color": entry("color: value;", "p { color: red; }", "Set the text colour of a loop-free page."),
+    },
+}
+
+def test_title_hits_outrank_description_hits():
+    # "loop" is in two titles and one description
+    assert SearchIndex(DATA).search("loop") == [("Python", "For Loop"), ("Python", "While Loop"), ("CSS", "Color")]
+
+def test_every_term_must_match():
+    assert SearchIndex(DATA).search("repeat condition") == [("Python", "While Loop")]
+    assert SearchIndex(DATA).search("repeat flex") == []
+
+def test_prefix_matches_longer_words():
+    assert SearchIndex(DATA).search("flexb") == [("CSS", "Flexbox")]
+
+def test_typo_matches_when_nothing_else_does():
+    assert SearchIndex(DATA).search("fucntion") == [("Python", "Function Definition")]
+    assert SearchIndex(DATA).search("whlie") == [("Python", "While Loop")]
+
+def test_exact_hits_rank_above_prefix_hits():
+    data = {"Python": {"Flex": entry("flex"), "Flexible": entry("flexible")}}
+    assert SearchIndex(data).search("flex") == [("Python", "Flex"), ("Python", "Flexible")]
+
+def test_query_without_word_characters_matches_substrings():
+    assert SearchIndex(DATA).search("()") == [("Python", "Function Definition")]
+
+def test_stream_yields_the_search_results_in_order():
+    index = SearchIndex(DATA)
+    for query in ("loop", "e", "fucntion", ": "):
+        assert list(index.stream(query)) == index.search(query)
+
+def test_limit_keeps_the_best_hits():
+    index = SearchIndex(DATA)
+    assert index.search("e", limit=2) == index.search("e")[:2]
+
+def test_short_prefix_keeps_the_most_common_words():
+    # Many rare words sort before the one most entries use; the common one must still match
+    rare = {f"Rare {n}": entry(f"aa{n:03d}") for n in range(SEARCH_MAX_EXPANSIONS + 10)}
+    common = {f"Common {n}": entry("azure") for n in range(5)}
+    hits = SearchIndex({"CSS": {**rare, **common}}).search("a")
+    assert {("CSS", f"Common {n}") for n in range(5)} <= set(hits)
+
+def test_typo_expansions_prefer_common_words():
+    # Over SEARCH_MAX_EXPANSIONS rare words are one letter away from "abcde", and sort before the
+    # common one
+    rare = {"abcde"[:position] + letter + "abcde"[position:] for letter in "fghijklmnopqrstuvwxy" for position in range(5)}
+    data = {"Python": {word: entry(word) for word in rare}}
+    data["Python"].update({f"Common {n}": entry("zabcde") for n in range(5)})
+    assert len(rare) > SEARCH_MAX_EXPANSIONS
+    assert ("Python", "Common 0") in SearchIndex(data).search("abcde")
+
+def test_index_saved_and_loaded_gives_the_same_results():
+    index = SearchIndex(DATA)
+    loaded = SearchIndex.from_state(marshal.loads(marshal.dumps(index.state())), DATA)
+    for query in ("loop", "e", "fucntion", "flexb", "()"):
+        assert loaded.search(query) == index.search(query)
@@ -0,0 +1,81 @@
+# Tests for the lookup service: its endpoints, cached responses and ETags, and the HTTP server's
+# 304 and 405 answers
+
+import asyncio
+import json
+
+import pytest
+
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.server import LookupServer, LookupService
+
+PACKS = {
+    "Python": ("python", {
+        "For Loop": {"syntax": "for x in y:", "example": "for n in range(2): print(n)", "description": "Repeat code."},
+    }),
+    "CSS": ("css", {
+        "Flexbox": {"syntax": "display: flex;", "example": ".box { display: flex; }", "description": "Lay out a row."},
+    }),
+}
+
+@pytest.fixture
+def service(make_corpus):
+    return LookupService(Corpus(make_corpus(PACKS), use_snapshot=False))
+
+def payload(response):
+    status, _, body, _ = response
+    return status, json.loads(body)
+
+def test_endpoints(service):
+    assert payload(service.respond("/categories")) == (200, [
+        {"category": "Python", "language": "python", "items": 1},
+        {"category": "CSS", "language": "css", "items": 1}])
+    assert payload(service.respond("/categories/css")) == (200, ["Flexbox"])
+    assert payload(service.respond("/search?q=repeat")) == (200, [{"category": "Python", "item": "For Loop"}])
+    assert payload(service.respond("/lookup?category=python&item=for%20loop"))[1]["syntax"] == "for x in y:"
+    status, view = payload(service.respond("/render?category=Python&item=For+Loop"))
+    assert status == 200 and view["text"].startswith("--- For Loop ---") and view["tags"]["keyword"]
+    assert payload(service.respond("/search?q=x&limit=many"))[0] == 400
+    assert payload(service.respond("/lookup?category=Python&item=Lambda"))[0] == 404
+    assert payload(service.respond("/nowhere"))[0] == 404
+
+def test_responses_are_cached_until_the_corpus_changes(service, make_corpus):
+    first = service.respond("/categories/Python")
+    assert service.respond("/categories/Python") is first
+    assert (service.hits, service.misses) == (1, 1)
+
+    make_corpus({"Python": ("python", dict(PACKS["Python"][1], Lambda={
+        "syntax": "lambda x: x", "example": "lambda: 0", "description": "Small function."}))})
+    service.corpus.reload("Python")
+    refreshed = service.respond("/categories/Python")
+    assert payload(refreshed) == (200, ["For Loop", "Lambda"])
+    assert refreshed[3] != first[3]  # A new ETag
+
+# Sends one request over a fresh connection; returns (status line, headers, body)
+async def fetch(server, method, target, headers=""):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n{headers}\r\n".encode("ascii"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status, *lines = head.decode("ascii").split("\r\n")
+    return status, dict(line.split(": ", 1) for line in lines), body
+
+def test_http_answers_conditional_and_unsupported_requests(service):
+    async def exchange():
+        server = await LookupServer(service, port=0).start()
+        try:
+            status, headers, body = await fetch(server, "GET", "/categories/Python")
+            assert status == "HTTP/1.1 200 OK" and json.loads(body) == ["For Loop"]
+            etag = headers["ETag"]
+            status, headers, body = await fetch(server, "GET", "/categories/Python", f"If-None-Match: {etag}\r\n")
+            assert (status, headers["ETag"], body) == ("HTTP/1.1 304 Not Modified", etag, b"")
+            status, headers, body = await fetch(server, "HEAD", "/categories/Python")
+            assert headers["Content-Length"] == str(len(b'["For Loop"]')) and body == b""
+            status, headers, _ = await fetch(server, "POST", "/categories/Python")
+            assert (status, headers["Allow"]) == ("HTTP/1.1 405 Method Not Allowed", "GET, HEAD")
+        finally:
+            server.server.close()
+            server.executor.shutdown()
+    asyncio.run(exchange())
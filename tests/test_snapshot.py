@@ -0,0 +1,109 @@
+# Tests for the startup snapshot: it is used while the packs are unchanged and ignored (then
+# rewritten) once one is edited
+
+import os
+
+from syntax_buddy import snapshot
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.snapshot import SNAPSHOT_NAME
+
+PACKS = {
+    "Python": ("python", {
+        "For Loop": {"syntax": "for x in y:", "example": "for n in range(2):\n    print(n)",
+                     "description": "Repeat code."},
+        "If": {"syntax": "if x:", "example": "if True:\n    print('yes')", "description": "Branch."},
+    }),
+    "CSS": ("css", {
+        "Color": {"syntax": "color: value;", "example": "p { color: red; }", "description": "Text colour."},
+    }),
+}
+
+# Loads the corpus, builds its index and "See also" table and saves a snapshot; returns the next
+# launch's corpus
+def saved_and_reopened(data_dir):
+    corpus = Corpus(data_dir)
+    corpus.related_entries()
+    corpus.save_snapshot()
+    return Corpus(data_dir)
+
+def test_unchanged_packs_load_from_the_snapshot(tmp_path, make_corpus):
+    corpus = saved_and_reopened(make_corpus(PACKS))
+    assert os.path.exists(tmp_path / SNAPSHOT_NAME)
+    assert corpus.snapshot is not None and corpus.has_related()
+    assert dict(corpus["Python"]["If"]) == PACKS["Python"][1]["If"]
+    assert corpus.search_index().search("repeat") == [("Python", "For Loop")]
+    assert corpus.example_code(PACKS["Python"][1]["If"]["example"]) is not None
+    assert corpus.example_code("print('not in the corpus')") is None
+
+def test_startup_without_a_snapshot_does_not_hash_the_packs(make_corpus, monkeypatch):
+    def refuse(*args):
+        raise AssertionError("packs hashed at startup")
+    data_dir = make_corpus(PACKS)
+    monkeypatch.setattr(snapshot, "source_digest", refuse)
+    corpus = Corpus(data_dir)
+    assert corpus.snapshot is None and corpus.digest is None
+    assert list(corpus["CSS"]) == ["Color"]
+    monkeypatch.undo()
+
+    # Saving hashes them, and the next launch uses the snapshot
+    corpus.search_index()
+    corpus.save_snapshot()
+    assert Corpus(data_dir).snapshot is not None
+
+def test_touched_but_unchanged_pack_still_uses_the_snapshot(make_corpus):
+    data_dir = make_corpus(PACKS)
+    saved_and_reopened(data_dir)
+    make_corpus({"CSS": PACKS["CSS"]})
+    os.utime(os.path.join(data_dir, "css.json"), ns=(0, 0))
+    assert Corpus(data_dir).snapshot is not None
+
+def test_edited_pack_invalidates_the_snapshot(make_corpus):
+    data_dir = make_corpus(PACKS)
+    saved_and_reopened(data_dir)
+    entries = dict(PACKS["Python"][1])
+    entries["If"] = dict(entries["If"], description="Branch on a condition.")
+    entries["While Loop"] = {"syntax": "while x:", "example": "while False:\n    pass", "description": "Loop."}
+    make_corpus({"Python": ("python", entries)})
+
+    corpus = Corpus(data_dir)
+    assert corpus.snapshot is None
+    assert corpus["Python"]["If"]["description"] == "Branch on a condition."
+    assert corpus.search_index().search("condition") == [("Python", "If")]
+    assert corpus.search_index().search("while") == [("Python", "While Loop")]
+
+    # The snapshot is rewritten for the edited packs and used again by the launch after
+    corpus.save_snapshot()
+    reopened = Corpus(data_dir)
+    assert reopened.snapshot is not None
+    assert reopened.search_index().search("condition") == [("Python", "If")]
+
+def test_pack_reloaded_while_running_is_not_served_from_the_snapshot(make_corpus):
+    data_dir = make_corpus(PACKS)
+    corpus = saved_and_reopened(data_dir)
+    corpus.search_index()
+    assert corpus.has_related()
+    entries = dict(PACKS["Python"][1])
+    del entries["For Loop"]
+    make_corpus({"Python": ("python", entries)})
+
+    assert corpus.changed_packs() == ["Python"]
+    assert corpus.reload("Python") == {"For Loop"}
+    assert "For Loop" not in corpus["Python"]
+    assert corpus.search_index().search("repeat") == []
+    assert not corpus.has_related()  # The saved table describes the old pack
+    assert ("Python", "For Loop") not in corpus.related_entries().entries
+
+    corpus.save_snapshot()
+    reopened = Corpus(data_dir)
+    assert reopened.snapshot is not None
+    assert "For Loop" not in reopened["Python"]
+    assert reopened.search_index().search("repeat") == []
+
+def test_corrupt_snapshot_is_ignored(tmp_path, make_corpus):
+    data_dir = make_corpus(PACKS)
+    saved_and_reopened(data_dir)
+    with open(tmp_path / SNAPSHOT_NAME, "r+b") as snapshot_file:
+        snapshot_file.write(b"garbage!")
+    corpus = Corpus(data_dir)
+    assert corpus.snapshot is None
+    assert corpus.search_index().search("colour") == [("CSS", "Color")]
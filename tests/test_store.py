@@ -0,0 +1,50 @@
+# Tests for PackStore: entries read back as they were written, through the snapshot's plain data
+# too, and edits are found by comparing stores
+
+import marshal
+
+import pytest
+
+from syntax_buddy.store import PackStore
+
+ENTRIES = {
+    "For Loop": {"syntax": "for x in y:", "example": "for n in range(2):\n    print(n)", "description": "Repeat."},
+    "While Loop": {"syntax": "while x:", "example": "while False:\n    pass", "description": "Repeat."},
+    "Unicode": {"syntax": "for x in y:", "example": "print('héllo ✓ 日本')", "description": ""},
+    "Empty": {"syntax": "", "example": "", "description": ""},
+}
+
+def as_dicts(store):
+    return {item: dict(details) for item, details in store.items()}
+
+def test_entries_read_back_unchanged():
+    store = PackStore.from_entries(ENTRIES)
+    assert as_dicts(store) == ENTRIES
+    assert list(store) == list(ENTRIES)
+    assert len(store) == 4 and "Empty" in store and "Missing" not in store
+    with pytest.raises(KeyError):
+        store["Missing"]
+    with pytest.raises(KeyError):
+        store["Empty"]["title"]
+
+def test_identical_texts_are_stored_once():
+    store = PackStore.from_entries(ENTRIES)
+    assert len(store.syntaxes) == 3
+    assert bytes(store.buffer).count(b"Repeat.") == 1
+
+def test_round_trip_through_snapshot_state():
+    columns, buffer = PackStore.from_entries(ENTRIES).state()
+    # The snapshot marshals the columns and keeps the buffer as a view of the mapped file
+    restored = PackStore.from_state(marshal.loads(marshal.dumps(columns)), memoryview(buffer))
+    assert as_dicts(restored) == ENTRIES
+    assert restored.state() == (columns, buffer)
+
+def test_changed_items():
+    store = PackStore.from_entries(ENTRIES)
+    edited = dict(ENTRIES)
+    edited["For Loop"] = dict(ENTRIES["For Loop"], description="Repeat for each item.")
+    edited["Unicode"] = dict(ENTRIES["Unicode"], syntax="print(x)")
+    del edited["Empty"]
+    edited["If"] = {"syntax": "if x:", "example": "if x: pass", "description": "Branch."}
+    assert store.changed_items(PackStore.from_entries(edited)) == {"For Loop", "Unicode", "Empty", "If"}
+    assert store.changed_items(PackStore.from_entries(dict(reversed(ENTRIES.items())))) == set()
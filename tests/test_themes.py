@@ -0,0 +1,54 @@
+# Tests for themes: user themes fill gaps from their base, and the registry restyles widgets
+# and highlight tags without touching tag ranges
+
+import json
+
+import pytest
+
+from benchmarks.headless import HeadlessText
+from syntax_buddy import themes as themes_module
+from syntax_buddy.themes import ThemeRegistry, load_user_themes, themes
+
+class Widget:
+    def __init__(self):
+        self.options = {}
+
+    def configure(self, **options):
+        self.options.update(options)
+
+@pytest.fixture
+def user_themes(tmp_path, monkeypatch):
+    monkeypatch.setattr(themes_module, "themes", dict(themes))
+    path = tmp_path / "themes.json"
+
+    def write(content):
+        path.write_text(json.dumps(content), encoding="utf-8")
+        return str(path)
+    return write
+
+def test_user_themes_take_missing_colours_from_their_base(user_themes):
+    path = user_themes({"dracula": {"base": "dark", "keyword": "#ff79c6"}, "paper": {"bg": "ivory"}})
+    assert load_user_themes(path) == ["dracula", "paper"]
+    assert themes_module.themes["dracula"] == dict(themes["dark"], keyword="#ff79c6")
+    assert themes_module.themes["paper"] == dict(themes["light"], bg="ivory")
+
+def test_missing_themes_file_adds_nothing_and_unknown_base_raises(user_themes, tmp_path):
+    assert load_user_themes(str(tmp_path / "absent.json")) == []
+    with pytest.raises(ValueError, match="unknown theme 'neon'"):
+        load_user_themes(user_themes({"glow": {"base": "neon"}}))
+
+def test_registry_restyles_registered_widgets_and_tags():
+    registry = ThemeRegistry(themes["light"])
+    button, gone, text = Widget(), Widget(), HeadlessText()
+    registry.register(button, "button")
+    registry.register(gone, "label")
+    registry.unregister(gone)
+    registry.register_tags(text)
+    text.tag_add("keyword", "1.0", "1.3")
+    assert button.options == {"bg": themes["light"]["button_bg"], "fg": themes["light"]["button_fg"]}
+
+    registry.apply(themes["dark"])
+    assert button.options == {"bg": themes["dark"]["button_bg"], "fg": themes["dark"]["button_fg"]}
+    assert gone.options["bg"] == themes["light"]["bg"]
+    assert text.tag_options["link"] == {"foreground": themes["dark"]["keyword"]}
+    assert text.tags == {"keyword": ["1.0", "1.3"]}  # Nothing re-highlighted
@@ -0,0 +1,53 @@
+# Tests for tracing: nothing is recorded while it is off, spans and counters export as Chrome
+# trace events, and a late mainloop heartbeat is recorded as a stall
+
+import json
+
+import pytest
+
+from benchmarks.headless import HeadlessText
+from syntax_buddy import trace
+from syntax_buddy.trace import Tracer, install_stall_monitor, span, traced
+
+@traced("test.double")
+def double(value):
+    return value * 2
+
+@pytest.fixture
+def tracer(monkeypatch):
+    tracer = Tracer()
+    monkeypatch.setattr(trace, "tracer", tracer)
+    return tracer
+
+def test_disabled_tracer_records_nothing(tracer):
+    assert double(2) == 4
+    with span("test.block"):
+        pass
+    tracer.counter("test.cache", size=1)
+    assert tracer.events == []
+
+def test_spans_and_counters_export_as_trace_events(tracer, tmp_path):
+    tracer.enabled = True  # enable() would also export at exit
+    assert double(3) == 6
+    with span("test.block", "io", path="x"):
+        pass
+    tracer.counter("test.cache", size=2)
+    path = tracer.export(str(tmp_path / "trace.json"))
+    with open(path, encoding="utf-8") as trace_file:
+        events = json.load(trace_file)["traceEvents"]
+    assert [(event["name"], event["ph"]) for event in events] == [
+        ("test.double", "X"), ("test.block", "X"), ("test.cache", "C")]
+    assert events[1]["cat"] == "io" and events[1]["args"] == {"path": "x"}
+    assert events[0]["dur"] >= 0 and events[2]["args"] == {"size": 2}
+
+def test_late_heartbeat_is_recorded_as_a_stall(tracer):
+    tracer.enabled = True
+    clock = iter([0, 50_000, 60_000, 400_000, 400_000])  # Microseconds
+    tracer.now_us = lambda: next(clock)
+    widget = HeadlessText()
+    install_stall_monitor(widget, threshold_ms=100)
+    for _ in range(2):  # Each beat schedules the next, so run them one at a time
+        _, callback, args = widget.callbacks.popleft()
+        callback(*args)
+    assert [(event["name"], event["args"]) for event in tracer.events] == [
+        ("mainloop stall", {"late_ms": 290.0})]
@@ -0,0 +1,88 @@
+# Tests for corpus verification: the HTML and CSS checkers, and verify_corpus running Python
+# examples and caching results by content
+
+import pytest
+
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.verify import check_css, check_html, verify_corpus
+
+@pytest.mark.parametrize("source", [
+    "<div><p>Hello <b>there</b></p></div>",
+    "<ul><li>One<li>Two</ul>",  # </li> may be left out
+    "<p>Line<br>break <img src='a.png'></p>",
+    "<style>p { color: red; }</style><p>Styled</p>",
+])
+def test_valid_html(source):
+    assert check_html(source) == []
+
+@pytest.mark.parametrize("source, problems", [
+    ("<div>\n<span>x</span>", ["line 1: <div> is never closed"]),
+    ("<p>x</p></span>", ["line 1: </span> has no matching <span>"]),
+    ("<div><b>x</div>", ["line 1: <b> is never closed"]),
+    ("<style>p { color red; }</style>", ["<style>: line 1: 'color red' is not a property: value declaration"]),
+])
+def test_html_problems(source, problems):
+    assert check_html(source) == problems
+
+@pytest.mark.parametrize("source", [
+    "p { color: red; }",
+    "@import url(theme.css);\n@media print { p { color: black; } }",
+    ":root { --gap: 2px; }\n.box { margin: var(--gap); content: \"}\"; } /* { */",
+])
+def test_valid_css(source):
+    assert check_css(source) == []
+
+@pytest.mark.parametrize("source, problems", [
+    ("p {\n  color: red;", ["line 1: '{' is never closed"]),
+    ("p { color: red; }\n}", ["line 2: '}' has no matching '{'"]),
+    ("{ color: red; }", ["line 1: block without a selector"]),
+    ("p { color red; }", ["line 1: 'color red' is not a property: value declaration"]),
+    ("color: red;", ["line 1: 'color: red' is outside any rule"]),
+    ("p { content: \"open }", ["line 1: unterminated string"]),
+    ("p { color: red; }\n/* note", ["line 2: unterminated comment"]),
+])
+def test_css_problems(source, problems):
+    assert check_css(source) == problems
+
+PACKS = {
+    "Python": ("python", {
+        "Print": "print('ok')",
+        "Raise": "raise ValueError('broken example')",
+        "Same As Print": "print('ok')",
+    }),
+    "HTML": ("html", {"Div": "<div>x</div>", "Unclosed": "<section>x"}),
+    "Shell": ("bash", {"Echo": "echo hi"}),
+}
+
+# Function to turn {category: (language, {item: example})} into full packs for make_corpus
+def full_packs(packs):
+    return {category: (language, {item: {"syntax": "", "example": example, "description": ""}
+                                  for item, example in examples.items()})
+            for category, (language, examples) in packs.items()}
+
+def outcomes(results):
+    return {(result.category, result.item): (result.ok, result.cached) for result in results}
+
+def test_verify_corpus_runs_checks_and_caches_results(tmp_path, make_corpus):
+    corpus = Corpus(make_corpus(full_packs(PACKS)), use_snapshot=False)
+    cache_path = str(tmp_path / "verify.json")
+    results = verify_corpus(corpus, workers=1, cache_path=cache_path)
+    assert outcomes(results) == {
+        ("Python", "Print"): (True, False), ("Python", "Raise"): (False, False),
+        ("Python", "Same As Print"): (True, False), ("HTML", "Div"): (True, False),
+        ("HTML", "Unclosed"): (False, False), ("Shell", "Echo"): (None, False)}
+    messages = {result.item: result.message for result in results}
+    assert messages["Raise"] == "ValueError: broken example"
+    assert messages["Unclosed"] == "line 1: <section> is never closed"
+
+    # Only the edited example is checked again
+    edited = {"HTML": ("html", {"Div": "<div>x</div>", "Unclosed": "<section>x</section>"})}
+    results = verify_corpus(Corpus(make_corpus(full_packs(edited)), use_snapshot=False), workers=1,
+                            cache_path=cache_path)
+    assert outcomes(results) == {
+        ("Python", "Print"): (True, True), ("Python", "Raise"): (False, True),
+        ("Python", "Same As Print"): (True, True), ("HTML", "Div"): (True, True),
+        ("HTML", "Unclosed"): (True, False), ("Shell", "Echo"): (None, False)}
+
+    results = verify_corpus(corpus, ["HTML"], workers=1, cache_path=cache_path, use_cached=False)
+    assert [result.cached for result in results] == [False, False]
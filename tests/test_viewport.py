@@ -0,0 +1,64 @@
+# Tests for viewport-lazy highlighting: once idle slices have run, a large result document
+# carries exactly the tags eager highlighting gives it
+
+import pytest
+
+from benchmarks.headless import HeadlessText
+from benchmarks.run import build_corpus
+from syntax_buddy.corpus import Corpus
+from syntax_buddy.render import format_entry, format_result, insert_highlighted
+from syntax_buddy.search import SearchIndex
+from syntax_buddy.viewport import LazyHighlighter
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("corpus")
+    build_corpus(1500, str(directory))
+    return Corpus(str(directory), use_snapshot=False)
+
+def search_sections(corpus, query):
+    return [format_result(category, item, corpus[category][item])
+            for category, item in SearchIndex(corpus).search(query)]
+
+# Tag ranges as a set of (start, end) index pairs per tag, whatever order they were added in
+def tag_sets(widget):
+    return {tag: set(zip(indices[::2], indices[1::2])) for tag, indices in widget.tags.items() if indices}
+
+def eager_tags(corpus, sections):
+    widget = HeadlessText()
+    insert_highlighted(widget, "".join(sections), corpus.language)
+    return tag_sets(widget)
+
+def test_lazy_tags_match_eager_tags(corpus):
+    sections = search_sections(corpus, "e")
+    assert len(sections) > 1000
+    widget = HeadlessText()
+    highlighter = LazyHighlighter(widget, corpus.language)
+    highlighter.show(sections)
+    assert highlighter.remaining > 0  # Only the top of the document is tagged at once
+    widget.run_pending()
+    assert highlighter.remaining == 0
+    assert tag_sets(widget) == eager_tags(corpus, sections)
+
+def test_appended_batches_match_one_eager_document(corpus):
+    sections = search_sections(corpus, "loop")
+    widget = HeadlessText()
+    highlighter = LazyHighlighter(widget, corpus.language)
+    highlighter.show(sections[:50])
+    for start in range(50, len(sections), 50):
+        highlighter.append(sections[start:start + 50])
+    widget.run_pending()
+    assert tag_sets(widget) == eager_tags(corpus, sections)
+
+def test_detail_view_uses_the_given_category(corpus):
+    # Detail views format entries without "Category:" in the header; the category passed in is used
+    item, details = next(iter(corpus["Python"].items()))
+    section = format_entry(item, details)
+    widget = HeadlessText()
+    highlighter = LazyHighlighter(widget, corpus.language)
+    highlighter.show([section], "Python")
+    widget.run_pending()
+    eager = HeadlessText()
+    insert_highlighted(eager, section, corpus.language, "Python")
+    assert tag_sets(widget) == tag_sets(eager)
+    assert highlighter.entry_at(1) == ("Python", item)